@@ -0,0 +1,261 @@
+"""Wall time and peak memory of the AudioProcessor hot paths on synthetic audio.
+
+python -m benchmarks.audio_processor -o results.json
+python -m benchmarks.audio_processor -o new.json --compare results.json
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+
+import numpy as np
+
+from cutted.core.audio_processor import AudioProcessor
+from cutted.core.decode_cache import DecodeCache
+
+CHUNK_SECONDS = 60
+RANGE_COUNTS = (1, 10, 100, 500)
+REGRESSION_THRESHOLD = 0.2
+# ignore changes smaller than timer noise
+MIN_SECONDS = 0.005
+
+
+def write_synthetic_wav(path, seconds, frame_rate, channels, seed=0):
+    """Tone bursts with pauses over a noise floor, written in chunks."""
+    rng = np.random.default_rng(seed)
+    chunk = CHUNK_SECONDS * frame_rate
+    total = int(seconds * frame_rate)
+    with wave.open(path, "wb") as out:
+        out.setnchannels(channels)
+        out.setsampwidth(2)
+        out.setframerate(frame_rate)
+        for start in range(0, total, chunk):
+            t = np.arange(start, min(start + chunk, total)) / frame_rate
+            # 2 s of tone, then 0.7 s of silence
+            envelope = (t % 2.7) < 2.0
+            tone = np.sin(2 * np.pi * (220 + 20 * np.sin(t)) * t) * 0.5 * envelope
+            noise = rng.normal(0, 0.002, size=(len(t), channels))
+            samples = tone[:, None] + noise
+            out.writeframes((samples * 32767).astype(np.int16).tobytes())
+
+
+def ranges(duration, count, fraction=0.1):
+    """``count`` evenly spaced ranges covering ``fraction`` of the audio."""
+    step = duration / count
+    length = step * fraction
+    starts = [index * step for index in range(count)]
+    return starts, [start + length for start in starts]
+
+
+def _loaded(audio_path, cache_dir):
+    processor = AudioProcessor()
+    processor.decode_cache = DecodeCache(cache_dir)
+    processor.load_audio(audio_path)
+    return processor
+
+
+def operations(audio_path, duration, work_dir):
+    """Yield (name, extra params, setup, run); setup's result is passed to run."""
+    cache_dir = os.path.join(work_dir, "cache")
+
+    def fresh():
+        return _loaded(audio_path, cache_dir)
+
+    def cold_cache():
+        cold_dir = os.path.join(work_dir, "cold")
+        shutil.rmtree(cold_dir, ignore_errors=True)
+        return DecodeCache(cold_dir)
+
+    def load_cold(cache):
+        processor = AudioProcessor()
+        processor.decode_cache = cache
+        processor.load_audio(audio_path)
+
+    yield "load_audio", {"cache": "cold"}, cold_cache, load_cold
+    fresh()
+    yield "load_audio", {"cache": "warm"}, lambda: None, lambda _: fresh()
+
+    for count in RANGE_COUNTS:
+        starts, ends = ranges(duration, count)
+        yield "cut", {"ranges": count}, fresh, lambda p, s=starts, e=ends: p.cut(s, e)
+        volumes = [0.5] * count
+        yield "change_volume", {"ranges": count}, fresh, (
+            lambda p, s=starts, e=ends, v=volumes: p.change_volume(s, e, v)
+        )
+
+    def edited():
+        processor = fresh()
+        starts, ends = ranges(duration, 100)
+        processor.cut(starts, ends)
+        return processor
+
+    yield "plot_audio", {}, edited, lambda p: p.plot_audio()
+    yield "get_waveform_summary", {}, edited, lambda p: p.get_waveform_summary()
+    yield "get_audio_upload", {}, edited, lambda p: p.get_audio_upload()
+    for format in ("wav", "mp3"):
+        path = os.path.join(work_dir, f"export.{format}")
+        yield "export_audio", {"format": format}, edited, (
+            lambda p, path=path, format=format: p.export_audio(path, format)
+        )
+
+    yield "reduce_noise", {}, edited, lambda p: p.reduce_noise()
+    # the undo snapshot taken before every edit
+    yield "history_record", {}, edited, (
+        lambda p: p.history.record("benchmark", p.edits.snapshot(), p.edits.source)
+    )
+    yield "undo", {}, edited, lambda p: p.undo()
+
+
+def measure(setup, run, repeat):
+    """Best wall time of ``repeat`` runs, then peak traced memory of one more."""
+    best = None
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        started = time.perf_counter()
+        run(state)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    state = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(state)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def result_key(result):
+    params = ",".join(f"{k}={v}" for k, v in sorted(result["params"].items()))
+    return f"{result['name']}[{params}]"
+
+
+def run_suite(durations, frame_rates, channel_counts, repeat=1, only=None):
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for duration in durations:
+            for frame_rate in frame_rates:
+                for channels in channel_counts:
+                    audio_path = os.path.join(
+                        work_dir, f"{duration}s_{frame_rate}_{channels}ch.wav"
+                    )
+                    write_synthetic_wav(audio_path, duration, frame_rate, channels)
+                    base = {
+                        "duration": duration,
+                        "frame_rate": frame_rate,
+                        "channels": channels,
+                    }
+                    for name, extra, setup, run in operations(
+                        audio_path, duration, work_dir
+                    ):
+                        if only and name not in only:
+                            continue
+                        seconds, peak = measure(setup, run, repeat)
+                        result = {
+                            "name": name,
+                            "params": {**base, **extra},
+                            "seconds": round(seconds, 6),
+                            "peak_bytes": peak,
+                        }
+                        results.append(result)
+                        print(
+                            f"{result_key(result):<75} {seconds * 1000:10.1f} ms "
+                            f"{peak / 2**20:9.1f} MiB",
+                            file=sys.stderr,
+                        )
+                    os.remove(audio_path)
+    return results
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Return (key, metric, old, new) for every regression beyond ``threshold``."""
+    old = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = old.get(result_key(result))
+        if previous is None:
+            continue
+        if (
+            result["seconds"] > previous["seconds"] * (1 + threshold)
+            and result["seconds"] - previous["seconds"] > MIN_SECONDS
+        ):
+            regressions.append(
+                (result_key(result), "seconds", previous["seconds"], result["seconds"])
+            )
+        if result["peak_bytes"] > previous["peak_bytes"] * (1 + threshold):
+            regressions.append(
+                (
+                    result_key(result),
+                    "peak_bytes",
+                    previous["peak_bytes"],
+                    result["peak_bytes"],
+                )
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--durations",
+        type=float,
+        nargs="+",
+        default=[60, 600],
+        help="seconds of audio; add 3600 10800 for the long-file curves",
+    )
+    parser.add_argument(
+        "--frame-rates", type=int, nargs="+", default=[16000, 44100, 48000]
+    )
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--only", nargs="+", help="operation names to run")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    # keep the processor's logging out of the timing table
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run_suite(
+            args.durations, args.frame_rates, args.channels, args.repeat, args.only
+        )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for key, metric, old, new in regressions:
+            print(f"REGRESSION {key} {metric}: {old} -> {new} ({new / old:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
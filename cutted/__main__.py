@@ -1,4 +1,92 @@
-from . import app
+import argparse
+import os
+import sys
+
+
+def _add_batch_arguments(parser):
+    # kept here so that parsing the command line does not import numpy or pydub
+    parser.add_argument(
+        "inputs", nargs="+", help="audio files, directories or glob patterns"
+    )
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--prompt", help="natural-language instruction for Gemini")
+    action.add_argument(
+        "--calls",
+        help='JSON file with a list of tool calls, e.g. [{"name": "cut_audio", "args": {...}}]',
+    )
+    parser.add_argument(
+        "--fake-llm",
+        metavar="CALLS",
+        help="answer --prompt with the tool calls in this JSON file instead of Gemini",
+    )
+    parser.add_argument("--model", default="gemini-2.0-flash")
+    parser.add_argument("-o", "--output-dir", default="cutted_output")
+    parser.add_argument(
+        "-f",
+        "--format",
+        nargs="+",
+        default=["mp3"],
+        help="one or more output formats, encoded in parallel",
+    )
+    parser.add_argument("-b", "--bitrate", help="encoder bitrate, e.g. 192k")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=max(1, (os.cpu_count() or 1) // 2),
+        help="number of files processed in parallel",
+    )
+    parser.add_argument(
+        "--results", help="write JSON lines here instead of standard output"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="keep decoded audio here (also CUTTED_DECODE_CACHE=PATH)",
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cutted")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print how long each module took to import once the window is shown",
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="cutted_trace.json",
+        metavar="PATH",
+        help="record timing spans and write them as a Chrome trace (also CUTTED_TRACE=PATH)",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    batch_parser = subparsers.add_parser(
+        "batch", help="apply an instruction or tool calls to many files without the GUI"
+    )
+    _add_batch_arguments(batch_parser)
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        from .core import tracing
+
+        tracing.enable(args.trace)
+
+    if args.command == "batch":
+        from . import batch
+
+        sys.exit(batch.run(args))
+
+    startup_profiler = None
+    if args.profile_startup:
+        from .core.profiling import StartupProfiler
+
+        startup_profiler = StartupProfiler()
+        startup_profiler.install()
+
+    from . import app
+
+    app.main(startup_profiler)
+
 
 if __name__ == "__main__":
-    app.main()
+    main()
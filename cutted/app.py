@@ -1,39 +1,63 @@
+import asyncio
+import importlib.util
+import os
 import threading
 import time
 import tkinter.messagebox as messagebox
+from collections import deque
 
 import customtkinter
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
-from .core import audio_processor, gemini
+from .core import audio_processor, tracing
+from .core.chat_history import ChatHistory
+from .core.edit_list import EditList
+from .core.export import EXPORT_FORMATS
 from .core.logger import print_fail, print_info, print_success, print_warn
+from .core.project import PROJECT_EXTENSION
+from .core.prompt import build_prompt
+from .core.transcript_cache import TranscriptCache, format_transcript
 
 customtkinter.set_appearance_mode("Dark")
 
-try:
-    from .core import transcribe
-
-    whisper_support = True
+PLAYHEAD_INTERVAL_MS = 33
+GEMINI_TIMEOUT_SECONDS = 90
+
+WHISPER_MODEL_SIZE = "small"
+AUDIO_FILE_TYPES = ".mp3 .wav .aac .flac .ogg .m4a"
+# tool calls applied on a worker thread, with their spinner message
+BACKGROUND_TOOLS = {
+    "reduce_noise": "Reducing noise...",
+    "remove_silence": "Removing silence...",
+}
+
+# whisper_timestamped pulls in torch, so only check that it is installed here
+# and import it on the first transcription
+whisper_support = importlib.util.find_spec("whisper_timestamped") is not None
+if whisper_support:
     print_info("Whisper support present.")
-except ModuleNotFoundError:
-    whisper_support = False
+else:
     print_info("Whisper support is not present.")
 
 
 class CuttedApp:
     def __init__(self):
         self.AudioProcessor = audio_processor.AudioProcessor()
-        self.AudioProcessor._init_pygame()
         if whisper_support:
             self.whisper = None
-        self.gemini = gemini.GeminiClient()
-        self.canvas = None
-        self.cursor_line = None
+        self.gemini = None
+        self.saved_chat = None
+        self.transcript_cache = TranscriptCache()
+        self.waveform_view = None
+        self.slider = None
         self.last_slider_update = 0
         self.slider_value = 0
-        self.playback_start_time = 0
-        self.is_playing = False
-        self.last_states = []
+        self.playhead_job = None
+        self.event_loop = None
+        self.pending_request = None
+        self.effect_cancel = None
+        self.prompt_queue = deque()
+        self.request_id = 0
+        self.busy = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -62,15 +86,29 @@ class CuttedApp:
         )
         button.place(relx=0.5, rely=1.0, anchor="s", y=-30)
 
+        add_button = customtkinter.CTkButton(
+            self.root, text="Add audio", command=self.add_file, width=80
+        )
+        add_button.place(relx=0.72, rely=1.0, anchor="s", y=-30)
+
         export_button = customtkinter.CTkButton(
             self.root, text="Export", command=self.export_audio, width=70
         )
         export_button.place(relx=0.9, rely=1.0, anchor="s", y=-30)
 
         undo_button = customtkinter.CTkButton(
-            self.root, text="Undo", command=self.undo_last, width=70
+            self.root, text="Undo", command=self.undo_last, width=50
         )
-        undo_button.place(relx=0.1, rely=1.0, anchor="s", y=-30)
+        undo_button.place(relx=0.07, rely=1.0, anchor="s", y=-30)
+
+        redo_button = customtkinter.CTkButton(
+            self.root, text="Redo", command=self.redo_last, width=50
+        )
+        redo_button.place(relx=0.17, rely=1.0, anchor="s", y=-30)
+
+        self.root.bind("<Control-z>", lambda event: self.undo_last())
+        self.root.bind("<Control-y>", lambda event: self.redo_last())
+        self.root.bind("<Control-s>", lambda event: self.save_project())
 
         if whisper_support:
             self.use_transcript_checkbox = customtkinter.CTkCheckBox(
@@ -121,65 +159,82 @@ class CuttedApp:
         )
         self.send_button.pack(side="right")
 
+        self.cancel_button = customtkinter.CTkButton(
+            self.input_frame,
+            text="✕",
+            width=36,
+            height=36,
+            command=self.cancel_prompt,
+            state="disabled",
+        )
+        self.cancel_button.pack(side="right", padx=(0, 5))
+
     def on_resize(self, event):
-        if hasattr(self, "slider") and self.slider is not None:
+        if self.slider is not None:
             new_width = max(self.root.winfo_width() - 40, 100)
             self.slider.configure(width=new_width)
 
     def select_file(self):
         file_path = customtkinter.filedialog.askopenfilename(
-            filetypes=[("Audio files", ".mp3 .wav .aac .flac .ogg .m4a")]
+            filetypes=[
+                ("Audio files", AUDIO_FILE_TYPES),
+                ("Cutted projects", PROJECT_EXTENSION),
+            ]
         )
         if file_path:
-            self.AudioProcessor.load_audio(file_path)
+            if file_path.lower().endswith(PROJECT_EXTENSION):
+                if not self.open_project(file_path):
+                    return
+            else:
+                self.AudioProcessor.load_audio(file_path)
+            if self.waveform_view is not None:
+                self.waveform_view.destroy()
+                self.waveform_view = None
+                self.slider.destroy()
             self.update_plot()
 
-    def update_plot(self):
-        if self.canvas:
-            self.canvas.get_tk_widget().destroy()
-        if hasattr(self, "slider") and self.slider is not None:
-            self.slider.destroy()
-
-        fig, _ = self.AudioProcessor.plot_audio()
-        self.ax = fig.axes[0]
-        self.canvas = FigureCanvasTkAgg(fig, master=self.plot_frame)
-        self.canvas.draw()
+    def add_file(self):
+        file_paths = customtkinter.filedialog.askopenfilenames(
+            filetypes=[("Audio files", AUDIO_FILE_TYPES)]
+        )
+        if not file_paths:
+            return
+        self.AudioProcessor.stop_audio()
+        for file_path in file_paths:
+            self.AudioProcessor.add_clip(file_path)
+        self.update_plot()
 
+    @tracing.traced()
+    def update_plot(self, start=None, end=None):
         self.audio_length = float(self.AudioProcessor.get_length())
-
-        slider_width = self.root.winfo_width() - 40
         if self.slider_value > self.audio_length:
             self.slider_value = self.audio_length
         if self.slider_value < 0:
             self.slider_value = 0
 
-        self.slider = customtkinter.CTkSlider(
-            self.root,
-            from_=0,
-            to=self.audio_length,
-            command=self.set_cursor,
-            width=slider_width,
-        )
-        self.slider.set(self.slider_value)
-        self.slider.place(relx=0.5, rely=1.0, anchor="s", y=-130)
-        self.set_cursor(self.slider_value)
+        if self.waveform_view is None:
+            from .waveform_view import WaveformView
 
-        self.canvas.get_tk_widget().pack(
-            fill=customtkinter.BOTH,
-            expand=True,
-            padx=10,
-            pady=10,
-        )
+            self.waveform_view = WaveformView(self.plot_frame, self.AudioProcessor)
+            self.slider = customtkinter.CTkSlider(
+                self.root,
+                from_=0,
+                to=self.audio_length,
+                command=self.set_cursor,
+                width=self.root.winfo_width() - 40,
+            )
+            self.slider.place(relx=0.5, rely=1.0, anchor="s", y=-130)
+        else:
+            self.waveform_view.refresh(start, end)
+            self.slider.configure(to=self.audio_length)
 
-        self.cursor_line = self.ax.axvline(
-            x=self.slider_value, color="red", linewidth=2
-        )
-        self.canvas.draw_idle()
+        self.slider.set(self.slider_value)
+        self.set_cursor(self.slider_value)
 
-    def show_spinner(self, message="Transcribing..."):
+    def show_spinner(self, message="Transcribing...", on_cancel=None):
         spinner_win = customtkinter.CTkToplevel(self.root)
         spinner_win.title("Please wait")
-        spinner_win.geometry("250x100")
+        spinner_win.geometry("250x140" if on_cancel else "250x100")
         spinner_win.grab_set()
         spinner_win.resizable(False, False)
         label = customtkinter.CTkLabel(spinner_win, text=message)
@@ -187,50 +242,93 @@ class CuttedApp:
         progress = customtkinter.CTkProgressBar(spinner_win, mode="indeterminate")
         progress.pack(pady=10, padx=20, fill="x")
         progress.start()
+        if on_cancel:
+            cancel_button = customtkinter.CTkButton(
+                spinner_win, text="Cancel", command=on_cancel, width=70
+            )
+            cancel_button.pack(pady=5)
         return spinner_win, progress
 
+    def set_spinner_progress(self, progress, done, total):
+        if not progress.winfo_exists():
+            return
+        if progress.cget("mode") != "determinate":
+            progress.stop()
+            progress.configure(mode="determinate")
+        progress.set(done / total)
+
     def set_cursor(self, value):
         now = time.time()
-        if now - self.last_slider_update < 0.05:  # 100ms
+        if now - self.last_slider_update < 0.016:
             return
         self.last_slider_update = now
 
         self.slider_value = round(value, 2)
 
-        if self.cursor_line:
-            self.cursor_line.set_xdata([self.slider_value, self.slider_value])
-            self.canvas.draw_idle()
-            self.slider.set(self.slider_value)
-            self.set_cursor(self.slider_value)
+        if self.waveform_view:
+            self.waveform_view.move_cursor(self.slider_value)
+
+        # seeking only restarts the chunk stream at the new position
+        if self.AudioProcessor.is_playing():
+            self.AudioProcessor.play_audio(self.slider_value)
+        elif self.AudioProcessor.is_paused():
+            self.AudioProcessor.stop_audio()
+            self.play_button.configure(text="Play")
 
         print_info(f"Slider Value: {self.slider_value}")
 
     def play_audio(self):
-        if (
-            not hasattr(self.AudioProcessor, "audio")
-            or self.AudioProcessor.audio is None
-        ):
+        if self.AudioProcessor.edits is None:
             print_fail("No audio loaded.")
             messagebox.showwarning("Warning", "No audio loaded.")
             return
 
-        start_time = self.slider.get() if hasattr(self, "slider") else 0
-        self.playback_start_time = start_time
-        self.AudioProcessor.play_audio(start_time)
+        if self.AudioProcessor.is_playing():
+            self.AudioProcessor.pause_audio()
+            self.play_button.configure(text="Play")
+            return
+        if self.AudioProcessor.is_paused():
+            self.AudioProcessor.resume_audio()
+        else:
+            start_time = self.slider.get() if self.slider is not None else 0
+            if not self.AudioProcessor.play_audio(start_time):
+                messagebox.showwarning("Warning", "Error playing audio.")
+                return
+        self.play_button.configure(text="Pause")
+        self.update_playhead()
+
+    def update_playhead(self):
+        if self.playhead_job is not None:
+            self.root.after_cancel(self.playhead_job)
+            self.playhead_job = None
+        self.move_playhead(self.AudioProcessor.get_position())
+        if self.AudioProcessor.is_playing():
+            self.playhead_job = self.root.after(
+                PLAYHEAD_INTERVAL_MS, self.update_playhead
+            )
+        elif not self.AudioProcessor.is_paused():
+            self.play_button.configure(text="Play")
+
+    def move_playhead(self, position):
+        # cheap path used while playing: no logging, no throttling
+        self.slider_value = round(position, 2)
+        if self.slider is not None:
+            self.slider.set(self.slider_value)
+        if self.waveform_view is not None:
+            self.waveform_view.move_cursor(self.slider_value)
 
     def stop_audio(self):
-        rel_pos = self.AudioProcessor.stop_audio()
-        self.is_playing = False
-        abs_pos = self.playback_start_time + rel_pos
-        self.slider.set(abs_pos)
-        self.set_cursor(abs_pos)
-        print_info(f"Absolute position in audio: {abs_pos:.2f}s")
+        if self.playhead_job is not None:
+            self.root.after_cancel(self.playhead_job)
+            self.playhead_job = None
+        position = self.AudioProcessor.stop_audio()
+        self.play_button.configure(text="Play")
+        if self.slider is not None:
+            self.move_playhead(position)
+        print_info(f"Absolute position in audio: {position:.2f}s")
 
     def export_audio(self):
-        if (
-            not hasattr(self.AudioProcessor, "audio")
-            or self.AudioProcessor.audio is None
-        ):
+        if self.AudioProcessor.edits is None:
             print_fail("No audio loaded.")
             messagebox.showwarning("Warning", "No audio loaded.")
             return
@@ -240,19 +338,110 @@ class CuttedApp:
             filetypes=[
                 ("MP3 files", "*.mp3"),
                 ("WAV files", "*.wav"),
+                ("FLAC files", "*.flac"),
+                ("OGG files", "*.ogg"),
             ],
         )
 
         if save_path:
-            if save_path.lower().endswith(".wav"):
-                format = "wav"
-            elif save_path.lower().endswith(".mp3"):
-                format = "mp3"
-            else:
+            format = os.path.splitext(save_path)[1].lower().lstrip(".")
+            if format not in EXPORT_FORMATS:
                 format = "mp3"
 
-            self.AudioProcessor.export_audio(save_path, format)
-            print_success(f"Audio exported to {save_path}")
+            cancel = threading.Event()
+            spinner_win, progress = self.show_spinner(
+                "Exporting...", on_cancel=cancel.set
+            )
+
+            def report_progress(done, total):
+                self.root.after(
+                    0, lambda: self.set_spinner_progress(progress, done, total)
+                )
+
+            def finish(error=None, exported=False):
+                spinner_win.destroy()
+                if error is not None:
+                    print_fail(f"Export failed: {error}")
+                    messagebox.showerror("Error", f"Export failed: {error}")
+                elif exported:
+                    print_success(f"Audio exported to {save_path}")
+                else:
+                    print_warn("Export cancelled.")
+
+            def export_thread():
+                try:
+                    exported = self.AudioProcessor.export_audio(
+                        save_path, format, progress=report_progress, cancel=cancel
+                    )
+                except Exception as e:
+                    self.root.after(0, lambda error=e: finish(error=error))
+                    return
+                self.root.after(0, lambda: finish(exported=exported))
+
+            threading.Thread(target=export_thread, daemon=True).start()
+
+    def open_project(self, path):
+        try:
+            extra = self.AudioProcessor.open_project(path)
+        except (OSError, ValueError, KeyError) as e:
+            print_fail(f"Could not open project: {e}")
+            messagebox.showerror("Error", f"Could not open project: {e}")
+            return False
+
+        transcript = extra.get("transcript")
+        if transcript and self.AudioProcessor.source_hash:
+            self.transcript_cache.put(
+                self.transcript_cache.key(
+                    self.AudioProcessor.source_hash, transcript["model_size"]
+                ),
+                transcript["result"],
+            )
+        self.saved_chat = extra.get("chat")
+        if self.gemini is not None:
+            self.gemini.history = ChatHistory.from_dict(self.saved_chat or {})
+        return True
+
+    def save_project(self):
+        if self.AudioProcessor.edits is None:
+            print_fail("No audio loaded.")
+            messagebox.showwarning("Warning", "No audio loaded.")
+            return
+
+        save_path = customtkinter.filedialog.asksaveasfilename(
+            defaultextension=PROJECT_EXTENSION,
+            filetypes=[("Cutted projects", f"*{PROJECT_EXTENSION}")],
+        )
+        if not save_path:
+            return
+
+        extra = {"chat": self.saved_chat}
+        if self.gemini is not None:
+            extra["chat"] = self.gemini.history.to_dict()
+        # only look up a transcript if the content hash is already known,
+        # hashing a long file just to save would be slow
+        if self.AudioProcessor.source_hash:
+            cache_key = self.transcript_cache.key(
+                self.AudioProcessor.source_hash, WHISPER_MODEL_SIZE
+            )
+            result = self.transcript_cache.get(cache_key)
+            if result is not None:
+                extra["transcript"] = {
+                    "model_size": WHISPER_MODEL_SIZE,
+                    "result": result,
+                }
+        try:
+            complete = self.AudioProcessor.save_project(save_path, extra)
+        except (OSError, ValueError) as e:
+            print_fail(f"Could not save project: {e}")
+            messagebox.showerror("Error", f"Could not save project: {e}")
+            return
+        if not complete:
+            messagebox.showwarning(
+                "Warning",
+                "Noise reduction is not stored in projects. The project was saved "
+                "with your edits of the original audio; reduce the noise again "
+                "after opening it.",
+            )
 
     def open_settings(self):
         settings_window = customtkinter.CTkToplevel(self.root)
@@ -266,14 +455,13 @@ class CuttedApp:
         )
         use_history.pack(pady=10)
 
-    def send_prompt(self):
-        print(self.AudioProcessor.get_waveform_summary())
-        self.save_state()
+        save_button = customtkinter.CTkButton(
+            settings_window, text="Save project", command=self.save_project
+        )
+        save_button.pack(pady=10)
 
-        if (
-            not hasattr(self.AudioProcessor, "audio")
-            or self.AudioProcessor.audio is None
-        ):
+    def send_prompt(self):
+        if self.AudioProcessor.edits is None:
             print_fail("No audio loaded.")
             messagebox.showwarning("Warning", "No audio loaded.")
             return
@@ -282,99 +470,276 @@ class CuttedApp:
         if not text.strip():
             return
 
+        if self.gemini is None:
+            from .core import gemini
+
+            try:
+                self.gemini = gemini.GeminiClient()
+            except RuntimeError as e:
+                print_fail(str(e))
+                messagebox.showerror("Error", str(e))
+                return
+            if self.saved_chat:
+                self.gemini.history = ChatHistory.from_dict(self.saved_chat)
+
+        self.entry.delete(0, "end")
+        self.prompt_queue.append((text, self.slider_value))
+        if self.busy:
+            print_info(f"Prompt queued ({len(self.prompt_queue)} waiting)")
+            return
+        self.process_next_prompt()
+
+    def set_busy(self, busy):
+        self.busy = busy
+        self.cancel_button.configure(state="normal" if busy else "disabled")
+
+    def process_next_prompt(self):
+        if not self.prompt_queue:
+            self.set_busy(False)
+            return
+        self.set_busy(True)
+        text, cursor = self.prompt_queue.popleft()
+        tracing.start_prompt(text)
+        self.request_id += 1
+        request_id = self.request_id
+
         def after_transcribe(transcript):
-            full_prompt = (
-                f"You are a audio editing AI. You are controllable via natural language and editing a audio file. The audio file is {round(self.AudioProcessor.get_length(), 2)}s long. The cursor of the user is currently at {self.slider_value}s."
-                "\nHere is a the waveform samples of the audio. You can use them to determine silent parts, loud parts, silences, beats and much more.\nYou are forced to used these if the user requires you to cut out silent of quiet parts for example."
-                "\nAll of your tools should be enough to fullfill almost every task.\nNEVER ASK FOR CONFIRMATION FROM THE USER. DO EVERYTHING!"
-                f"\n{self.AudioProcessor.get_waveform_summary()}\n"
+            # skip prompts cancelled while transcribing
+            if request_id == self.request_id:
+                self.request_gemini(request_id, text, cursor, transcript)
+
+        if whisper_support and self.use_transcript_checkbox.get():
+            spinner_win, progress = self.show_spinner(
+                "Transcribing..." if self.whisper else "Loading Whisper model..."
             )
-            if transcript:
-                full_prompt += f"\nThis is a transcript with per word timestamps of the audio:\n{transcript}"
-                full_prompt += "\nThe transcript likely has issues. If you need infos about some words they might just be misspelled in the audio."
-            full_prompt += f"\n\nUser Prompt: {text}"
-            self.entry.delete(0, "end")
-
-            if self.use_audio_checkbox.get():
-                function_call, text_result = self.gemini.generate(
-                    full_prompt,
-                    audio_base64=self.AudioProcessor.get_audio_base64(),
-                    use_history=self.use_history_var.get(),
-                )
-            else:
-                function_call, text_result = self.gemini.generate(
-                    full_prompt, use_history=self.use_history_var.get()
-                )
 
-            if function_call:
-                print_info(f"Gemini called {function_call.name}")
-                if function_call.name == "cut_audio":
-                    print_info("Cut function called")
-                    args = function_call.args
-                    result = self.AudioProcessor.cut(args["start"], args["end"])
-                    if not result:
-                        messagebox.showerror("Error", "Please try again.")
-                if function_call.name == "change_volume":
-                    print_info("Change Volume function called")
-                    args = function_call.args
-                    result = self.AudioProcessor.change_volume(
-                        args["start"], args["end"], args["volume"]
-                    )
-                    if not result:
-                        messagebox.showerror("Error", "Please try again.")
-                self.update_plot()
-            elif text_result:
-                messagebox.showerror("Error", text_result.strip())
-            else:
-                messagebox.showerror("Error", "Gemini returned no data")
-                print_fail("Gemini returned no data")
+            def report_progress(done, total):
+                self.root.after(
+                    0, lambda: self.set_spinner_progress(progress, done, total)
+                )
 
-        if whisper_support and self.use_transcript_checkbox.get():
-            if not self.whisper:
-                messagebox.showinfo(
-                    "Info",
-                    "Loading Whisper model. This may take a few minutes depending on your internet connection. See the progress in your command line. If this window appears to be frozen, the transcription is running. Press OK to continue.",
+            def finish(result, error=None):
+                spinner_win.destroy()
+                if error is not None:
+                    print_fail(f"Transcription failed: {error}")
+                    messagebox.showerror("Error", f"Transcription failed: {error}")
+                    if request_id == self.request_id:
+                        tracing.end_prompt("failed")
+                        self.process_next_prompt()
+                    return
+                after_transcribe(
+                    format_transcript(self.AudioProcessor.remap_transcript(result))
                 )
-                self.whisper = transcribe.Whisper()
 
-            spinner_win, _ = self.show_spinner("Transcribing...")
+            def load_transcript():
+                # hashing a long file and loading the model both take seconds
+                cache_key = self.transcript_cache.key(
+                    self.AudioProcessor.get_source_hash(), WHISPER_MODEL_SIZE
+                )
+                result = self.transcript_cache.get(cache_key)
+                if result is not None:
+                    return result
+                if not self.whisper:
+                    print_info("Loading Whisper model...")
+                    from .core import transcribe
+
+                    self.whisper = transcribe.Whisper(WHISPER_MODEL_SIZE)
+                    self.transcribe_workers = transcribe.default_workers()
+                edits = self.AudioProcessor.edits
+                result, _ = self.whisper.transcribe_audio(
+                    edits.source,
+                    edits.frame_rate,
+                    workers=self.transcribe_workers,
+                    progress=report_progress,
+                )
+                self.transcript_cache.put(cache_key, result)
+                return result
 
             def transcribe_thread():
-                _, transcript = self.whisper.transcribe(self.AudioProcessor.audio_path)
-                self.root.after(
-                    0, lambda: (spinner_win.destroy(), after_transcribe(transcript))
-                )
+                try:
+                    result = load_transcript()
+                except Exception as e:
+                    self.root.after(0, lambda error=e: finish(None, error))
+                    return
+                self.root.after(0, lambda: finish(result))
 
             threading.Thread(target=transcribe_thread, daemon=True).start()
             return
 
         after_transcribe(None)
 
-    def save_state(self):
-        if (
-            hasattr(self.AudioProcessor, "audio")
-            and self.AudioProcessor.audio is not None
-        ):
-            self.last_states.append(
-                self.AudioProcessor.audio._spawn(self.AudioProcessor.audio.raw_data)
+    def request_gemini(self, request_id, text, cursor, transcript):
+        # the digest renders the whole edit, so the prompt is built off the
+        # Tk thread from a copy of the edit lists
+        edits = EditList.from_state(self.AudioProcessor.edits.snapshot())
+        version = self.AudioProcessor.edit_version
+        use_audio = self.use_audio_checkbox.get()
+        use_history = self.use_history_var.get()
+
+        async def generate():
+            full_prompt = await asyncio.to_thread(
+                build_prompt,
+                self.AudioProcessor,
+                text,
+                cursor,
+                transcript,
+                edits,
+                version,
             )
-            if len(self.last_states) > 10:
-                self.last_states.pop(0)
+            audio, mime_type = None, None
+            if use_audio:
+                # encoding is cached per edit, but the first one can take a while
+                audio, mime_type = await asyncio.to_thread(
+                    self.AudioProcessor.get_audio_upload
+                )
+            return await self.gemini.generate_async(
+                full_prompt,
+                audio=audio,
+                audio_mime_type=mime_type,
+                use_history=use_history,
+                request=text,
+            )
+
+        if self.event_loop is None:
+            from .core.event_loop import EventLoopThread
+
+            self.event_loop = EventLoopThread()
+
+        def done(future):
+            self.root.after(0, lambda: self.handle_gemini_result(request_id, future))
+
+        self.pending_request = self.event_loop.submit(
+            generate(),
+            timeout=GEMINI_TIMEOUT_SECONDS,
+            callback=done,
+        )
+
+    def handle_gemini_result(self, request_id, future):
+        if request_id != self.request_id or future.cancelled():
+            return
+        self.pending_request = None
+        try:
+            function_call, text_result = future.result()
+        except asyncio.TimeoutError:
+            tracing.end_prompt("timed out")
+            message = f"Gemini did not answer within {GEMINI_TIMEOUT_SECONDS}s."
+            print_fail(message)
+            messagebox.showerror("Error", message)
+        except Exception as e:
+            tracing.end_prompt("failed")
+            print_fail(f"Gemini request failed: {e}")
+            messagebox.showerror("Error", f"Gemini request failed: {e}")
+        else:
+            if function_call and function_call.name in BACKGROUND_TOOLS:
+                self.apply_in_background(request_id, function_call)
+                return
+            self.apply_gemini_result(function_call, text_result)
+        self.process_next_prompt()
+
+    def apply_in_background(self, request_id, function_call):
+        """Run a slow tool call on a thread behind a cancellable spinner."""
+        print_info(f"Gemini called {function_call.name}")
+        cancel = threading.Event()
+        self.effect_cancel = cancel
+        spinner_win, progress = self.show_spinner(
+            BACKGROUND_TOOLS[function_call.name], on_cancel=cancel.set
+        )
+
+        def report_progress(done, total):
+            self.root.after(0, lambda: self.set_spinner_progress(progress, done, total))
+
+        def finish(result, error=None):
+            spinner_win.destroy()
+            self.effect_cancel = None
+            if error is not None:
+                print_fail(f"{function_call.name} failed: {error}")
+                messagebox.showerror("Error", f"{function_call.name} failed: {error}")
+            self.update_plot()
+            # a cancelled prompt has already been ended and the queue cleared
+            if request_id == self.request_id:
+                tracing.end_prompt("done" if result else "failed")
+                self.process_next_prompt()
+
+        def worker():
+            try:
+                result = self.AudioProcessor.apply_function_call(
+                    function_call.name,
+                    function_call.args,
+                    progress=report_progress,
+                    cancel=cancel,
+                )
+            except Exception as e:
+                self.root.after(0, lambda error=e: finish(False, error))
+                return
+            self.root.after(0, lambda: finish(result))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def apply_gemini_result(self, function_call, text_result):
+        if function_call:
+            print_info(f"Gemini called {function_call.name}")
+            edited_range = (None, None)
+            result = self.AudioProcessor.apply_function_call(
+                function_call.name, function_call.args
+            )
+            if (
+                result
+                and function_call.name == "change_volume"
+                and function_call.args["start"]
+                and function_call.args.get("clip") is None
+            ):
+                edited_range = (
+                    min(function_call.args["start"]),
+                    max(function_call.args["end"]),
+                )
+            self.update_plot(*edited_range)
+            tracing.end_prompt("done" if result else "failed")
+            if not result:
+                messagebox.showerror("Error", "Please try again.")
+        elif text_result:
+            tracing.end_prompt("answered without a tool call")
+            messagebox.showerror("Error", text_result.strip())
+        else:
+            tracing.end_prompt("failed")
+            messagebox.showerror("Error", "Gemini returned no data")
+            print_fail("Gemini returned no data")
+
+    def cancel_prompt(self):
+        if not self.busy:
+            return
+        waiting = len(self.prompt_queue)
+        self.prompt_queue.clear()
+        if self.pending_request is not None:
+            self.pending_request.cancel()
+            self.pending_request = None
+        if self.effect_cancel is not None:
+            self.effect_cancel.set()
+        # results of the running request are ignored from now on
+        self.request_id += 1
+        self.set_busy(False)
+        tracing.end_prompt("cancelled")
+        print_warn(f"Prompt cancelled ({waiting} queued prompt(s) dropped)")
 
     def undo_last(self):
-        if len(self.last_states) == 0:
+        if self.AudioProcessor.undo() is None:
             print_warn("No previous states to undo")
             messagebox.showwarning("Warning", "No previous states to undo")
             return
+        self.update_plot()
 
-        self.AudioProcessor.audio = self.last_states.pop()
+    def redo_last(self):
+        if self.AudioProcessor.redo() is None:
+            print_warn("Nothing to redo")
+            messagebox.showwarning("Warning", "Nothing to redo")
+            return
         self.update_plot()
-        print_info("Undid last action")
 
     def run(self):
         self.root.mainloop()
 
 
-def main():
+def main(startup_profiler=None):
     app = CuttedApp()
+    if startup_profiler is not None:
+        app.root.after(0, startup_profiler.report)
     app.run()
@@ -0,0 +1,196 @@
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .core import tracing
+from .core.export import EXPORT_FORMATS, ExportTarget
+from .core.logger import print_fail, print_info
+
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".aac", ".flac", ".ogg", ".m4a")
+
+
+def collect_inputs(patterns):
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for name in sorted(os.listdir(pattern)):
+                if name.lower().endswith(AUDIO_EXTENSIONS):
+                    paths.append(os.path.join(pattern, name))
+        else:
+            paths.extend(sorted(glob.glob(pattern)))
+    # keep order, drop duplicates
+    return list(dict.fromkeys(paths))
+
+
+def load_calls(path):
+    with open(path, "r", encoding="utf-8") as f:
+        calls = json.load(f)
+    if isinstance(calls, dict):
+        calls = [calls]
+    return calls
+
+
+def output_names(paths):
+    """Output path of every input below the output directory, without extension.
+
+    Inputs keep their folders below the one they all share, so ``a/x.mp3`` and
+    ``b/x.mp3`` become ``a/x`` and ``b/x``. Inputs that differ only in their
+    extension keep it in the name (``x_wav``, ``x_mp3``).
+    """
+    absolute = [os.path.abspath(path) for path in paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in absolute])
+    names = {}
+    for path, full in zip(paths, absolute):
+        names[path] = os.path.splitext(os.path.relpath(full, root))
+    counts = Counter(os.path.normcase(name) for name, _ in names.values())
+    return {
+        path: (name if counts[os.path.normcase(name)] == 1 else f"{name}_{ext[1:]}")
+        for path, (name, ext) in names.items()
+    }
+
+
+def _output_targets(path, options, name=None):
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+    return [
+        ExportTarget(
+            os.path.join(options["output_dir"], f"{name}.{format}"),
+            format,
+            options["bitrate"],
+        )
+        for format in options["formats"]
+    ]
+
+
+def process_file(path, options, name=None):
+    started = time.perf_counter()
+    record = {"file": path}
+    # logging goes to stderr so stdout stays valid JSON lines
+    with contextlib.redirect_stdout(sys.stderr):
+        if options["trace"]:
+            # a fresh tracer, forked workers inherit the parent's events
+            tracing.disable()
+            tracing.enable(None)
+            tracing.start_prompt(os.path.basename(path))
+        try:
+            from .core.audio_processor import AudioProcessor
+            from .core.decode_cache import DecodeCache
+
+            processor = AudioProcessor()
+            processor.decode_cache = DecodeCache(options["cache_dir"])
+            # files already run in parallel, one process each
+            processor.denoise_workers = 1
+            processor.load_audio(path)
+
+            if options["calls"] is not None:
+                calls = options["calls"]
+            else:
+                from .core.gemini import GeminiClient, ScriptedClient
+                from .core.prompt import build_prompt
+
+                if options["fake_calls"] is not None:
+                    client = ScriptedClient(options["fake_calls"])
+                else:
+                    client = GeminiClient()
+                function_call, text_result = client.generate(
+                    build_prompt(processor, options["prompt"]), model=options["model"]
+                )
+                if not function_call:
+                    raise RuntimeError(
+                        (text_result or "Gemini returned no data").strip()
+                    )
+                calls = [{"name": function_call.name, "args": function_call.args}]
+
+            applied = []
+            for call in calls:
+                args = dict(call.get("args") or {})
+                if not processor.apply_function_call(call["name"], args):
+                    raise RuntimeError(f"{call['name']} failed")
+                applied.append({"name": call["name"], "args": args})
+
+            targets = _output_targets(path, options, name)
+            for target in targets:
+                if os.path.abspath(target.path) == os.path.abspath(path):
+                    raise RuntimeError("Output would overwrite the input file")
+                os.makedirs(os.path.dirname(target.path) or ".", exist_ok=True)
+            processor.export_many(targets)
+            record.update(
+                status="ok",
+                outputs=[target.path for target in targets],
+                calls=applied,
+                duration=processor.get_length(),
+            )
+        except Exception as e:
+            record.update(status="error", error=str(e))
+        if options["trace"]:
+            tracing.end_prompt(record["status"])
+            record["trace"] = tracing.tracer().take_events()
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def run(args):
+    paths = collect_inputs(args.inputs)
+    if not paths:
+        print_fail("No input files found.")
+        return 1
+    if args.fake_llm and not args.prompt:
+        print_fail("--fake-llm needs --prompt.")
+        return 1
+    unknown = [format for format in args.format if format not in EXPORT_FORMATS]
+    if unknown:
+        print_fail(f"Unsupported output format: {', '.join(unknown)}")
+        return 1
+
+    names = output_names(paths)
+    outputs = Counter(
+        os.path.normcase(f"{name}.{format}")
+        for name in names.values()
+        for format in args.format
+    )
+    clashes = sorted(output for output, count in outputs.items() if count > 1)
+    if clashes:
+        print_fail(f"Several inputs would be written to {', '.join(clashes)}")
+        return 1
+
+    options = {
+        "prompt": args.prompt,
+        "calls": load_calls(args.calls) if args.calls else None,
+        "fake_calls": load_calls(args.fake_llm) if args.fake_llm else None,
+        "model": args.model,
+        "output_dir": args.output_dir,
+        "formats": args.format,
+        "bitrate": args.bitrate,
+        "trace": tracing.tracer() is not None,
+        "cache_dir": args.cache_dir,
+    }
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    out = open(args.results, "w", encoding="utf-8") if args.results else sys.stdout
+    failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            futures = [
+                pool.submit(process_file, path, options, names[path]) for path in paths
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                if "trace" in record:
+                    tracing.tracer().add_events(record.pop("trace"))
+                if record["status"] != "ok":
+                    failed += 1
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                with contextlib.redirect_stdout(sys.stderr):
+                    print_info(
+                        f"[{done}/{len(paths)}] {record['file']}: {record['status']}"
+                    )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
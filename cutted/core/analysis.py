@@ -0,0 +1,170 @@
+import numpy as np
+
+from .dsp import to_mono_float
+
+FRAME_SECONDS = 0.05
+ANALYSIS_CHUNK_FRAMES = 1 << 20
+MIN_DB = -96.0
+NOISE_PERCENTILE = 10
+# high enough to land in speech even when most of the file is silent
+SPEECH_PERCENTILE = 95
+SPEECH_MARGIN_DB = 6.0
+MIN_DYNAMIC_RANGE_DB = 12.0
+
+
+def to_db(values):
+    return np.maximum(20 * np.log10(np.maximum(values, 1e-12)), MIN_DB)
+
+
+def frame_levels(edits, frame_seconds: float = FRAME_SECONDS, progress=None):
+    """Per-frame mean square and peak of the edited output, rendered in chunks.
+
+    ``progress`` is called with (frames done, total frames) after each chunk.
+    """
+    frame_length = max(1, round(frame_seconds * edits.frame_rate))
+    frame_count = -(-edits.frame_count // frame_length)
+    mean_squares = np.zeros(frame_count, dtype=np.float32)
+    peaks = np.zeros(frame_count, dtype=np.float32)
+    step = (ANALYSIS_CHUNK_FRAMES // frame_length) * frame_length or frame_length
+    for start in range(0, edits.frame_count, step):
+        mono = to_mono_float(edits.render(start, start + step), edits.sample_width)
+        first = start // frame_length
+        count = -(-len(mono) // frame_length)
+        padded = np.zeros(count * frame_length, dtype=np.float32)
+        padded[: len(mono)] = mono
+        frames = padded.reshape((count, frame_length))
+        mean_squares[first : first + count] = np.mean(np.square(frames), axis=1)
+        peaks[first : first + count] = np.abs(frames).max(axis=1)
+        if progress:
+            progress(start + len(mono), edits.frame_count)
+    return mean_squares, peaks
+
+
+def peak_level(edits):
+    """Largest absolute sample value of the edited output, rendered in chunks."""
+    peak = 0
+    for start in range(0, edits.frame_count, ANALYSIS_CHUNK_FRAMES):
+        chunk = edits.render(start, start + ANALYSIS_CHUNK_FRAMES)
+        if len(chunk):
+            # int64 so that abs() of the most negative sample does not wrap
+            peak = max(peak, int(np.abs(chunk.astype(np.int64)).max()))
+    return peak
+
+
+def find_regions(mask, frame_seconds: float, min_seconds: float = 0.0):
+    """Return (start, end) seconds of runs of True in ``mask``."""
+    if not len(mask):
+        return []
+    padded = np.concatenate([[False], mask, [False]])
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    regions = []
+    for start, end in zip(changes[0::2], changes[1::2]):
+        if (end - start) * frame_seconds >= min_seconds:
+            regions.append((start * frame_seconds, end * frame_seconds))
+    return regions
+
+
+def hysteresis_mask(values, enter, exit):
+    """Runs of ``values < exit`` that reach below ``enter`` at least once."""
+    candidate = values < exit
+    padded = np.concatenate([[False], candidate, [False]])
+    changes = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, ends = changes[0::2], changes[1::2]
+    below = np.concatenate([[0], np.cumsum(values < enter)])
+    keep = below[ends] - below[starts] > 0
+    mask = np.zeros(len(values), dtype=bool)
+    for start, end in zip(starts[keep], ends[keep]):
+        mask[start:end] = True
+    return mask
+
+
+def detect_silence(
+    frame_db,
+    frame_seconds: float = FRAME_SECONDS,
+    threshold_db: float = 10.0,
+    min_len: float = 0.5,
+    padding: float = 0.1,
+    hysteresis_db: float = 3.0,
+):
+    """Silent (start, end) seconds relative to the noise floor of ``frame_db``.
+
+    A region starts below ``noise floor + threshold_db`` (capped
+    ``SPEECH_MARGIN_DB`` under the speech level, so raising the threshold
+    never reaches into the loud parts) and lasts until the level rises
+    above that plus ``hysteresis_db``. Audio whose floor and speech level
+    are less than ``MIN_DYNAMIC_RANGE_DB`` apart has no silence. ``padding``
+    seconds of each region are left in place so speech is not clipped.
+    """
+    if not len(frame_db):
+        return []
+    noise_floor = float(np.percentile(frame_db, NOISE_PERCENTILE))
+    speech_level = float(np.percentile(frame_db, SPEECH_PERCENTILE))
+    if speech_level - noise_floor < MIN_DYNAMIC_RANGE_DB:
+        return []
+    enter = min(noise_floor + threshold_db, speech_level - SPEECH_MARGIN_DB)
+    mask = hysteresis_mask(frame_db, enter, enter + hysteresis_db)
+    regions = []
+    for start, end in find_regions(mask, frame_seconds, min_len):
+        start, end = start + padding, end - padding
+        if end > start:
+            regions.append((start, end))
+    return regions
+
+
+def detect_loud(
+    frame_db,
+    frame_seconds: float = FRAME_SECONDS,
+    threshold_db: float = 6.0,
+    min_len: float = 0.5,
+    hysteresis_db: float = 3.0,
+):
+    """Loud (start, end) seconds at least ``threshold_db`` above the median."""
+    if not len(frame_db):
+        return []
+    enter = float(np.median(frame_db)) + threshold_db
+    # mirror the levels so "loud" becomes "below a threshold"
+    mask = hysteresis_mask(-frame_db, -enter, -(enter - hysteresis_db))
+    return find_regions(mask, frame_seconds, min_len)
+
+
+def _format_regions(regions, max_regions):
+    text = ", ".join(f"{start:.2f}-{end:.2f}" for start, end in regions[:max_regions])
+    if len(regions) > max_regions:
+        text += f" (+{len(regions) - max_regions} more)"
+    return text or "none"
+
+
+def waveform_digest(
+    edits,
+    max_points: int = 300,
+    max_regions: int = 100,
+    min_region_seconds: float = 0.5,
+):
+    """Text summary of the edited audio with a size bounded by ``max_points``."""
+    mean_squares, peaks = frame_levels(edits)
+    if not len(mean_squares):
+        return "Waveform digest: audio is empty."
+
+    group = max(1, -(-len(mean_squares) // max_points))
+    edges = np.arange(0, len(mean_squares), group)
+    counts = np.diff(np.append(edges, len(mean_squares)))
+    window_rms = to_db(np.sqrt(np.add.reduceat(mean_squares, edges) / counts))
+    window_peak = to_db(np.maximum.reduceat(peaks, edges))
+
+    frame_db = to_db(np.sqrt(mean_squares))
+    noise_floor = float(np.percentile(frame_db, NOISE_PERCENTILE))
+    median = float(np.median(frame_db))
+    silent = detect_silence(frame_db, min_len=min_region_seconds, padding=0.0)
+    loud = detect_loud(frame_db, min_len=min_region_seconds)
+
+    window_seconds = group * FRAME_SECONDS
+    return (
+        f"Waveform digest ({len(edges)} windows of {window_seconds:.2f}s, levels in dBFS):\n"
+        f"RMS dB: {' '.join(f'{x:.0f}' for x in window_rms)}\n"
+        f"Peak dB: {' '.join(f'{x:.0f}' for x in window_peak)}\n"
+        f"Noise floor: {noise_floor:.1f} dBFS, median level: {median:.1f} dBFS\n"
+        f"Silent regions (within 10 dB of the noise floor for at least {min_region_seconds}s): "
+        f"{_format_regions(silent, max_regions)}\n"
+        f"Loud regions (6 dB above the median for at least {min_region_seconds}s): "
+        f"{_format_regions(loud, max_regions)}"
+    )
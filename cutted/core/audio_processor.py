@@ -1,56 +1,368 @@
 import base64
 import io
-import tkinter.messagebox as messagebox
 
 import numpy as np
-import pygame
-from matplotlib.figure import Figure
 from pydub import AudioSegment
-from pydub.utils import ratio_to_db
 
+from .analysis import (
+    detect_silence,
+    frame_levels,
+    peak_level,
+    to_db,
+    waveform_digest,
+)
+from .decode_cache import DecodeCache
+from .denoise import DEFAULT_STRENGTH, default_workers, denoise, noise_profile
+from .edit_list import EditList, normalize_ranges
+from .export import MIME_TYPES, ExportTarget, export_bytes, export_edits
+from .history import History
 from .logger import print_fail, print_info, print_success, print_warn
+from .peaks import PeakPyramid
+from .player import StreamPlayer
+from .timeline import Clip, Timeline
+from .tracing import traced
+from .transcript_cache import audio_hash, remap_transcript
+
+JOIN_FADE_SECONDS = 0.003
+# Gemini only needs speech-quality audio
+UPLOAD_TARGET = ExportTarget(None, "mp3", "32k", channels=1, frame_rate=16000)
 
 
 class AudioProcessor:
     def __init__(self):
         self.audio_path = None
-        self.audio = None
-        self.is_playing_var = False
-        self.play_thread = None
+        self.edits = None
+        self._rendered = None
+        self.peaks = None
+        self.source_hash = None
+        self.history = History()
+        self.player = StreamPlayer()
+        self.decode_cache = DecodeCache()
+        # the buffer decoded from audio_path, as opposed to replaced audio
+        self.file_source = None
+        # path -> ((size, mtime_ns), content hash) of saved or opened sources
+        self.file_hashes = {}
+        # (processed, original) sources, so projects can refer to the files
+        self.source_origins = []
+        self.edit_version = 0
+        self._upload = None
+        self._digest = None
+        self.denoise_workers = default_workers()
+
+    @property
+    def audio(self):
+        if self.edits is None:
+            return None
+        if self._rendered is None:
+            self._rendered = self.edits.to_segment()
+        return self._rendered
+
+    @audio.setter
+    def audio(self, segment):
+        self._replace_edits(
+            EditList.from_segment(segment) if segment is not None else None
+        )
 
-    def _init_pygame(self):
-        try:
-            pygame.mixer.pre_init(frequency=44100, size=-16, channels=2, buffer=1024)
-            pygame.mixer.init()
-            print_success("Pygame initialized")
-        except pygame.error as e:
-            print_warn(f"Pygame initialization warning: {e}")
-            messagebox.showwarning("Warning", f"Pygame initialization warning: {e}")
+    def _replace_edits(self, edits):
+        before = self.edits.snapshot() if self.edits is not None else None
+        self.edits = edits
+        self.edit_version += 1
+        if self.edits is not None:
+            self.edits.join_fade = self.edits.to_frame(JOIN_FADE_SECONDS)
+            if before is not None:
+                self.history.record("replace audio", before, self.edits.source)
+        self._rendered = None
+        self.peaks = None
+        self.source_hash = None
+
+    def _edited(self, operation, before):
+        self._rendered = None
+        self.edit_version += 1
+        self.history.record(operation, before, self.edits.source)
+
+    def _restore(self, state):
+        if self.edits is None or state.source is not self.edits.source:
+            self.peaks = None
+            self.source_hash = None
+        self.edits = EditList.from_state(state)
+        self._rendered = None
+        self.edit_version += 1
+
+    def undo(self):
+        if self.edits is None:
+            return None
+        operation, state = self.history.undo(self.edits.snapshot())
+        if state is not None:
+            self._restore(state)
+            print_info(f"Undid {operation}")
+        return operation
+
+    def redo(self):
+        if self.edits is None:
+            return None
+        operation, state = self.history.redo(self.edits.snapshot())
+        if state is not None:
+            self._restore(state)
+            print_info(f"Redid {operation}")
+        return operation
 
+    @traced()
     def load_audio(self, audio_path: str, volume: float = 1.0):
         self.audio_path = audio_path
-        self.audio = AudioSegment.from_file(self.audio_path)
-        self.audio = self.audio.apply_gain(ratio_to_db(volume))
+        try:
+            samples, frame_rate, sample_width = self.decode_cache.load(audio_path)
+            self._replace_edits(EditList(samples, frame_rate, sample_width))
+        except (OSError, ValueError, KeyError, RuntimeError) as e:
+            print_warn(f"Decode cache unavailable ({e}), decoding in memory")
+            self.audio = AudioSegment.from_file(self.audio_path)
+        self.file_source = self.edits.source
+        # no-op at unity gain, so the source is never copied
+        self.edits.apply_gain(0, self.edits.frame_count, volume)
+        self.history.clear()
+        self.source_origins = []
         print_info(f"Loaded {self.audio_path}")
 
-    def plot_audio(self):
-        if self.audio is None:
+    def _timeline(self):
+        source = self.edits.source
+        if isinstance(source, Timeline):
+            return source
+        return Timeline.from_buffer(
+            source,
+            self.edits.frame_rate,
+            self.edits.sample_width,
+            path=self.audio_path if source is self.file_source else None,
+            peaks=self.peaks.levels[0] if self.peaks is not None else None,
+        )
+
+    @traced()
+    def add_clip(self, audio_path: str):
+        """Append a file to the end of the timeline without decoding it yet."""
+        if self.edits is None:
+            self.load_audio(audio_path)
+            return True
+        try:
+            frame_rate, channels, sample_width, frame_count = self.decode_cache.info(
+                audio_path
+            )
+            clip = Clip(
+                audio_path,
+                frame_rate,
+                channels,
+                sample_width,
+                frame_count,
+                loader=lambda: self.decode_source(audio_path),
+            )
+        except (OSError, ValueError, KeyError, RuntimeError) as e:
+            print_warn(f"Could not probe {audio_path} ({e}), decoding in memory")
+            edits = EditList.from_segment(AudioSegment.from_file(audio_path))
+            clip = Clip(
+                audio_path,
+                edits.frame_rate,
+                edits.channels,
+                edits.sample_width,
+                len(edits.source),
+                samples=edits.source,
+            )
+        timeline = self._timeline().with_clip(clip)
+        before = self.edits.snapshot()
+        self.edits = EditList.from_state(before._replace(source=timeline))
+        self.edits.segments.append(timeline.spans()[-1])
+        self.peaks = None
+        self.source_hash = None
+        self._edited("add clip", before)
+        print_info(f"Added {audio_path} as clip {len(timeline.clips)}")
+        return True
+
+    def get_clips(self, edits=None):
+        """Clips with audio left as dicts of number, name and output seconds."""
+        edits = edits or self.edits
+        if edits is None or not isinstance(edits.source, Timeline):
+            return []
+        clips = []
+        timeline = edits.source
+        rate = edits.frame_rate
+        for number, (clip, (start, end)) in enumerate(
+            zip(timeline.clips, timeline.spans()), 1
+        ):
+            ranges = []
+            # cuts inside a clip leave it contiguous in the output
+            for lo, hi in edits.output_ranges(start, end):
+                if ranges and ranges[-1][1] == lo:
+                    ranges[-1] = (ranges[-1][0], hi)
+                else:
+                    ranges.append((lo, hi))
+            if ranges:
+                clips.append(
+                    {
+                        "clip": number,
+                        "name": clip.name,
+                        "ranges": [(lo / rate, hi / rate) for lo, hi in ranges],
+                    }
+                )
+        return clips
+
+    def _clip_ranges(self, clip):
+        """Output frame ranges of 1-based ``clip``, or None if there is no such clip."""
+        source = self.edits.source
+        if not isinstance(source, Timeline):
+            # a single file is clip 1
+            return [(0, self.edits.frame_count)] if clip == 1 else None
+        if not 1 <= clip <= len(source.clips):
+            return None
+        return self.edits.output_ranges(*source.spans()[clip - 1])
+
+    def _from_clip_time(self, ranges, seconds):
+        """Timeline seconds of ``seconds`` into the audio left of a clip."""
+        frame = self.edits.to_frame(seconds)
+        for start, end in ranges:
+            if frame < end - start:
+                return (start + frame) / self.edits.frame_rate
+            frame -= end - start
+        return ranges[-1][1] / self.edits.frame_rate if ranges else 0.0
+
+    def _clip_times(self, clip, times):
+        if clip is None:
+            return times
+        ranges = self._clip_ranges(int(clip))
+        if ranges is None:
+            print_fail(f"There is no clip {clip}.")
+            return None
+        return [self._from_clip_time(ranges, seconds) for seconds in times]
+
+    @traced()
+    def remove_clip(self, clip):
+        ranges = self._clip_ranges(int(clip))
+        if not ranges:
+            print_fail(f"Clip {clip} has no audio to remove.")
+            return False
+        print_info(f"Removing clip {clip}")
+        before = self.edits.snapshot()
+        self.edits.cut_ranges(ranges)
+        self._edited("remove clip", before)
+        return True
+
+    @traced()
+    def move_clip(self, clip, before_clip=None):
+        """Move all audio of ``clip`` in front of ``before_clip``, or to the end."""
+        source = self.edits.source
+        if not isinstance(source, Timeline) or not 1 <= int(clip) <= len(source.clips):
+            print_fail(f"There is no clip {clip}.")
+            return False
+        clip = int(clip)
+        moving = []
+        rest = []
+        for segment in self.edits.segments:
+            if source.clip_at(segment[0]) == clip - 1:
+                moving.append(segment)
+            else:
+                rest.append(segment)
+        if not moving:
+            print_fail(f"Clip {clip} has no audio to move.")
+            return False
+        position = len(rest)
+        if before_clip is not None:
+            targets = [
+                index
+                for index, segment in enumerate(rest)
+                if source.clip_at(segment[0]) == int(before_clip) - 1
+            ]
+            if not targets:
+                print_fail(f"Clip {before_clip} has no audio to move before.")
+                return False
+            position = targets[0]
+        print_info(
+            f"Moving clip {clip} "
+            + (
+                f"before clip {before_clip}"
+                if before_clip is not None
+                else "to the end"
+            )
+        )
+        before = self.edits.snapshot()
+        self.edits.segments = rest[:position] + moving + rest[position:]
+        self._edited("move clip", before)
+        return True
+
+    def decode_source(self, audio_path):
+        try:
+            return self.decode_cache.load(audio_path)[0]
+        except (OSError, ValueError, KeyError, RuntimeError) as e:
+            print_warn(f"Decode cache unavailable ({e}), decoding in memory")
+            return EditList.from_segment(AudioSegment.from_file(audio_path)).source
+
+    def file_backed(self, source):
+        """The source read from files that ``source`` was processed from, or None."""
+        while True:
+            if source is self.file_source and self.audio_path is not None:
+                return source
+            if isinstance(source, Timeline) and all(
+                clip.path is not None for clip in source.clips
+            ):
+                return source
+            source = next(
+                (
+                    original
+                    for processed, original in self.source_origins
+                    if processed is source
+                ),
+                None,
+            )
+            if source is None:
+                return None
+
+    def save_project(self, path, extra=None):
+        """Save the project; returns False if processed audio was left out."""
+        from .project import save_project
+
+        return save_project(self, path, extra)
+
+    def open_project(self, path):
+        from .project import load_project
+
+        return load_project(self, path)
+
+    def get_peaks(self, width, start=0, end=None):
+        if self.peaks is None:
+            source = self.edits.source
+            if isinstance(source, Timeline):
+                self.peaks = PeakPyramid.from_base(len(source), *source.peak_base())
+            else:
+                self.peaks = PeakPyramid(source, self.edits.sample_width)
+        return self.peaks.view(self.edits, width, start, end)
+
+    def get_source_hash(self):
+        if self.source_hash is None:
+            self.source_hash = audio_hash(self.edits.source, self.edits.frame_rate)
+        return self.source_hash
+
+    def remap_transcript(self, result):
+        return remap_transcript(result, self.edits)
+
+    @traced()
+    def plot_audio(self, width: int = 1000):
+        if self.edits is None:
             print_fail("No audio loaded.")
             return
 
-        samples = np.array(self.audio.get_array_of_samples())
-        if self.audio.channels == 2:
-            samples = samples.reshape((-1, 2))
-            samples = samples.mean(axis=1)
+        mins, maxs = self.get_peaks(width)
+        empty = not len(mins)
+        if empty:
+            # everything was cut, draw a flat line
+            mins = maxs = np.zeros(2, dtype=np.float32)
+        else:
+            scale = max(np.max(np.abs(mins)), np.max(np.abs(maxs)))
+            if scale > 0:
+                mins = mins / scale
+                maxs = maxs / scale
 
-        samples = samples / np.max(np.abs(samples))
+        times = np.linspace(0, self.edits.duration_seconds or 1.0, num=len(mins))
 
-        times = np.linspace(0, len(samples) / self.audio.frame_rate, num=len(samples))
+        from matplotlib.figure import Figure
 
         fig = Figure(figsize=(5, 4), facecolor="#242424")
         ax = fig.add_subplot()
         ax.set_facecolor("#242424")
-        (line,) = ax.plot(times, samples, color="cyan", linewidth=1.5)
+        ax.fill_between(times, mins, maxs, color="cyan", linewidth=1.5)
 
         # remove text
         ax.set_title("")
@@ -62,7 +374,8 @@ class AudioProcessor:
         fig.subplots_adjust(left=0, right=1, top=1, bottom=0)
 
         ax.set_xlim(times[0], times[-1])
-        ax.set_ylim(np.min(samples), np.max(samples))
+        if not empty:
+            ax.set_ylim(np.min(mins), np.max(maxs))
 
         buf = io.BytesIO()
         fig.savefig(buf, format="png", bbox_inches="tight", pad_inches=0)
@@ -72,59 +385,64 @@ class AudioProcessor:
 
         return fig, img_base64
 
-    def get_waveform_summary(self):
-        num_samples = round(self.get_length()) * 2
-        if self.audio is None:
+    def get_waveform_summary(self, max_points: int = 300, edits=None, version=None):
+        """Waveform digest of ``edits`` (the current edits by default).
+
+        The digest is reused while ``version`` (the edit version the edits
+        were taken at) stays the same, so queued prompts render it once.
+        """
+        if edits is None:
+            edits, version = self.edits, self.edit_version
+        if edits is None:
             return "No audio loaded."
-        samples = np.array(self.audio.get_array_of_samples())
-        if self.audio.channels == 2:
-            samples = samples.reshape((-1, 2))
-            samples = samples.mean(axis=1)
-        samples = samples / np.max(np.abs(samples))
-        indices = np.linspace(0, len(samples) - 1, num_samples).astype(int)
-        summary = samples[indices]
-        return f"Waveform samples (normalized, {num_samples} points):\n" + " ".join(
-            f"{x:.2f}" for x in summary
-        )
+        key = (version, max_points)
+        if self._digest is None or self._digest[0] != key:
+            self._digest = (key, waveform_digest(edits, max_points=max_points))
+        return self._digest[1]
 
     def get_length(self):
-        self.duration = self.audio.duration_seconds
+        self.duration = self.edits.duration_seconds
         self.duration = round(self.duration, 2)
         return self.duration
 
-    def cut(self, start, end):
-        if len(start) == len(end):
-            if len(start) == 1:
-                single_start = max(0, start[0])
-                single_end = max(0, end[0])
-                if single_end <= single_start:
-                    print_fail("End time must be greater than start time.")
-                    return False
-                print_info(f"Cutting from {single_start} to {single_end}")
-                start_ms = round(single_start * 1000)
-                end_ms = round(single_end * 1000)
-                self.audio = self.audio[:start_ms] + self.audio[end_ms:]
-                return True
-            else:
-                time_sets = list(zip(start, end))
-                subtract_time = 0
-                for single_start, single_end in time_sets:
-                    single_start = max(0, single_start - subtract_time)
-                    single_end = max(0, single_end - subtract_time)
-                    if single_end <= single_start:
-                        print_fail("End time must be greater than start time.")
-                        continue
-                    print_info(f"Cutting from {single_start} to {single_end}")
-                    start_ms = round(single_start * 1000)
-                    end_ms = round(single_end * 1000)
-                    self.audio = self.audio[:start_ms] + self.audio[end_ms:]
-                    subtract_time += single_end - single_start
-                return True
-        else:
+    @traced()
+    def cut(self, start, end, clip=None):
+        if len(start) != len(end):
+            return False
+        if clip is not None:
+            times = self._clip_times(clip, list(start) + list(end))
+            if times is None:
+                return False
+            start, end = times[: len(start)], times[len(start) :]
+
+        frame_count = self.edits.frame_count
+        ranges = normalize_ranges(
+            [self.edits.to_frame(single_start) for single_start in start],
+            [self.edits.to_frame(single_end) for single_end in end],
+            frame_count,
+        )
+        if not ranges:
+            print_fail("End time must be greater than start time.")
             return False
 
-    def change_volume(self, start, end, volume):
+        for start_frame, end_frame in ranges:
+            print_info(
+                f"Cutting from {start_frame / self.edits.frame_rate} to {end_frame / self.edits.frame_rate}"
+            )
+        before = self.edits.snapshot()
+        self.edits.cut_ranges(ranges)
+        self._edited("cut", before)
+        return True
+
+    @traced()
+    def change_volume(self, start, end, volume, ramp: float = 0.01, clip=None):
         if len(start) == len(end) == len(volume):
+            if clip is not None:
+                times = self._clip_times(clip, list(start) + list(end))
+                if times is None:
+                    return False
+                start, end = times[: len(start)], times[len(start) :]
+            before = self.edits.snapshot()
             time_sets = list(zip(start, end, volume))
             for single_start, single_end, single_volume in time_sets:
                 if single_end <= single_start:
@@ -133,42 +451,192 @@ class AudioProcessor:
                 print_info(
                     f"Changing volume of {single_start} - {single_end} to {str(single_volume)}"
                 )
-
-                start_ms = round(single_start * 1000)
-                end_ms = round(single_end * 1000)
-                part1 = self.audio[:start_ms]
-                part2 = self.audio[start_ms:end_ms]
-                part3 = self.audio[end_ms:]
-
-                part2 = part2.apply_gain(ratio_to_db(single_volume))
-
-                self.audio = part1 + part2 + part3
+                self.edits.apply_gain(
+                    self.edits.to_frame(single_start),
+                    self.edits.to_frame(single_end),
+                    single_volume,
+                    ramp=self.edits.to_frame(ramp),
+                )
+            if len(self.edits.gains) > len(before.gains):
+                self._edited("volume change", before)
+            else:
+                print_info("Volume unchanged.")
             return True
         else:
             return False
 
-    def play_audio(self, start_time=0):
-        if self.audio is None:
-            print_fail("No audio loaded.")
+    @traced()
+    def remove_silence(
+        self,
+        threshold_db: float = 10.0,
+        min_len: float = 0.5,
+        padding: float = 0.1,
+        progress=None,
+        cancel=None,
+    ):
+        mean_squares, _ = frame_levels(self.edits, progress=progress)
+        if cancel is not None and cancel.is_set():
+            print_warn("Silence removal cancelled.")
             return False
-
+        regions = detect_silence(
+            to_db(np.sqrt(mean_squares)),
+            threshold_db=threshold_db,
+            min_len=min_len,
+            padding=padding,
+        )
+        if not regions:
+            print_info("No silence found.")
+            return True
+        print_info(f"Removing {len(regions)} silent region(s)")
+        return self.cut([start for start, _ in regions], [end for _, end in regions])
+
+    @traced()
+    def reduce_noise(
+        self,
+        noise_start=None,
+        noise_end=None,
+        strength: float = DEFAULT_STRENGTH,
+        progress=None,
+        cancel=None,
+    ):
+        """Spectral-gate the audio against a noise profile.
+
+        The profile comes from ``noise_start``-``noise_end`` (output seconds)
+        if given, else from the quietest parts. Only source frames still in
+        the edit are processed; the result replaces the source under the
+        same segments, so it is undone like any other edit.
+        """
+        before = self.edits.snapshot()
+        source = before.source
+        ranges = normalize_ranges(
+            [start for start, _ in before.segments],
+            [end for _, end in before.segments],
+            len(source),
+        )
+        noise_ranges = None
+        if noise_start is not None and noise_end is not None:
+            if noise_end <= noise_start:
+                print_fail("End time must be greater than start time.")
+                return False
+            noise_ranges = self.edits.source_ranges(
+                self.edits.to_frame(noise_start), self.edits.to_frame(noise_end)
+            )
+        strength = min(max(float(strength), 0.0), 1.0)
         try:
-            self.stop_audio()
+            threshold = noise_profile(
+                source,
+                before.sample_width,
+                before.frame_rate,
+                ranges,
+                noise_ranges,
+            )
+        except ValueError as e:
+            print_fail(str(e))
+            return False
 
-            start_ms = int(start_time * 1000)
-            audio_segment = self.audio[start_ms:]
+        print_info(
+            f"Reducing noise at strength {strength} on {self.denoise_workers} worker(s)"
+        )
+        cleaned = denoise(
+            source,
+            before.sample_width,
+            before.frame_rate,
+            ranges,
+            threshold,
+            strength=strength,
+            workers=self.denoise_workers,
+            progress=progress,
+            cancel=cancel,
+        )
+        if cleaned is None:
+            print_warn("Noise reduction cancelled.")
+            return False
+        if self.edits.source is not source:
+            print_warn("The audio was replaced during noise reduction.")
+            return False
+        if isinstance(source, Timeline):
+            cleaned = source.with_samples(cleaned)
+        self.source_origins.append((cleaned, source))
+
+        current = self.edits.snapshot()
+        self.edits = EditList.from_state(current._replace(source=cleaned))
+        self.peaks = None
+        self.source_hash = None
+        self._edited("noise reduction", current)
+        return True
+
+    def apply_function_call(self, name, args, progress=None, cancel=None):
+        args = args or {}
+        if name == "cut_audio":
+            print_info("Cut function called")
+            return self.cut(args["start"], args["end"], clip=args.get("clip"))
+        if name == "change_volume":
+            print_info("Change Volume function called")
+            return self.change_volume(
+                args["start"], args["end"], args["volume"], clip=args.get("clip")
+            )
+        if name == "remove_silence":
+            print_info("Remove Silence function called")
+            return self.remove_silence(
+                threshold_db=args.get("threshold_db", 10.0),
+                min_len=args.get("min_len", 0.5),
+                progress=progress,
+                cancel=cancel,
+            )
+        if name == "reduce_noise":
+            print_info("Reduce Noise function called")
+            return self.reduce_noise(
+                args.get("noise_start"),
+                args.get("noise_end"),
+                args.get("strength", DEFAULT_STRENGTH),
+                progress=progress,
+                cancel=cancel,
+            )
+        if name == "remove_clip":
+            print_info("Remove Clip function called")
+            return self.remove_clip(args["clip"])
+        if name == "move_clip":
+            print_info("Move Clip function called")
+            return self.move_clip(args["clip"], args.get("before"))
+        print_fail(f"Unknown function {name}")
+        return False
+
+    def fade(self, start, end, fade_in=True, shape="equal_power"):
+        if end <= start:
+            print_fail("End time must be greater than start time.")
+            return False
+        print_info(f"Fading {'in' if fade_in else 'out'} from {start} to {end}")
+        before = self.edits.snapshot()
+        self.edits.fade(
+            self.edits.to_frame(start), self.edits.to_frame(end), fade_in, shape
+        )
+        self._edited("fade", before)
+        return True
 
-            audio_segment = audio_segment.set_frame_rate(22050)
-            audio_segment = audio_segment.set_channels(2)
-            audio_segment = audio_segment.set_sample_width(2)
+    def normalize(self, peak_db: float = -1.0):
+        if self.edits is None:
+            print_fail("No audio loaded.")
+            return False
+        peak = peak_level(self.edits)
+        if peak == 0:
+            print_warn("Audio is silent, nothing to normalize.")
+            return False
+        full_scale = 2 ** (8 * self.edits.sample_width - 1)
+        factor = full_scale * 10 ** (peak_db / 20) / peak
+        print_info(f"Normalizing to {peak_db} dBFS (gain {factor:.2f})")
+        before = self.edits.snapshot()
+        self.edits.apply_gain(0, self.edits.frame_count, factor)
+        self._edited("normalize", before)
+        return True
 
-            audio_data = io.BytesIO()
-            audio_segment.export(audio_data, format="wav")
-            audio_data.seek(0)
+    def play_audio(self, start_time=0):
+        if self.edits is None:
+            print_fail("No audio loaded.")
+            return False
 
-            pygame.mixer.music.load(audio_data)
-            pygame.mixer.music.play()
-            self.is_playing_var = True
+        try:
+            start_frame = min(self.edits.to_frame(start_time), self.edits.frame_count)
+            self.player.play(self.edits, start_frame)
 
             print_success(f"Playing audio from {start_time}s")
             return True
@@ -177,46 +645,65 @@ class AudioProcessor:
             print_fail(f"Error playing audio: {e}")
             return False
 
+    def pause_audio(self):
+        self.player.pause()
+        print_info(f"Audio paused at {self.get_position():.2f}s")
+
+    def resume_audio(self):
+        self.player.resume()
+        print_info(f"Audio resumed at {self.get_position():.2f}s")
+
     def stop_audio(self):
         try:
-            if pygame.mixer.get_init():
-                pos_ms = pygame.mixer.music.get_pos()
-                pos_sec = pos_ms / 1000 if pos_ms >= 0 else 0
-                pygame.mixer.music.stop()
-                self.is_playing_var = False
-                print_info(f"Audio playback stopped at {pos_sec:.2f}s")
-                return pos_sec
+            pos_sec = self.player.stop()
+            print_info(f"Audio playback stopped at {pos_sec:.2f}s")
+            return pos_sec
         except Exception as e:
             print_warn(f"Error stopping audio: {e}")
             return 0
 
+    def get_position(self):
+        return self.player.position()
+
     def is_playing(self):
-        try:
-            if pygame.mixer.get_init():
-                return pygame.mixer.music.get_busy()
-            return False
-        except Exception as e:
-            print_warn(f"An error occured while checking playing status: {e}")
-            return False
+        return self.player.is_playing()
+
+    def is_paused(self):
+        return self.player.is_paused()
 
     def get_audio_info(self):
-        if self.audio is None:
+        if self.edits is None:
             return None
 
         return {
             "duration": self.get_length(),
-            "channels": self.audio.channels,
-            "frame_rate": self.audio.frame_rate,
-            "sample_width": self.audio.sample_width,
+            "channels": self.edits.channels,
+            "frame_rate": self.edits.frame_rate,
+            "sample_width": self.edits.sample_width,
         }
 
-    def export_audio(self, path, format: str = "mp3"):
-        self.audio.export(path, format=format)
-
-    def get_audio_base64(self):
-        buffer = io.BytesIO()
-        self.audio.export(buffer, format="mp3")
-        buffer.seek(0)
-        audio_bytes = buffer.read()
-        audio_base64 = base64.b64encode(audio_bytes)
-        return audio_base64
+    def export_audio(
+        self, path, format: str = "mp3", bitrate=None, progress=None, cancel=None
+    ):
+        return self.export_many([ExportTarget(path, format, bitrate)], progress, cancel)
+
+    @traced("export")
+    def export_many(self, targets, progress=None, cancel=None):
+        # copy the edit list so edits made during a background export don't leak in
+        edits = EditList.from_state(self.edits.snapshot())
+        return export_edits(edits, targets, progress=progress, cancel=cancel)
+
+    @traced("audio_upload")
+    def get_audio_upload(self):
+        """Compact encoding of the current audio for Gemini as (bytes, mime type).
+
+        The result is reused until the next edit.
+        """
+        version = self.edit_version
+        if self._upload is None or self._upload[0] != version:
+            edits = EditList.from_state(self.edits.snapshot())
+            self._upload = (version, export_bytes(edits, UPLOAD_TARGET))
+            print_info(
+                f"Encoded {len(self._upload[1]) / 1024:.0f} KiB of audio for upload"
+            )
+        return self._upload[1], MIME_TYPES[UPLOAD_TARGET.format]
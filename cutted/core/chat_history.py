@@ -0,0 +1,109 @@
+import json
+from collections import Counter
+from typing import NamedTuple, Optional
+
+HISTORY_TOKEN_BUDGET = 2000
+CHARS_PER_TOKEN = 4
+MAX_RECORD_CHARS = 500
+
+
+def estimate_tokens(text: str):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _clip(text: str):
+    if len(text) <= MAX_RECORD_CHARS:
+        return text
+    return text[: MAX_RECORD_CHARS - 3] + "..."
+
+
+class ChatTurn(NamedTuple):
+    request: str
+    call: Optional[str]
+    text: Optional[str]
+
+
+class ChatHistory:
+    """Compact record of earlier turns, bounded by an estimated token budget.
+
+    Turns keep only the user's request and the tool call or reply that
+    came back, never the prompt with the waveform digest, which is resent
+    fresh every turn. Turns that no longer fit are folded into a one-line
+    count of the tool calls they made.
+    """
+
+    def __init__(self, max_tokens: int = HISTORY_TOKEN_BUDGET):
+        self.max_tokens = max_tokens
+        self.turns = []
+        self.earlier_turns = 0
+        self.earlier_calls = Counter()
+
+    def clear(self):
+        self.turns = []
+        self.earlier_turns = 0
+        self.earlier_calls = Counter()
+
+    def to_dict(self):
+        return {
+            "turns": [list(turn) for turn in self.turns],
+            "earlier_turns": self.earlier_turns,
+            "earlier_calls": dict(self.earlier_calls),
+        }
+
+    @classmethod
+    def from_dict(cls, data, max_tokens: int = HISTORY_TOKEN_BUDGET):
+        history = cls(max_tokens)
+        history.turns = [ChatTurn(*turn) for turn in data.get("turns", [])]
+        history.earlier_turns = data.get("earlier_turns", 0)
+        history.earlier_calls = Counter(data.get("earlier_calls", {}))
+        history._enforce_budget()
+        return history
+
+    def add(self, request: str, function_call=None, text: Optional[str] = None):
+        call = None
+        if function_call is not None:
+            args = json.dumps(dict(function_call.args or {}), default=str)
+            call = f"{function_call.name}({args})"
+        self.turns.append(
+            ChatTurn(_clip(request), call and _clip(call), text and _clip(text.strip()))
+        )
+        self._enforce_budget()
+
+    def summary(self):
+        if not self.earlier_turns:
+            return None
+        calls = ", ".join(
+            f"{count}x {name}" for name, count in sorted(self.earlier_calls.items())
+        )
+        return (
+            f"Summary of {self.earlier_turns} earlier request(s): "
+            f"{calls or 'no tools were called'}."
+        )
+
+    def records(self):
+        """The history as alternating ("user", text) and ("model", text) pairs."""
+        records = []
+        summary = self.summary()
+        for index, turn in enumerate(self.turns):
+            request = f"Earlier request: {turn.request}"
+            if index == 0 and summary:
+                request = f"{summary}\n{request}"
+            reply = []
+            if turn.text:
+                reply.append(turn.text)
+            if turn.call:
+                reply.append(f"Called {turn.call}")
+            records.append(("user", request))
+            records.append(("model", "\n".join(reply) or "No answer."))
+        return records
+
+    def tokens(self):
+        return sum(estimate_tokens(text) for _, text in self.records())
+
+    def _enforce_budget(self):
+        # the latest turn is always kept
+        while len(self.turns) > 1 and self.tokens() > self.max_tokens:
+            turn = self.turns.pop(0)
+            self.earlier_turns += 1
+            if turn.call:
+                self.earlier_calls[turn.call.split("(", 1)[0]] += 1
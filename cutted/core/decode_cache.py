@@ -0,0 +1,239 @@
+import hashlib
+import os
+import struct
+import subprocess
+
+import numpy as np
+from pydub import AudioSegment
+from pydub.utils import mediainfo_json
+
+from .edit_list import SAMPLE_DTYPES
+from .logger import print_info, print_warn
+from .tracing import traced
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cutted", "decoded")
+CACHE_ENV = "CUTTED_DECODE_CACHE"
+MAX_CACHE_BYTES = 8 * 1024 * 1024 * 1024
+READ_CHUNK_BYTES = 1 << 20
+# magic, frame rate, channels, sample width, frame count; data starts at 64
+HEADER = struct.Struct("<8sIHHQ")
+HEADER_SIZE = 64
+MAGIC = b"CUTPCM01"
+# ffprobe reports fltp for most lossy codecs, which decode fine as 16 bit
+LOSSY_CODECS = ("mp3", "mp4", "aac", "webm", "ogg", "vorbis", "opus")
+
+
+def _audio_stream(path):
+    info = mediainfo_json(path)
+    streams = [stream for stream in info["streams"] if stream["codec_type"] == "audio"]
+    if not streams:
+        raise ValueError(f"No audio stream in {path}")
+    return streams[0]
+
+
+def probe(path):
+    """Return (frame_rate, channels, sample_width) of the first audio stream."""
+    return _stream_format(_audio_stream(path))
+
+
+def _stream_format(stream):
+    bits = int(stream.get("bits_per_sample") or stream.get("bits_per_raw_sample") or 0)
+    if stream.get("codec_name") in LOSSY_CODECS or 0 < bits <= 16:
+        sample_width = 2
+    else:
+        sample_width = 4
+    return int(stream["sample_rate"]), int(stream["channels"]), sample_width
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        magic, frame_rate, channels, sample_width, frame_count = HEADER.unpack(
+            f.read(HEADER.size)
+        )
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a decoded audio cache file")
+    return frame_rate, channels, sample_width, frame_count
+
+
+class DecodeCache:
+    """Decoded PCM on disk, opened with ``np.memmap`` instead of read into memory.
+
+    Entries are keyed by path, modification time and size. Files are
+    decoded once by streaming FFmpeg output to disk; later loads only map
+    the file, so resident memory grows with the pages actually read.
+    Without a ``directory``, ``CUTTED_DECODE_CACHE`` or ``CACHE_DIR`` is used.
+    """
+
+    def __init__(self, directory: str = None, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory or os.getenv(CACHE_ENV) or CACHE_DIR
+        self.max_bytes = max_bytes
+
+    def key(self, audio_path):
+        stat = os.stat(audio_path)
+        payload = f"{os.path.abspath(audio_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pcm")
+
+    def load(self, audio_path):
+        """Return (samples, frame_rate, sample_width), decoding on a miss."""
+        path = self._path(self.key(audio_path))
+        if os.path.exists(path):
+            try:
+                loaded = self._open(path)
+                os.utime(path)
+                print_info("Using cached decode")
+                return loaded
+            except (OSError, ValueError) as e:
+                print_warn(f"Could not read decoded audio cache: {e}")
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        try:
+            self._decode(audio_path, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._evict(keep=path)
+        return self._open(path)
+
+    def info(self, audio_path):
+        """(frame_rate, channels, sample_width, frame_count) without decoding.
+
+        Exact for files already in the cache; otherwise the frame count is
+        estimated from the duration FFprobe reports.
+        """
+        path = self._path(self.key(audio_path))
+        if os.path.exists(path):
+            try:
+                return read_header(path)
+            except (OSError, ValueError, struct.error) as e:
+                print_warn(f"Could not read decoded audio cache: {e}")
+        stream = _audio_stream(audio_path)
+        frame_rate, channels, sample_width = _stream_format(stream)
+        # decoders drop the priming samples that start_time accounts for
+        duration = float(stream["duration"]) - float(stream.get("start_time") or 0)
+        frame_count = round(max(duration, 0.0) * frame_rate)
+        return frame_rate, channels, sample_width, frame_count
+
+    def _open(self, path):
+        frame_rate, channels, sample_width, frame_count = read_header(path)
+        dtype = SAMPLE_DTYPES[sample_width]
+        if frame_count == 0:
+            samples = np.zeros((0, channels), dtype=dtype)
+        else:
+            samples = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=HEADER_SIZE,
+                shape=(frame_count, channels),
+            )
+        return samples, frame_rate, sample_width
+
+    @traced("decode")
+    def _decode(self, audio_path, out_path):
+        frame_rate, channels, sample_width = probe(audio_path)
+        pcm = "s16le" if sample_width == 2 else "s32le"
+        command = [AudioSegment.converter, "-v", "error", "-i", audio_path]
+        command += ["-vn", "-f", pcm, "-acodec", f"pcm_{pcm}", "-"]
+        written = 0
+        with open(out_path, "wb") as out:
+            out.write(bytes(HEADER_SIZE))
+            process = subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            # stderr is drained after stdout; -v error keeps it small
+            while True:
+                data = process.stdout.read(READ_CHUNK_BYTES)
+                if not data:
+                    break
+                out.write(data)
+                written += len(data)
+            stderr = process.stderr.read().decode("utf-8", "replace").strip()
+            if process.wait() != 0:
+                raise RuntimeError(f"Decoding {audio_path} failed: {stderr}")
+            frame_count = written // (channels * sample_width)
+            out.seek(0)
+            out.write(
+                HEADER.pack(MAGIC, frame_rate, channels, sample_width, frame_count)
+            )
+        print_info(f"Decoded {audio_path} into the cache")
+
+    def _evict(self, keep=None):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".pcm") or path == keep:
+                continue
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if keep is not None:
+            total += os.path.getsize(keep)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+
+def resident_bytes(samples):
+    """Bytes of ``samples`` held in memory rather than mapped from disk.
+
+    An unloaded ``LazySource`` holds none.
+    """
+    if isinstance(samples, LazySource):
+        if not samples.loaded:
+            return 0
+        samples = samples.load()
+    # mapped from disk, the pages can be dropped at any time
+    return 0 if isinstance(samples, np.memmap) else samples.nbytes
+
+
+class LazySource:
+    """Stands in for a decoded source buffer until its samples are first read.
+
+    Shape, dtype and size are known up front, so edit lists, history and
+    saved peaks work without decoding. Any other access calls ``loader``
+    once and forwards to the array it returns.
+    """
+
+    ndim = 2
+
+    def __init__(self, loader, frame_count, channels, sample_width):
+        self._loader = loader
+        self._samples = None
+        self.shape = (frame_count, channels)
+        self.dtype = np.dtype(SAMPLE_DTYPES[sample_width])
+        self.nbytes = frame_count * channels * self.dtype.itemsize
+
+    @property
+    def loaded(self):
+        return self._samples is not None
+
+    def load(self):
+        if self._samples is None:
+            samples = self._loader()
+            if samples.shape != self.shape:
+                print_warn(
+                    f"Decoded audio has shape {samples.shape}, expected {self.shape}"
+                )
+            self._samples = samples
+        return self._samples
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __array__(self, dtype=None, copy=None):
+        samples = self.load()
+        return samples if dtype is None else samples.astype(dtype)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
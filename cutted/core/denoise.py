@@ -0,0 +1,252 @@
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .dsp import full_scale
+from .tracing import traced
+
+FFT_SECONDS = 0.046
+CHUNK_SECONDS = 30.0
+# windows per FFT length; the periodic Hann window sums to a constant at 75%
+OVERLAP = 4
+N_STD = 1.5
+QUIET_FRACTION = 0.1
+MAX_PROFILE_FRAMES = 2048
+LEVEL_CHUNK_BLOCKS = 1024
+DEFAULT_STRENGTH = 0.8
+SMOOTH_BINS = 5
+SMOOTH_FRAMES = 7
+EPSILON = 1e-10
+
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+
+def fft_size(frame_rate: int):
+    """Power of two FFT length close to ``FFT_SECONDS``."""
+    return 1 << max(8, round(np.log2(frame_rate * FFT_SECONDS)))
+
+
+def _window(n_fft):
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n_fft) / n_fft)).astype(np.float32)
+
+
+def _to_float(samples, sample_width):
+    return samples.astype(np.float32) / full_scale(sample_width)
+
+
+def _spectra_db(frames, window):
+    """dB magnitude spectra of (frames, n_fft) float blocks."""
+    spectrum = np.fft.rfft(frames * window, axis=-1)
+    return 20 * np.log10(np.abs(spectrum) + EPSILON)
+
+
+def _block_levels(samples, sample_width, start, end, n_fft):
+    """Mean square of every whole ``n_fft`` block in [start, end)."""
+    count = (end - start) // n_fft
+    levels = np.empty(count, dtype=np.float32)
+    for first in range(0, count, LEVEL_CHUNK_BLOCKS):
+        last = min(first + LEVEL_CHUNK_BLOCKS, count)
+        chunk = samples[start + first * n_fft : start + last * n_fft]
+        blocks = _to_float(np.asarray(chunk), sample_width).reshape((last - first, -1))
+        levels[first:last] = np.mean(np.square(blocks), axis=1)
+    return levels
+
+
+def noise_profile(samples, sample_width, frame_rate, ranges, noise_ranges=None):
+    """Per-channel noise threshold in dB for every FFT bin.
+
+    Without ``noise_ranges`` the profile comes from the quietest
+    ``QUIET_FRACTION`` of non-silent FFT-sized blocks in ``ranges``;
+    otherwise from blocks inside ``noise_ranges``. Ranges are source frames.
+    """
+    n_fft = fft_size(frame_rate)
+    starts = []
+    levels = []
+    for start, end in noise_ranges or ranges:
+        count = (end - start) // n_fft
+        starts.append(start + n_fft * np.arange(count))
+        if noise_ranges is None:
+            levels.append(_block_levels(samples, sample_width, start, end, n_fft))
+    starts = np.concatenate(starts) if starts else np.zeros(0, dtype=int)
+    if not len(starts):
+        raise ValueError("Not enough audio to estimate a noise profile")
+
+    if noise_ranges is None:
+        levels = np.concatenate(levels)
+        # digital silence would put the threshold below any real noise
+        audible = np.flatnonzero(levels > 0)
+        order = (
+            audible[np.argsort(levels[audible])] if len(audible) else np.argsort(levels)
+        )
+        count = max(1, int(len(starts) * QUIET_FRACTION))
+        chosen = np.sort(order[: min(count, MAX_PROFILE_FRAMES)])
+    else:
+        step = max(1, len(starts) // MAX_PROFILE_FRAMES)
+        chosen = np.arange(0, len(starts), step)
+
+    blocks = np.stack(
+        [
+            _to_float(np.asarray(samples[start : start + n_fft]), sample_width)
+            for start in starts[chosen]
+        ]
+    )
+    # (blocks, n_fft, channels) -> (channels, blocks, n_fft)
+    spectra = _spectra_db(np.moveaxis(blocks, 2, 0), _window(n_fft))
+    return spectra.mean(axis=1) + N_STD * spectra.std(axis=1)
+
+
+def _smooth(values, width, axis):
+    """Moving average of ``width`` along ``axis``, same shape as ``values``."""
+    if width <= 1:
+        return values
+    pad = [(0, 0)] * values.ndim
+    pad[axis] = (width // 2, width - 1 - width // 2)
+    padded = np.pad(values, pad, mode="edge")
+    summed = np.cumsum(padded, axis=axis, dtype=np.float32)
+    summed = np.concatenate(
+        [np.zeros_like(np.take(summed, [0], axis=axis)), summed], axis=axis
+    )
+    length = values.shape[axis]
+    upper = np.take(summed, np.arange(width, width + length), axis=axis)
+    lower = np.take(summed, np.arange(length), axis=axis)
+    return (upper - lower) / width
+
+
+def gate(signal, threshold, strength, n_fft):
+    """Spectral-gate one channel of float ``signal`` with an STFT.
+
+    Bins below ``threshold`` dB are attenuated by ``strength`` (0 keeps
+    everything, 1 removes them), with the mask smoothed over time and
+    frequency to avoid musical noise. The first and last ``n_fft`` samples
+    lack context and should be discarded by the caller.
+    """
+    hop = n_fft // OVERLAP
+    window = _window(n_fft)
+    frame_count = (len(signal) - n_fft) // hop + 1
+    if frame_count < 1:
+        return signal.copy()
+    frames = np.lib.stride_tricks.sliding_window_view(signal, n_fft)[::hop]
+    spectrum = np.fft.rfft(frames * window, axis=1)
+    level = 20 * np.log10(np.abs(spectrum) + EPSILON)
+    mask = (level > threshold).astype(np.float32)
+    mask = _smooth(_smooth(mask, SMOOTH_BINS, 1), SMOOTH_FRAMES, 0)
+    spectrum *= 1.0 - strength * (1.0 - mask)
+
+    frames = np.fft.irfft(spectrum, n=n_fft, axis=1).astype(np.float32) * window
+    # overlap-add in hop-sized blocks, one shifted sum per overlap step
+    parts = frames.reshape((frame_count, OVERLAP, hop))
+    blocks = np.zeros((frame_count + OVERLAP - 1, hop), dtype=np.float32)
+    for step in range(OVERLAP):
+        blocks[step : step + frame_count] += parts[:, step]
+    out = np.zeros(len(signal), dtype=np.float32)
+    covered = min(len(signal), blocks.size)
+    out[:covered] = blocks.reshape(-1)[:covered]
+    return out / (np.sum(np.square(window)) / hop)
+
+
+def _denoise_chunk(samples, sample_width, threshold, strength, n_fft, keep):
+    """Gate every channel of an integer chunk and return its ``keep`` slice."""
+    info = np.iinfo(samples.dtype)
+    out = np.empty((keep.stop - keep.start, samples.shape[1]), dtype=samples.dtype)
+    scale = full_scale(sample_width)
+    for channel in range(samples.shape[1]):
+        signal = _to_float(samples[:, channel], sample_width)
+        cleaned = gate(signal, threshold[channel], strength, n_fft)[keep] * scale
+        out[:, channel] = np.clip(np.rint(cleaned), info.min, info.max)
+    return out
+
+
+def _read_padded(samples, lo, hi, pad, hop):
+    """Frames [lo, hi) with at least ``pad`` frames of context on both sides.
+
+    The chunk starts on a multiple of ``hop``, so every chunk uses the
+    same STFT frame grid and chunking does not change the result.
+    """
+    before = pad + lo % hop
+    read_lo = max(0, lo - before)
+    read_hi = min(len(samples), hi + pad)
+    chunk = np.asarray(samples[read_lo:read_hi])
+    # zeros stand in for context past the ends of the buffer
+    missing_before = before - (lo - read_lo)
+    missing_after = pad - (read_hi - hi)
+    if missing_before or missing_after:
+        chunk = np.pad(chunk, ((missing_before, missing_after), (0, 0)))
+    return chunk, slice(before, before + hi - lo)
+
+
+@traced("denoise")
+def denoise(
+    samples,
+    sample_width,
+    frame_rate,
+    ranges,
+    threshold,
+    strength: float = DEFAULT_STRENGTH,
+    workers: int = 1,
+    progress=None,
+    cancel=None,
+    chunk_seconds: float = CHUNK_SECONDS,
+):
+    """Spectral-gate the source frame ``ranges`` of ``samples``.
+
+    Returns a new buffer of the same shape, backed by an unlinked temporary
+    file, in which frames outside ``ranges`` are silent; or None if the
+    ``cancel`` event was set. Chunks of ``chunk_seconds`` are processed
+    independently with enough context for the STFT, on up to ``workers``
+    processes with at most two chunks per worker in flight.
+    """
+    n_fft = fft_size(frame_rate)
+    pad = 2 * n_fft
+    chunk_frames = max(n_fft, round(chunk_seconds * frame_rate))
+    out = np.memmap(
+        tempfile.TemporaryFile(), dtype=samples.dtype, mode="w+", shape=samples.shape
+    )
+    chunks = [
+        (lo, min(lo + chunk_frames, end))
+        for start, end in ranges
+        for lo in range(start, end, chunk_frames)
+    ]
+    total = sum(end - start for start, end in ranges)
+    done = 0
+
+    def job(lo, hi):
+        chunk, keep = _read_padded(samples, lo, hi, pad, n_fft // OVERLAP)
+        return chunk, sample_width, threshold, strength, n_fft, keep
+
+    def store(lo, cleaned):
+        nonlocal done
+        out[lo : lo + len(cleaned)] = cleaned
+        done += len(cleaned)
+        if progress:
+            progress(done, total)
+
+    if workers <= 1 or len(chunks) <= 1:
+        for lo, hi in chunks:
+            if cancel is not None and cancel.is_set():
+                return None
+            store(lo, _denoise_chunk(*job(lo, hi)))
+        return out
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        pending = {}
+        queued = iter(chunks)
+        while True:
+            if cancel is not None and cancel.is_set():
+                for future in pending:
+                    future.cancel()
+                return None
+            while len(pending) < 2 * workers:
+                chunk = next(queued, None)
+                if chunk is None:
+                    break
+                pending[pool.submit(_denoise_chunk, *job(*chunk))] = chunk[0]
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                store(pending.pop(future), future.result())
+    return out
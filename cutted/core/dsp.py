@@ -0,0 +1,123 @@
+import numpy as np
+
+RESAMPLE_CHUNK = 1 << 20
+
+
+def full_scale(sample_width: int):
+    return float(2 ** (8 * sample_width - 1))
+
+
+def to_mono_float(samples: np.ndarray, sample_width: int):
+    """Average the channels of integer ``samples`` into float32 in [-1, 1]."""
+    if samples.ndim == 1:
+        samples = samples.reshape((-1, 1))
+    mono = samples.astype(np.float32).mean(axis=1)
+    mono /= full_scale(sample_width)
+    return mono
+
+
+def resample_mono(samples: np.ndarray, sample_width: int, rate: int, target: int):
+    """Downmix and resample integer ``samples`` to float32 mono at ``target`` Hz.
+
+    Works in chunks so only the output and one chunk of input are held as
+    floats. Downsampling applies a boxcar low-pass before interpolating.
+    """
+    if samples.ndim == 1:
+        samples = samples.reshape((-1, 1))
+    out_count = int(len(samples) * target / rate)
+    out = np.empty(out_count, dtype=np.float32)
+    box = max(1, round(rate / target))
+    kernel = np.ones(box, dtype=np.float32) / box
+    for out_start in range(0, out_count, RESAMPLE_CHUNK):
+        out_end = min(out_start + RESAMPLE_CHUNK, out_count)
+        positions = np.arange(out_start, out_end) * (rate / target)
+        lo = max(0, int(positions[0]) - box)
+        hi = min(len(samples), int(positions[-1]) + box + 2)
+        block = to_mono_float(samples[lo:hi], sample_width)
+        if box > 1:
+            block = np.convolve(block, kernel, mode="same")
+        out[out_start:out_end] = np.interp(positions - lo, np.arange(len(block)), block)
+    return out
+
+
+def frame_rms(mono: np.ndarray, frame_length: int):
+    """RMS of consecutive non-overlapping frames of a float mono signal."""
+    count = len(mono) // frame_length
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = mono[: count * frame_length].reshape((count, frame_length))
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def split_quiet(
+    mono: np.ndarray,
+    frame_rate: int,
+    max_window: float,
+    search: float,
+    frame_seconds: float,
+):
+    """Split float mono audio into windows of at most ``max_window`` seconds.
+
+    Each window ends at the quietest ``frame_seconds`` frame within the last
+    ``search`` seconds before the limit, so words are rarely cut in half.
+    """
+    frame = int(frame_seconds * frame_rate)
+    rms = frame_rms(mono, frame)
+    max_frames = int(max_window / frame_seconds)
+    search_frames = min(int(search / frame_seconds), max_frames - 1)
+    windows = []
+    start = 0
+    while len(rms) - start > max_frames:
+        lo = start + max_frames - search_frames
+        cut = lo + int(np.argmin(rms[lo : start + max_frames]))
+        windows.append((start * frame, cut * frame))
+        start = cut
+    windows.append((start * frame, len(mono)))
+    return windows
+
+
+def to_int16(samples: np.ndarray):
+    """Convert integer samples of any supported width to int16."""
+    if samples.dtype == np.int16:
+        return samples
+    if samples.dtype == np.int8:
+        return samples.astype(np.int16) << 8
+    return (samples >> (8 * (samples.dtype.itemsize - 2))).astype(np.int16)
+
+
+def convert_width(samples: np.ndarray, dtype):
+    """Shift integer ``samples`` to another integer sample width."""
+    dtype = np.dtype(dtype)
+    if samples.dtype == dtype:
+        return samples
+    shift = 8 * (dtype.itemsize - samples.dtype.itemsize)
+    if shift > 0:
+        return samples.astype(dtype) << shift
+    return (samples >> -shift).astype(dtype)
+
+
+def remix(samples: np.ndarray, channels: int):
+    """Up- or downmix (frames, channels) ``samples`` to ``channels``."""
+    if samples.shape[1] == channels:
+        return samples
+    if channels == 1:
+        return samples.mean(axis=1, keepdims=True).astype(samples.dtype)
+    if samples.shape[1] > channels:
+        return samples[:, :channels]
+    return samples[:, np.arange(channels) % samples.shape[1]]
+
+
+def interpolate(samples: np.ndarray, positions: np.ndarray):
+    """Linearly interpolate (frames, channels) ``samples`` at fractional frames.
+
+    Positions past the last frame are silent.
+    """
+    out = np.zeros((len(positions), samples.shape[1]), dtype=samples.dtype)
+    if not len(samples):
+        return out
+    indices = np.arange(len(samples))
+    for channel in range(samples.shape[1]):
+        out[:, channel] = np.rint(
+            np.interp(positions, indices, samples[:, channel], right=0)
+        )
+    return out
@@ -0,0 +1,253 @@
+from typing import NamedTuple
+
+import numpy as np
+from pydub import AudioSegment
+
+from .envelope import RAMP_SHAPES, Gain, apply_curve, gain_curve
+
+SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+
+def normalize_ranges(starts, ends, limit):
+    """Sort, clamp to [0, limit] and merge overlapping (start, end) ranges."""
+    ranges = sorted(
+        (max(0, start), min(limit, end)) for start, end in zip(starts, ends)
+    )
+    merged = []
+    for start, end in ranges:
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class EditState(NamedTuple):
+    """Snapshot of an ``EditList``.
+
+    ``source`` is a reference to the decoded buffer, not a copy.
+    """
+
+    source: np.ndarray
+    frame_rate: int
+    sample_width: int
+    segments: list
+    gains: list
+    join_fade: int
+
+
+class EditList:
+    """Non-destructive edit decision list over a decoded source buffer.
+
+    The output is described by ``segments`` (source frame ranges in output
+    order) and ``gains`` (``Gain`` envelopes over source frames). Edits only
+    touch these lists; samples are produced by ``render``.
+    """
+
+    def __init__(self, samples: np.ndarray, frame_rate: int, sample_width: int):
+        if samples.ndim == 1:
+            samples = samples.reshape((-1, 1))
+        self.source = samples
+        self.frame_rate = frame_rate
+        self.sample_width = sample_width
+        self.segments = [(0, len(samples))] if len(samples) else []
+        self.gains = []
+        # frames faded out/in on both sides of every cut point
+        self.join_fade = 0
+
+    @classmethod
+    def from_segment(cls, segment: AudioSegment):
+        if segment.sample_width not in SAMPLE_DTYPES:
+            segment = segment.set_sample_width(4)
+        samples = np.frombuffer(
+            segment.raw_data, dtype=SAMPLE_DTYPES[segment.sample_width]
+        ).reshape((-1, segment.channels))
+        return cls(samples, segment.frame_rate, segment.sample_width)
+
+    @classmethod
+    def from_state(cls, state: EditState):
+        edits = cls(state.source, state.frame_rate, state.sample_width)
+        edits.segments = list(state.segments)
+        edits.gains = list(state.gains)
+        edits.join_fade = state.join_fade
+        return edits
+
+    def snapshot(self):
+        return EditState(
+            self.source,
+            self.frame_rate,
+            self.sample_width,
+            list(self.segments),
+            list(self.gains),
+            self.join_fade,
+        )
+
+    @property
+    def channels(self):
+        return self.source.shape[1]
+
+    @property
+    def frame_count(self):
+        return sum(end - start for start, end in self.segments)
+
+    @property
+    def duration_seconds(self):
+        return self.frame_count / self.frame_rate
+
+    def to_frame(self, seconds):
+        return max(0, round(seconds * self.frame_rate))
+
+    def source_ranges(self, start, end):
+        """Map the output frame range [start, end) to source frame ranges."""
+        ranges = []
+        offset = 0
+        for seg_start, seg_end in self.segments:
+            seg_len = seg_end - seg_start
+            lo = max(start, offset)
+            hi = min(end, offset + seg_len)
+            if lo < hi:
+                ranges.append((seg_start + lo - offset, seg_start + hi - offset))
+            offset += seg_len
+            if offset >= end:
+                break
+        return ranges
+
+    def output_ranges(self, start, end):
+        """Map the source frame range [start, end) to output frame ranges."""
+        ranges = []
+        offset = 0
+        for seg_start, seg_end in self.segments:
+            lo = max(start, seg_start)
+            hi = min(end, seg_end)
+            if lo < hi:
+                ranges.append((offset + lo - seg_start, offset + hi - seg_start))
+            offset += seg_end - seg_start
+        return ranges
+
+    def cut(self, start, end):
+        """Remove the output frame range [start, end)."""
+        self.cut_ranges(normalize_ranges([start], [end], self.frame_count))
+
+    def cut_ranges(self, ranges):
+        """Remove sorted, non-overlapping output frame ranges in one pass."""
+        segments = []
+        offset = 0
+        i = 0
+        for seg_start, seg_end in self.segments:
+            seg_out_end = offset + seg_end - seg_start
+            pos = offset
+            while i < len(ranges) and ranges[i][0] < seg_out_end:
+                cut_start, cut_end = ranges[i]
+                if cut_start > pos:
+                    segments.append(
+                        (seg_start + pos - offset, seg_start + cut_start - offset)
+                    )
+                pos = max(pos, cut_end)
+                if cut_end > seg_out_end:
+                    break
+                i += 1
+            if pos < seg_out_end:
+                segments.append((seg_start + pos - offset, seg_end))
+            offset = seg_out_end
+        self.segments = segments
+
+    def apply_gain(self, start, end, factor, ramp=0, shape="linear"):
+        """Scale the output frame range [start, end) by ``factor``.
+
+        ``ramp`` frames at each edge move smoothly between unity and
+        ``factor`` to avoid clicks.
+        """
+        if end <= start or factor == 1.0:
+            return
+        ramp = min(ramp, (end - start) // 2)
+        self._add_gain(start, end, factor, ramp, ramp, shape)
+
+    def fade(self, start, end, fade_in=True, shape="linear"):
+        """Fade the output frame range [start, end) in from or out to silence."""
+        if end <= start:
+            return
+        length = end - start
+        if fade_in:
+            self._add_gain(start, end, 0.0, 0, length, shape)
+        else:
+            self._add_gain(start, end, 0.0, length, 0, shape)
+
+    def _add_gain(self, start, end, factor, ramp_in, ramp_out, shape):
+        if shape not in RAMP_SHAPES:
+            raise ValueError(f"Unknown ramp shape: {shape}")
+        offset = 0
+        for src_start, src_end in self.source_ranges(start, end):
+            self.gains.append(
+                Gain(
+                    src_start,
+                    src_end,
+                    float(factor),
+                    ramp_in,
+                    ramp_out,
+                    shape,
+                    offset,
+                    end - start,
+                )
+            )
+            offset += src_end - src_start
+
+    def _join_fades(self, index, seg_start, seg_end):
+        fades = []
+        length = min(self.join_fade, (seg_end - seg_start) // 2)
+        if not length:
+            return fades
+        if index > 0:
+            fades.append(
+                Gain(
+                    seg_start,
+                    seg_start + length,
+                    0.0,
+                    0,
+                    length,
+                    "equal_power",
+                    0,
+                    length,
+                )
+            )
+        if index < len(self.segments) - 1:
+            fades.append(
+                Gain(
+                    seg_end - length, seg_end, 0.0, length, 0, "equal_power", 0, length
+                )
+            )
+        return fades
+
+    def render(self, start=0, end=None):
+        """Produce the samples of the output frame range [start, end)."""
+        if end is None:
+            end = self.frame_count
+        end = min(end, self.frame_count)
+        out = np.empty((max(0, end - start), self.channels), dtype=self.source.dtype)
+        offset = 0
+        for index, (seg_start, seg_end) in enumerate(self.segments):
+            seg_len = seg_end - seg_start
+            lo = max(start, offset)
+            hi = min(end, offset + seg_len)
+            if lo < hi:
+                src_lo = seg_start + lo - offset
+                src_hi = seg_start + hi - offset
+                gains = self.gains + self._join_fades(index, seg_start, seg_end)
+                curve = gain_curve(src_lo, src_hi, gains)
+                chunk = self.source[src_lo:src_hi]
+                if curve is not None:
+                    chunk = apply_curve(chunk, curve)
+                out[lo - start : hi - start] = chunk
+            offset += seg_len
+            if offset >= end:
+                break
+        return out
+
+    def to_segment(self, start=0, end=None):
+        return AudioSegment(
+            data=np.ascontiguousarray(self.render(start, end)).tobytes(),
+            sample_width=self.sample_width,
+            frame_rate=self.frame_rate,
+            channels=self.channels,
+        )
@@ -0,0 +1,94 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+class Gain(NamedTuple):
+    """Gain applied to the source frame range [start, end).
+
+    ``offset`` and ``total`` place this range inside the logical range it was
+    created for, so ramps stay continuous when an edit spans several
+    segments.
+    """
+
+    start: int
+    end: int
+    gain: float
+    ramp_in: int = 0
+    ramp_out: int = 0
+    shape: str = "linear"
+    offset: int = 0
+    total: int = 0
+
+
+RAMP_SHAPES = ("linear", "equal_power")
+
+
+def gain_profile(positions, gain, total, ramp_in=0, ramp_out=0, shape="linear"):
+    """Gain at ``positions`` of a range of ``total`` frames with edge ramps."""
+    weight = np.ones(len(positions), dtype=np.float32)
+    if ramp_in:
+        weight = np.minimum(weight, (positions + 1) / ramp_in)
+    if ramp_out:
+        weight = np.minimum(weight, (total - positions) / ramp_out)
+    weight = np.clip(weight, 0.0, 1.0)
+    if shape == "equal_power":
+        # interpolate power instead of amplitude
+        return np.sqrt((1.0 - weight) + weight * gain * gain).astype(np.float32)
+    return (1.0 + (gain - 1.0) * weight).astype(np.float32)
+
+
+def gain_curve(start, end, gains):
+    """Rasterize all gains overlapping [start, end) into one float curve.
+
+    Returns ``None`` when no gain touches the range.
+    """
+    curve = None
+    for entry in gains:
+        lo = max(entry.start, start)
+        hi = min(entry.end, end)
+        if lo >= hi:
+            continue
+        if curve is None:
+            curve = np.ones(end - start, dtype=np.float32)
+        if entry.ramp_in or entry.ramp_out:
+            positions = np.arange(lo, hi) - entry.start + entry.offset
+            curve[lo - start : hi - start] *= gain_profile(
+                positions,
+                entry.gain,
+                entry.total,
+                entry.ramp_in,
+                entry.ramp_out,
+                entry.shape,
+            )
+        else:
+            curve[lo - start : hi - start] *= entry.gain
+    return curve
+
+
+def apply_curve(samples, curve):
+    """Multiply integer ``samples`` (frames, channels) by ``curve`` and clip."""
+    info = np.iinfo(samples.dtype)
+    scaled = samples.astype(np.float32) * curve[:, None]
+    return np.clip(scaled, info.min, info.max).astype(samples.dtype)
+
+
+def gain_at(positions, gains):
+    """Evaluate all gains at arbitrary source frame ``positions``."""
+    values = np.ones(len(positions), dtype=np.float32)
+    for entry in gains:
+        mask = (positions >= entry.start) & (positions < entry.end)
+        if not mask.any():
+            continue
+        if entry.ramp_in or entry.ramp_out:
+            values[mask] *= gain_profile(
+                positions[mask] - entry.start + entry.offset,
+                entry.gain,
+                entry.total,
+                entry.ramp_in,
+                entry.ramp_out,
+                entry.shape,
+            )
+        else:
+            values[mask] *= entry.gain
+    return values
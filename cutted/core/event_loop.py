@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+
+class EventLoopThread:
+    """An asyncio event loop running on a daemon thread.
+
+    Coroutines are submitted from other threads; ``submit`` returns a
+    ``concurrent.futures.Future`` whose ``cancel`` also cancels the task
+    on the loop.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine, timeout=None, callback=None):
+        """Run ``coroutine`` on the loop, failing with ``asyncio.TimeoutError`` after ``timeout`` s.
+
+        ``callback(future)`` runs on the loop thread when it finishes.
+        """
+        if timeout is not None:
+            coroutine = asyncio.wait_for(coroutine, timeout)
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
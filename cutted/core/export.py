@@ -0,0 +1,196 @@
+import os
+import queue
+import subprocess
+import threading
+from typing import NamedTuple, Optional
+
+import numpy as np
+from pydub import AudioSegment
+
+EXPORT_CHUNK_SECONDS = 5.0
+QUEUE_CHUNKS = 2
+# raw formats of the int8/int16/int32 samples piped in
+PCM_FORMATS = {1: "s8", 2: "s16le", 4: "s32le"}
+# WAV stores 8-bit audio unsigned, FFmpeg converts
+WAV_CODECS = {1: "pcm_u8", 2: "pcm_s16le", 4: "pcm_s32le"}
+ENCODER_ARGS = {
+    "mp3": ["-f", "mp3"],
+    "flac": ["-f", "flac"],
+    "ogg": ["-f", "ogg", "-c:a", "libvorbis"],
+    "opus": ["-f", "ogg", "-c:a", "libopus"],
+    "m4a": ["-f", "ipod", "-c:a", "aac"],
+}
+EXPORT_FORMATS = ("mp3", "wav") + tuple(
+    format for format in ENCODER_ARGS if format != "mp3"
+)
+MIME_TYPES = {
+    "mp3": "audio/mpeg",
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "ogg": "audio/ogg",
+    "opus": "audio/ogg",
+    "m4a": "audio/mp4",
+}
+PIPE_OUTPUT = "pipe:1"
+
+
+class ExportTarget(NamedTuple):
+    path: str
+    format: str = "mp3"
+    bitrate: Optional[str] = None
+    channels: Optional[int] = None
+    frame_rate: Optional[int] = None
+
+
+def ffmpeg_command(target: ExportTarget, frame_rate, channels, sample_width):
+    pcm = PCM_FORMATS[sample_width]
+    command = [AudioSegment.converter, "-y", "-loglevel", "error"]
+    command += ["-f", pcm, "-ar", str(frame_rate), "-ac", str(channels)]
+    command += ["-i", "pipe:0"]
+    if target.format == "wav":
+        command += ["-f", "wav", "-c:a", WAV_CODECS[sample_width]]
+    elif target.format in ENCODER_ARGS:
+        command += ENCODER_ARGS[target.format]
+    else:
+        raise ValueError(f"Unsupported export format: {target.format}")
+    if target.bitrate:
+        command += ["-b:a", target.bitrate]
+    if target.channels:
+        command += ["-ac", str(target.channels)]
+    if target.frame_rate:
+        command += ["-ar", str(target.frame_rate)]
+    return command + [target.path]
+
+
+class _Encoder:
+    """One FFmpeg process fed from a small queue by its own thread.
+
+    Targets written to ``PIPE_OUTPUT`` collect the encoded bytes in ``output``.
+    """
+
+    def __init__(self, target, edits):
+        self.target = target
+        self.process = subprocess.Popen(
+            ffmpeg_command(
+                target, edits.frame_rate, edits.channels, edits.sample_width
+            ),
+            stdin=subprocess.PIPE,
+            stdout=(
+                subprocess.PIPE if target.path == PIPE_OUTPUT else subprocess.DEVNULL
+            ),
+            stderr=subprocess.PIPE,
+        )
+        self.queue = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self.error = None
+        self.output = []
+        self.thread = threading.Thread(target=self._write, daemon=True)
+        self.thread.start()
+        self.reader = None
+        if target.path == PIPE_OUTPUT:
+            self.reader = threading.Thread(target=self._read, daemon=True)
+            self.reader.start()
+
+    def _read(self):
+        for data in iter(lambda: self.process.stdout.read(1 << 16), b""):
+            self.output.append(data)
+        self.process.stdout.close()
+
+    def _write(self):
+        stdin = self.process.stdin
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            if self.error is None:
+                try:
+                    stdin.write(memoryview(chunk).cast("B"))
+                except (BrokenPipeError, OSError) as e:
+                    self.error = e
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+    def feed(self, chunk):
+        self.queue.put(chunk)
+
+    def finish(self, kill=False):
+        if kill:
+            self.process.kill()
+        self.queue.put(None)
+        self.thread.join()
+        if self.reader is not None:
+            self.reader.join()
+        stderr = self.process.stderr.read().decode("utf-8", "replace").strip()
+        self.process.stderr.close()
+        if self.process.wait() != 0 and not kill:
+            raise RuntimeError(
+                f"FFmpeg failed to export {self.target.path}: {stderr or self.error}"
+            )
+
+
+def export_edits(
+    edits,
+    targets,
+    progress=None,
+    cancel=None,
+    chunk_seconds: float = EXPORT_CHUNK_SECONDS,
+):
+    """Encode ``edits`` to every target by piping PCM chunks into FFmpeg.
+
+    Each chunk is rendered once and handed to all encoders, which run as
+    separate processes. ``progress(done_frames, total_frames)`` is called
+    after each chunk; setting the ``cancel`` event stops the export and
+    removes the partial files. Returns False if cancelled.
+    """
+    return _encode(edits, targets, progress, cancel, chunk_seconds) is not None
+
+
+def export_bytes(edits, target: ExportTarget, cancel=None):
+    """Encode ``edits`` in memory and return the bytes, or None if cancelled."""
+    encoders = _encode(
+        edits, [target._replace(path=PIPE_OUTPUT)], None, cancel, EXPORT_CHUNK_SECONDS
+    )
+    if encoders is None:
+        return None
+    return b"".join(encoders[0].output)
+
+
+def _encode(edits, targets, progress, cancel, chunk_seconds):
+    targets = [
+        target if isinstance(target, ExportTarget) else ExportTarget(*target)
+        for target in targets
+    ]
+    total = edits.frame_count
+    step = max(1, round(chunk_seconds * edits.frame_rate))
+    encoders = []
+    cancelled = False
+    try:
+        for target in targets:
+            encoders.append(_Encoder(target, edits))
+        for start in range(0, total, step):
+            if cancel is not None and cancel.is_set():
+                cancelled = True
+                break
+            chunk = np.ascontiguousarray(edits.render(start, start + step))
+            for encoder in encoders:
+                encoder.feed(chunk)
+            if progress is not None:
+                progress(min(start + step, total), total)
+    except BaseException:
+        cancelled = True
+        raise
+    finally:
+        errors = []
+        for encoder in encoders:
+            try:
+                encoder.finish(kill=cancelled)
+            except RuntimeError as e:
+                errors.append(e)
+        if cancelled or errors:
+            for target in targets:
+                if target.path != PIPE_OUTPUT and os.path.exists(target.path):
+                    os.remove(target.path)
+        if errors and not cancelled:
+            raise errors[0]
+    return None if cancelled else encoders
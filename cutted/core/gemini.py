@@ -1,51 +1,108 @@
-import base64
 import os
-import sys
-import tkinter.messagebox as messagebox
+from types import SimpleNamespace
 
-from google import genai
-from google.genai import types
+from .chat_history import ChatHistory
+from .prompt import SYSTEM_INSTRUCTION
+from .tracing import span
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-if not GEMINI_API_KEY:
-    print("Please set the environment variable GEMINI_API_KEY to your Gemini API Key.")
-    messagebox.showerror(
-        "Error",
-        "Please set the environment variable GEMINI_API_KEY to your Gemini API Key.",
-    )
-    sys.exit(0)
+MISSING_KEY_MESSAGE = (
+    "Please set the environment variable GEMINI_API_KEY to your Gemini API Key."
+)
 
 
 class GeminiClient:
     def __init__(self):
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise RuntimeError(MISSING_KEY_MESSAGE)
+
+        from google import genai
+
         self.client = genai.Client(
-            api_key=GEMINI_API_KEY,
+            api_key=api_key,
         )
-        self.contents = []
+        self.history = ChatHistory()
+        self.tools = None
 
     def generate(
         self,
         prompt: str,
         model: str = "gemini-2.0-flash",
-        audio_base64=None,
+        audio=None,
+        audio_mime_type="audio/mpeg",
         use_history=0,
+        request=None,
     ):
-        if not use_history:
-            self.contents = []
+        contents = self._contents(prompt, audio, audio_mime_type, use_history)
+        with span("gemini", model=model):
+            response = self.client.models.generate_content(
+                model=model,
+                contents=contents,
+                config=self._config(model),
+            )
+        return self._handle_response(response, request or prompt, use_history)
+
+    async def generate_async(
+        self,
+        prompt: str,
+        model: str = "gemini-2.0-flash",
+        audio=None,
+        audio_mime_type="audio/mpeg",
+        use_history=0,
+        request=None,
+    ):
+        """Like ``generate`` but on genai's asyncio API.
+
+        The chat history only changes once a response arrives, so a
+        cancelled or timed out request leaves it untouched.
+        """
+        contents = self._contents(prompt, audio, audio_mime_type, use_history)
+        with span("gemini", model=model):
+            response = await self.client.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=self._config(model),
+            )
+        return self._handle_response(response, request or prompt, use_history)
+
+    def _contents(self, prompt, audio, audio_mime_type, use_history):
+        from google.genai import types
+
+        contents = []
+        if use_history:
+            for role, text in self.history.records():
+                contents.append(
+                    types.Content(role=role, parts=[types.Part.from_text(text=text)])
+                )
 
         parts = [
             types.Part.from_text(text=prompt),
         ]
 
-        if audio_base64:
-            parts.append(
-                types.Part.from_bytes(
-                    mime_type="audio/mpeg", data=base64.b64decode(audio_base64)
-                )
-            )
+        if audio:
+            parts.append(types.Part.from_bytes(mime_type=audio_mime_type, data=audio))
+
+        contents.append(types.Content(role="user", parts=parts))
+        return contents
+
+    def _config(self, model):
+        from google.genai import types
+
+        # instructions and tools come first and never change, so models with
+        # implicit context caching reuse them across requests
+        return types.GenerateContentConfig(
+            system_instruction=SYSTEM_INSTRUCTION,
+            tools=self._tools(),
+            response_mime_type="text/plain",
+        )
+
+    def _tools(self):
+        if self.tools is not None:
+            return self.tools
+
+        from google import genai
+        from google.genai import types
 
-        self.contents.append(types.Content(role="user", parts=parts))
         tools = [
             types.Tool(
                 function_declarations=[
@@ -72,6 +129,10 @@ class GeminiClient:
                                         type=genai.types.Type.NUMBER,
                                     ),
                                 ),
+                                "clip": genai.types.Schema(
+                                    type=genai.types.Type.INTEGER,
+                                    description="Optional clip number; start and end are then seconds into that clip.",
+                                ),
                             },
                         ),
                     ),
@@ -105,23 +166,96 @@ class GeminiClient:
                                         type=genai.types.Type.NUMBER,
                                     ),
                                 ),
+                                "clip": genai.types.Schema(
+                                    type=genai.types.Type.INTEGER,
+                                    description="Optional clip number; start and end are then seconds into that clip.",
+                                ),
+                            },
+                        ),
+                    ),
+                    types.FunctionDeclaration(
+                        name="remove_silence",
+                        description=(
+                            "Detect and remove silent parts of the audio. Detection runs locally on the exact samples, "
+                            "so prefer this over cut_audio when the user asks to remove silence or pauses. "
+                            "threshold_db is how many dB above the noise floor still counts as silence (default 10, "
+                            "higher removes more). min_len is the minimum length in seconds of a silence to remove "
+                            "(default 0.5)."
+                        ),
+                        parameters=genai.types.Schema(
+                            type=genai.types.Type.OBJECT,
+                            properties={
+                                "threshold_db": genai.types.Schema(
+                                    type=genai.types.Type.NUMBER,
+                                ),
+                                "min_len": genai.types.Schema(
+                                    type=genai.types.Type.NUMBER,
+                                ),
+                            },
+                        ),
+                    ),
+                    types.FunctionDeclaration(
+                        name="reduce_noise",
+                        description=(
+                            "Reduce steady background noise such as hiss, hum or room tone with spectral gating. "
+                            "The noise profile is learned from the quietest parts unless noise_start and noise_end "
+                            "(seconds) mark a range that contains only noise. strength goes from 0 (no change) to "
+                            "1 (remove everything at the noise level), default 0.8."
+                        ),
+                        parameters=genai.types.Schema(
+                            type=genai.types.Type.OBJECT,
+                            properties={
+                                "noise_start": genai.types.Schema(
+                                    type=genai.types.Type.NUMBER,
+                                ),
+                                "noise_end": genai.types.Schema(
+                                    type=genai.types.Type.NUMBER,
+                                ),
+                                "strength": genai.types.Schema(
+                                    type=genai.types.Type.NUMBER,
+                                ),
+                            },
+                        ),
+                    ),
+                    types.FunctionDeclaration(
+                        name="remove_clip",
+                        description="Remove all remaining audio of one clip from the timeline.",
+                        parameters=genai.types.Schema(
+                            type=genai.types.Type.OBJECT,
+                            required=["clip"],
+                            properties={
+                                "clip": genai.types.Schema(
+                                    type=genai.types.Type.INTEGER,
+                                ),
+                            },
+                        ),
+                    ),
+                    types.FunctionDeclaration(
+                        name="move_clip",
+                        description=(
+                            "Reorder the timeline by moving all audio of a clip in front of another clip. "
+                            "Without before the clip is moved to the end."
+                        ),
+                        parameters=genai.types.Schema(
+                            type=genai.types.Type.OBJECT,
+                            required=["clip"],
+                            properties={
+                                "clip": genai.types.Schema(
+                                    type=genai.types.Type.INTEGER,
+                                ),
+                                "before": genai.types.Schema(
+                                    type=genai.types.Type.INTEGER,
+                                ),
                             },
                         ),
                     ),
                 ]
             )
         ]
-        generate_content_config = types.GenerateContentConfig(
-            tools=tools,
-            response_mime_type="text/plain",
-        )
-
-        response = self.client.models.generate_content(
-            model=model,
-            contents=self.contents,
-            config=generate_content_config,
-        )
+        self.tools = tools
+        return tools
 
+    def _handle_response(self, response, request, use_history):
         function_call = None
         text_response = None
         try:
@@ -134,21 +268,37 @@ class GeminiClient:
         except TypeError:
             pass
 
-        model_parts = []
-        if text_response:
-            model_parts.append(types.Part.from_text(text=text_response))
-        if function_call:
-            model_parts.append(
-                types.Part.from_function_call(
-                    name=function_call.name, args=function_call.args
-                )
-            )
-
-        self.contents.append(types.Content(role="model", parts=model_parts))
+        if not use_history:
+            self.history.clear()
+        self.history.add(request, function_call, text_response)
 
         return function_call, text_response
 
 
+class ScriptedClient:
+    """Offline stand-in for ``GeminiClient`` that replays canned tool calls.
+
+    ``calls`` is a list of ``{"name": ..., "args": {...}}`` dicts; each
+    ``generate`` call returns the next one, cycling when they run out.
+    """
+
+    def __init__(self, calls):
+        self.calls = list(calls)
+        self.contents = []
+        self.index = 0
+
+    def generate(self, prompt: str, audio=None, use_history=0, **kwargs):
+        if not self.calls:
+            return None, "No scripted calls."
+        call = self.calls[self.index % len(self.calls)]
+        self.index += 1
+        self.contents.append(prompt)
+        return SimpleNamespace(name=call["name"], args=call.get("args", {})), None
+
+    async def generate_async(self, prompt: str, **kwargs):
+        return self.generate(prompt, **kwargs)
+
+
 if __name__ == "__main__":
     gemini = GeminiClient()
     print(gemini.generate("cut from 10 to 20.5"))
@@ -0,0 +1,116 @@
+import pickle
+import zlib
+from typing import NamedTuple
+
+import numpy as np
+
+from .decode_cache import resident_bytes
+from .edit_list import EditState
+
+MAX_HISTORY_BYTES = 256 * 1024 * 1024
+GAIN_ENTRY_BYTES = 120
+
+
+class HistoryEntry(NamedTuple):
+    operation: str
+    state: EditState
+    compressed: bool
+
+
+def pack_state(state: EditState, compress: bool):
+    if not compress:
+        return state
+    segments = zlib.compress(np.asarray(state.segments, dtype=np.int64).tobytes())
+    gains = zlib.compress(pickle.dumps(state.gains))
+    return state._replace(segments=segments, gains=gains)
+
+
+def unpack_state(entry: HistoryEntry):
+    state = entry.state
+    if not entry.compressed:
+        return state
+    segments = np.frombuffer(zlib.decompress(state.segments), dtype=np.int64)
+    return state._replace(
+        segments=[tuple(pair) for pair in segments.reshape((-1, 2)).tolist()],
+        gains=pickle.loads(zlib.decompress(state.gains)),
+    )
+
+
+def entry_size(entry: HistoryEntry):
+    state = entry.state
+    if entry.compressed:
+        return len(state.segments) + len(state.gains)
+    return len(state.segments) * 16 + len(state.gains) * GAIN_ENTRY_BYTES
+
+
+class History:
+    """Undo/redo stacks of edit states with a memory budget.
+
+    Entries hold the edit lists before each operation, so undoing a cut or
+    volume change never copies samples. Source buffers that are no longer
+    current count against ``max_bytes`` once each, unless they are mapped
+    from disk or not decoded yet.
+    """
+
+    def __init__(self, max_bytes: int = MAX_HISTORY_BYTES, compress: bool = False):
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def clear(self):
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def _entry(self, operation, state):
+        return HistoryEntry(operation, pack_state(state, self.compress), self.compress)
+
+    def record(self, operation: str, before: EditState, current_source=None):
+        self.undo_stack.append(self._entry(operation, before))
+        self.redo_stack = []
+        self._enforce_budget(current_source)
+
+    def undo(self, current: EditState):
+        if not self.undo_stack:
+            return None, None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(self._entry(entry.operation, current))
+        return entry.operation, unpack_state(entry)
+
+    def redo(self, current: EditState):
+        if not self.redo_stack:
+            return None, None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(self._entry(entry.operation, current))
+        return entry.operation, unpack_state(entry)
+
+    def states(self, stack: str):
+        """(operation, state) pairs of the "undo" or "redo" stack, oldest first."""
+        entries = self.undo_stack if stack == "undo" else self.redo_stack
+        return [(entry.operation, unpack_state(entry)) for entry in entries]
+
+    def push(self, stack: str, operation: str, state: EditState):
+        """Append a restored entry without touching the other stack."""
+        entries = self.undo_stack if stack == "undo" else self.redo_stack
+        entries.append(self._entry(operation, state))
+
+    def size(self, current_source=None):
+        seen = {id(current_source)}
+        total = 0
+        for entry in self.undo_stack + self.redo_stack:
+            total += entry_size(entry)
+            source = entry.state.source
+            if id(source) not in seen:
+                seen.add(id(source))
+                total += resident_bytes(source)
+        return total
+
+    def _enforce_budget(self, current_source):
+        while self.undo_stack and self.size(current_source) > self.max_bytes:
+            self.undo_stack.pop(0)
@@ -0,0 +1,118 @@
+import numpy as np
+
+from .envelope import gain_at
+
+BASE_BLOCK = 256
+BUILD_CHUNK_BLOCKS = 4096
+
+
+def block_peaks(samples, sample_width: int, start: int = 0, end=None):
+    """Min and max of every ``BASE_BLOCK`` frames of ``samples[start:end]``."""
+    if end is None:
+        end = len(samples)
+    full_scale = float(2 ** (8 * sample_width - 1))
+    block_count = -(-(end - start) // BASE_BLOCK)
+    mins = np.zeros(block_count, dtype=np.float32)
+    maxs = np.zeros(block_count, dtype=np.float32)
+    step = BASE_BLOCK * BUILD_CHUNK_BLOCKS
+    for chunk_start in range(start, end, step):
+        chunk = samples[chunk_start : min(chunk_start + step, end)]
+        first = (chunk_start - start) // BASE_BLOCK
+        full = len(chunk) // BASE_BLOCK
+        if full:
+            blocks = chunk[: full * BASE_BLOCK].reshape((full, -1))
+            mins[first : first + full] = blocks.min(axis=1) / full_scale
+            maxs[first : first + full] = blocks.max(axis=1) / full_scale
+        if len(chunk) % BASE_BLOCK:
+            tail = chunk[full * BASE_BLOCK :]
+            mins[first + full] = tail.min() / full_scale
+            maxs[first + full] = tail.max() / full_scale
+    return mins, maxs
+
+
+class PeakPyramid:
+    """Min/max summary levels of a source buffer, normalized to [-1, 1].
+
+    Level ``i`` holds one (min, max) pair per ``BASE_BLOCK * 2**i`` frames,
+    so any zoom can be drawn from a level with about one block per pixel.
+    """
+
+    def __init__(self, samples: np.ndarray, sample_width: int):
+        if samples.ndim == 1:
+            samples = samples.reshape((-1, 1))
+        self.frame_count = len(samples)
+        mins, maxs = block_peaks(samples, sample_width)
+        self._build_levels(mins, maxs)
+
+    @classmethod
+    def from_base(cls, frame_count, mins, maxs):
+        """Rebuild a pyramid from its saved finest level without the samples."""
+        pyramid = cls.__new__(cls)
+        pyramid.frame_count = frame_count
+        pyramid._build_levels(mins, maxs)
+        return pyramid
+
+    def _build_levels(self, mins, maxs):
+        self.levels = [(mins, maxs)]
+        while len(mins) > 1:
+            if len(mins) % 2:
+                mins = np.append(mins, mins[-1])
+                maxs = np.append(maxs, maxs[-1])
+            mins = np.minimum(mins[0::2], mins[1::2])
+            maxs = np.maximum(maxs[0::2], maxs[1::2])
+            self.levels.append((mins, maxs))
+
+    def block_size(self, level):
+        return BASE_BLOCK << level
+
+    def level_for(self, frames_per_pixel):
+        level = 0
+        while (
+            level + 1 < len(self.levels)
+            and self.block_size(level + 1) <= frames_per_pixel
+        ):
+            level += 1
+        return level
+
+    def view(self, edits, width, start=0, end=None):
+        """Return ``width`` (min, max) columns of the edited output [start, end).
+
+        Only the summary level matching the requested resolution is read, so
+        the cost depends on ``width`` and the number of segments, not on the
+        audio length.
+        """
+        if end is None:
+            end = edits.frame_count
+        width = max(1, min(width, end - start))
+        if end <= start:
+            return np.zeros(0, np.float32), np.zeros(0, np.float32)
+
+        frames_per_pixel = (end - start) / width
+        if frames_per_pixel < BASE_BLOCK:
+            samples = edits.render(start, end)
+            column_mins = samples.min(axis=1).astype(np.float32)
+            column_maxs = samples.max(axis=1).astype(np.float32)
+            full_scale = float(2 ** (8 * edits.sample_width - 1))
+            column_mins /= full_scale
+            column_maxs /= full_scale
+        else:
+            level = self.level_for(frames_per_pixel)
+            block = self.block_size(level)
+            level_mins, level_maxs = self.levels[level]
+            mins = []
+            maxs = []
+            for src_start, src_end in edits.source_ranges(start, end):
+                first = src_start // block
+                last = -(-src_end // block)
+                centers = np.arange(first, last) * block + block // 2
+                gain = gain_at(centers, edits.gains)
+                mins.append(level_mins[first:last] * gain)
+                maxs.append(level_maxs[first:last] * gain)
+            column_mins = np.clip(np.concatenate(mins), -1.0, 1.0)
+            column_maxs = np.clip(np.concatenate(maxs), -1.0, 1.0)
+
+        edges = np.linspace(0, len(column_mins), width, endpoint=False).astype(int)
+        return (
+            np.minimum.reduceat(column_mins, edges),
+            np.maximum.reduceat(column_maxs, edges),
+        )
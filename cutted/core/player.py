@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from .dsp import to_int16
+
+CHUNK_SECONDS = 0.2
+POLL_SECONDS = 0.005
+MIXER_BUFFER = 1024
+PLAYBACK_CHANNEL = 0
+
+
+class StreamPlayer:
+    """Plays an ``EditList`` by queueing short rendered chunks on a mixer channel.
+
+    Only the first chunk is rendered before playback starts, so start and
+    seek latency do not depend on the file length. The playhead is derived
+    from the chunks handed to the mixer: the start frame of the chunk that
+    is playing plus the time since it started.
+    """
+
+    def __init__(self):
+        self.channel = None
+        self.mixer_format = None
+        # (rate, channels) the mixer was opened with; the device may differ
+        self._requested = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._chunks = deque()
+        self._chunk_started = None
+        self._paused_at = None
+        self._finished = False
+        self.start_frame = 0
+        self.end_frame = 0
+        self.frame_rate = 44100
+
+    def _ensure_mixer(self, frame_rate, channels):
+        import pygame
+
+        channels = min(channels, 2)
+        if self._requested != (frame_rate, channels) or not pygame.mixer.get_init():
+            pygame.mixer.quit()
+            pygame.mixer.init(
+                frequency=frame_rate, size=-16, channels=channels, buffer=MIXER_BUFFER
+            )
+            pygame.mixer.set_reserved(1)
+            self._requested = (frame_rate, channels)
+        self.mixer_format = pygame.mixer.get_init()
+        self.channel = pygame.mixer.Channel(PLAYBACK_CHANNEL)
+
+    def _make_sound(self, samples, frame_rate):
+        import pygame
+
+        mixer_rate, _, mixer_channels = self.mixer_format
+        samples = to_int16(samples)
+        if samples.shape[1] > mixer_channels:
+            samples = samples.mean(axis=1, keepdims=True).astype(np.int16)
+        if samples.shape[1] < mixer_channels:
+            samples = np.repeat(samples, mixer_channels, axis=1)
+        if mixer_rate != frame_rate:
+            # the device refused the native rate, resample this chunk
+            count = round(len(samples) * mixer_rate / frame_rate)
+            positions = np.arange(count) * (frame_rate / mixer_rate)
+            samples = np.stack(
+                [
+                    np.interp(positions, np.arange(len(samples)), samples[:, channel])
+                    for channel in range(samples.shape[1])
+                ],
+                axis=1,
+            ).astype(np.int16)
+        return pygame.mixer.Sound(buffer=np.ascontiguousarray(samples).tobytes())
+
+    def _render(self, edits, position, chunk):
+        end = min(position + chunk, edits.frame_count)
+        sound = self._make_sound(edits.render(position, end), edits.frame_rate)
+        return (sound, position, end - position), end
+
+    def play(self, edits, start_frame=0):
+        self.stop()
+        self._ensure_mixer(edits.frame_rate, edits.channels)
+        self.start_frame = start_frame
+        self.end_frame = edits.frame_count
+        self.frame_rate = edits.frame_rate
+        chunk = max(1, round(CHUNK_SECONDS * edits.frame_rate))
+        first, position = self._render(edits, start_frame, chunk)
+        self._stop.clear()
+        self._finished = False
+        self._paused_at = None
+        self._chunks = deque([first])
+        self.channel.play(first[0])
+        self._chunk_started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._feed, args=(edits, position, chunk), daemon=True
+        )
+        self._thread.start()
+
+    def _advance(self):
+        # called with the lock held: drop chunks the mixer has finished
+        if self._paused_at is not None or not self._chunks:
+            return
+        playing = self.channel.get_sound()
+        current = self._chunks[0]
+        if playing is current[0]:
+            return
+        self._chunks.popleft()
+        self._chunk_started += current[2] / self.frame_rate
+        if not self._chunks:
+            self.start_frame = current[1] + current[2]
+            self._finished = True
+
+    def _feed(self, edits, position, chunk):
+        while not self._stop.is_set():
+            with self._lock:
+                self._advance()
+                if self._finished:
+                    break
+                if position < edits.frame_count and len(self._chunks) < 2:
+                    queued, position = self._render(edits, position, chunk)
+                    self.channel.queue(queued[0])
+                    self._chunks.append(queued)
+            self._stop.wait(POLL_SECONDS)
+
+    def is_playing(self):
+        return (
+            self._thread is not None
+            and self._thread.is_alive()
+            and self._paused_at is None
+        )
+
+    def is_paused(self):
+        return self._paused_at is not None
+
+    def pause(self):
+        with self._lock:
+            if self._paused_at is None and self._chunks:
+                self.channel.pause()
+                self._paused_at = time.perf_counter()
+
+    def resume(self):
+        with self._lock:
+            if self._paused_at is not None:
+                self._chunk_started += time.perf_counter() - self._paused_at
+                self._paused_at = None
+                self.channel.unpause()
+
+    def position_frames(self):
+        with self._lock:
+            if not self._chunks:
+                return self.start_frame
+            _, chunk_start, chunk_length = self._chunks[0]
+            now = self._paused_at or time.perf_counter()
+            elapsed = round((now - self._chunk_started) * self.frame_rate)
+            return chunk_start + min(max(elapsed, 0), chunk_length)
+
+    def position(self):
+        """Current playback position in seconds."""
+        return self.position_frames() / self.frame_rate
+
+    def stop(self):
+        position = self.position_frames()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.channel is not None:
+            self.channel.stop()
+        with self._lock:
+            self._chunks.clear()
+            self._paused_at = None
+            self.start_frame = position
+        return position / self.frame_rate
@@ -0,0 +1,66 @@
+import builtins
+import sys
+import time
+
+from .logger import print_info
+
+
+class StartupProfiler:
+    """Records how long each module takes to import, excluding its children."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.self_times = {}
+        self.total_times = {}
+        self._stack = []
+        self._original_import = None
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module_count = len(sys.modules)
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            if len(sys.modules) > module_count:
+                key = self._resolve(name, globals, fromlist, level)
+                self.self_times[key] = self.self_times.get(key, 0.0) + (
+                    elapsed - children
+                )
+                self.total_times[key] = self.total_times.get(key, 0.0) + elapsed
+
+    @staticmethod
+    def _resolve(name, globals, fromlist, level):
+        if not level:
+            return name
+        parts = ((globals or {}).get("__package__") or "").split(".")
+        base = ".".join(parts[: len(parts) - level + 1])
+        if name:
+            return f"{base}.{name}"
+        return f"{base}.{','.join(fromlist or ())}"
+
+    def report(self, top: int = 15):
+        self.uninstall()
+        print_info(
+            f"Startup took {time.perf_counter() - self.start:.3f}s "
+            f"({len(self.total_times)} imports)"
+        )
+        ranked = sorted(self.total_times.items(), key=lambda item: -item[1])
+        for name, total in ranked[:top]:
+            print_info(
+                f"  {name:<40} {total * 1000:8.1f} ms total "
+                f"{self.self_times[name] * 1000:8.1f} ms self"
+            )
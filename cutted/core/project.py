@@ -0,0 +1,285 @@
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from .decode_cache import LazySource
+from .edit_list import EditList, EditState
+from .envelope import Gain
+from .logger import print_info, print_warn
+from .peaks import BASE_BLOCK, PeakPyramid
+from .timeline import Clip, Timeline
+
+PROJECT_VERSION = 1
+PROJECT_EXTENSION = ".cutted"
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _to_builtin(value):
+    # numpy scalars end up in frame positions and gains
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _state_to_dict(state: EditState):
+    return {
+        "segments": [list(segment) for segment in state.segments],
+        "gains": [list(gain) for gain in state.gains],
+        "join_fade": state.join_fade,
+    }
+
+
+def _state_from_dict(data, source, frame_rate, sample_width):
+    return EditState(
+        source,
+        frame_rate,
+        sample_width,
+        [tuple(segment) for segment in data["segments"]],
+        [Gain(*gain) for gain in data["gains"]],
+        data["join_fade"],
+    )
+
+
+def _npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def _find_source(source, project_path):
+    """The source file, or a file of the same name next to the project."""
+    if os.path.exists(source["path"]):
+        return source["path"]
+    moved = os.path.join(
+        os.path.dirname(os.path.abspath(project_path)), os.path.basename(source["path"])
+    )
+    if os.path.exists(moved):
+        print_warn(f"Source not found at {source['path']}, using {moved}")
+        return moved
+    raise FileNotFoundError(f"Source audio {source['path']} not found")
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _check_source(path, source, known_hashes):
+    signature = _signature(path)
+    # touched or copied; only the content matters
+    if signature != (source["size"], source["mtime_ns"]):
+        if file_hash(path) != source["hash"]:
+            raise ValueError(f"{path} changed since the project was saved")
+    known_hashes[os.path.abspath(path)] = (signature, source["hash"])
+
+
+def _file_entry(path, known_hashes):
+    """Path, size, mtime and content hash of ``path``.
+
+    The file is only hashed if it changed since it was last saved or opened.
+    """
+    path = os.path.abspath(path)
+    signature = _signature(path)
+    known = known_hashes.get(path)
+    if known is None or known[0] != signature:
+        known = known_hashes[path] = (signature, file_hash(path))
+    return {
+        "path": path,
+        "size": signature[0],
+        "mtime_ns": signature[1],
+        "hash": known[1],
+    }
+
+
+def _same_frames(state_source, source):
+    """Whether frame positions in ``state_source`` mean the same in ``source``.
+
+    Adding a clip keeps the earlier clips where they were, so states from
+    before can be saved against the current timeline.
+    """
+    if state_source is source:
+        return True
+    if not isinstance(source, Timeline):
+        return False
+    if isinstance(state_source, Timeline):
+        clips = state_source.clips
+        return source.clips[: len(clips)] == clips
+    first = source.clips[0]
+    return first._samples is state_source and first.path is not None
+
+
+def _open_timeline(processor, timeline, project_path, peaks):
+    clips = []
+    for entry in timeline["clips"]:
+        clip_file = _find_source(entry, project_path)
+        _check_source(clip_file, entry, processor.file_hashes)
+        clips.append(
+            Clip(
+                clip_file,
+                entry["frame_rate"],
+                entry["channels"],
+                entry["sample_width"],
+                entry["frame_count"],
+                loader=lambda clip_file=clip_file: processor.decode_source(clip_file),
+            )
+        )
+    samples = Timeline(
+        clips, timeline["frame_rate"], timeline["sample_width"], timeline["channels"]
+    )
+    if peaks is not None:
+        # clips start on whole blocks, so the saved level splits per clip
+        for clip, (start, end) in zip(clips, samples.spans()):
+            first, last = start // BASE_BLOCK, -(-end // BASE_BLOCK)
+            clip.peaks = (peaks[0][first:last], peaks[1][first:last])
+    return samples
+
+
+def save_project(processor, path, extra=None):
+    """Write the editor state of ``processor`` to a project file.
+
+    Only the edit lists are stored, not samples: the source files are
+    referenced by path and content hash. ``extra`` is any JSON data of the
+    caller, such as the transcript and chat history. Returns False if the
+    audio was processed (noise reduction), which is not saved: the project
+    then holds the same edits over the unprocessed files.
+    """
+    edits = processor.edits
+    source_file = processor.audio_path
+    if edits is None:
+        raise ValueError("No audio loaded")
+    source = processor.file_backed(edits.source)
+    if source is None:
+        if isinstance(edits.source, Timeline):
+            raise ValueError("Only clips loaded from files can be saved as a project")
+        raise ValueError("Only audio loaded from a file can be saved as a project")
+    processed = source is not edits.source
+    if processed:
+        print_warn("Processed audio is not saved, only the edits of the source files")
+
+    history = []
+    skipped = 0
+    for stack_name in ("undo", "redo"):
+        for operation, state in processor.history.states(stack_name):
+            state_source = processor.file_backed(state.source)
+            if state_source is None or not _same_frames(state_source, source):
+                skipped += 1
+                continue
+            history.append(
+                {"stack": stack_name, "operation": operation, **_state_to_dict(state)}
+            )
+    if skipped:
+        print_warn(f"{skipped} history step(s) with replaced audio were not saved")
+
+    project = {
+        "version": PROJECT_VERSION,
+        "edits": _state_to_dict(edits.snapshot()),
+        "history": history,
+        "extra": extra or {},
+    }
+    content_hash = None if processed else processor.source_hash
+    if isinstance(source, Timeline):
+        project["timeline"] = {
+            "frame_rate": edits.frame_rate,
+            "sample_width": edits.sample_width,
+            "channels": edits.channels,
+            "content_hash": content_hash,
+            "clips": [
+                {
+                    **_file_entry(clip.path, processor.file_hashes),
+                    "frame_rate": clip.frame_rate,
+                    "sample_width": clip.sample_width,
+                    "frame_count": clip.frame_count,
+                    "channels": clip.channels,
+                }
+                for clip in source.clips
+            ],
+        }
+    else:
+        project["source"] = {
+            **_file_entry(source_file, processor.file_hashes),
+            "frame_rate": edits.frame_rate,
+            "sample_width": edits.sample_width,
+            "frame_count": len(source),
+            "channels": edits.channels,
+            "content_hash": content_hash,
+        }
+
+    tmp_path = f"{path}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("project.json", json.dumps(project, default=_to_builtin))
+        if processor.peaks is not None and not processed:
+            mins, maxs = processor.peaks.levels[0]
+            archive.writestr("peaks_min.npy", _npy_bytes(mins))
+            archive.writestr("peaks_max.npy", _npy_bytes(maxs))
+    os.replace(tmp_path, path)
+    print_info(f"Saved project {path}")
+    return not processed
+
+
+def load_project(processor, path):
+    """Restore a project into ``processor`` and return its ``extra`` data.
+
+    Nothing is decoded here; the source is decoded (or mapped from the
+    decode cache) the first time samples are needed.
+    """
+    with zipfile.ZipFile(path) as archive:
+        project = json.loads(archive.read("project.json"))
+        if project.get("version") != PROJECT_VERSION:
+            raise ValueError(f"Unsupported project version {project.get('version')}")
+        names = archive.namelist()
+        peaks = None
+        if "peaks_min.npy" in names:
+            peaks = (
+                np.load(io.BytesIO(archive.read("peaks_min.npy"))),
+                np.load(io.BytesIO(archive.read("peaks_max.npy"))),
+            )
+
+    if "timeline" in project:
+        source = project["timeline"]
+        samples = _open_timeline(processor, source, path, peaks)
+        source_file = samples.clips[0].path
+    else:
+        source = project["source"]
+        source_file = _find_source(source, path)
+        _check_source(source_file, source, processor.file_hashes)
+
+        def decode():
+            print_info(f"Decoding {source_file}")
+            return processor.decode_source(source_file)
+
+        samples = LazySource(
+            decode, source["frame_count"], source["channels"], source["sample_width"]
+        )
+    frame_rate, sample_width = source["frame_rate"], source["sample_width"]
+
+    processor.stop_audio()
+    processor.audio_path = source_file
+    processor._replace_edits(
+        EditList.from_state(
+            _state_from_dict(project["edits"], samples, frame_rate, sample_width)
+        )
+    )
+    processor.file_source = None if isinstance(samples, Timeline) else samples
+    processor.source_hash = source.get("content_hash")
+    if peaks is not None:
+        processor.peaks = PeakPyramid.from_base(len(samples), *peaks)
+
+    processor.history.clear()
+    for entry in project["history"]:
+        state = _state_from_dict(entry, samples, frame_rate, sample_width)
+        processor.history.push(entry["stack"], entry["operation"], state)
+
+    print_info(f"Opened project {path}")
+    return project["extra"]
@@ -0,0 +1,39 @@
+from .tracing import traced
+
+# Sent as the system instruction so it stays an identical, cacheable prefix
+SYSTEM_INSTRUCTION = (
+    "You are a audio editing AI. You are controllable via natural language and editing a audio file."
+    "\nEach prompt contains a digest of the waveform with RMS and peak levels per window and pre-detected silent and loud regions. You can use it to determine silent parts, loud parts, silences, beats and much more.\nYou are forced to used these if the user requires you to cut out silent of quiet parts for example."
+    "\nThe audio can be made of several clips (files) placed one after another on a timeline. Times are in seconds of the whole timeline unless a tool's clip argument is given, then they are seconds into that clip."
+    "\nAll of your tools should be enough to fullfill almost every task.\nNEVER ASK FOR CONFIRMATION FROM THE USER. DO EVERYTHING!"
+)
+
+
+@traced()
+def build_prompt(
+    processor, text: str, cursor: float = 0.0, transcript=None, edits=None, version=None
+):
+    """Prompt for ``text`` about ``edits`` taken at edit ``version``.
+
+    Without ``edits`` the current edits of ``processor`` are described.
+    """
+    if edits is None:
+        edits, version = processor.edits, processor.edit_version
+    waveform_summary = processor.get_waveform_summary(edits=edits, version=version)
+    full_prompt = (
+        f"The audio file is {round(edits.duration_seconds, 2)}s long. The cursor of the user is currently at {cursor}s."
+        f"\n{waveform_summary}\n"
+    )
+    clips = processor.get_clips(edits)
+    if clips:
+        full_prompt += "\nClips on the timeline:\n" + "\n".join(
+            f"Clip {clip['clip']} ({clip['name']}): "
+            + ", ".join(f"{start:.2f}-{end:.2f}s" for start, end in clip["ranges"])
+            for clip in clips
+        )
+        full_prompt += "\n"
+    if transcript:
+        full_prompt += f"\nThis is a transcript with per word timestamps of the audio:\n{transcript}"
+        full_prompt += "\nThe transcript likely has issues. If you need infos about some words they might just be misspelled in the audio."
+    full_prompt += f"\n\nUser Prompt: {text}"
+    return full_prompt
@@ -0,0 +1,203 @@
+import bisect
+import os
+
+import numpy as np
+
+from .decode_cache import LazySource, resident_bytes
+from .dsp import convert_width, interpolate, remix
+from .edit_list import SAMPLE_DTYPES
+from .peaks import BASE_BLOCK, block_peaks
+
+
+class Clip:
+    """One audio file (or decoded buffer) placed on a ``Timeline``.
+
+    Format and ``frame_count`` are the clip's own. Samples come from
+    ``loader`` the first time a frame of the clip is read, unless they are
+    passed in already decoded.
+    """
+
+    def __init__(
+        self,
+        path,
+        frame_rate,
+        channels,
+        sample_width,
+        frame_count,
+        loader=None,
+        samples=None,
+        name=None,
+    ):
+        self.path = path
+        self.name = name or (os.path.basename(path) if path else "audio")
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frame_count = frame_count
+        self._loader = loader
+        self._samples = samples
+        # base peak level in session frames, filled by Timeline.peak_base
+        self.peaks = None
+
+    @property
+    def loaded(self):
+        if isinstance(self._samples, LazySource):
+            return self._samples.loaded
+        return self._samples is not None
+
+    def samples(self):
+        if self._samples is None:
+            samples = self._loader()
+            if samples.ndim == 1:
+                samples = samples.reshape((-1, 1))
+            self._samples = samples
+        return self._samples
+
+    def resident_bytes(self):
+        """Bytes of decoded samples held in memory rather than mapped from disk."""
+        if self._samples is None:
+            return 0
+        return resident_bytes(self._samples)
+
+
+class Timeline:
+    """Clips laid end to end, read like one (frames, channels) source buffer.
+
+    The session format is the frame rate and sample width of the first
+    clip and the channel count of the widest one. Slicing converts only
+    the frames read, and a clip is decoded the first time any of its frames
+    is. Clips start on whole peak blocks, so their peaks can be computed
+    once and concatenated; the few frames between clips are silent and no
+    segment refers to them.
+    """
+
+    ndim = 2
+
+    def __init__(self, clips, frame_rate, sample_width, channels):
+        self.clips = list(clips)
+        self.frame_rate = frame_rate
+        self.sample_width = sample_width
+        self.dtype = np.dtype(SAMPLE_DTYPES[sample_width])
+        self.starts = []
+        self.ends = []
+        position = 0
+        for clip in self.clips:
+            start = -(-position // BASE_BLOCK) * BASE_BLOCK
+            self.starts.append(start)
+            position = start + round(clip.frame_count * frame_rate / clip.frame_rate)
+            self.ends.append(position)
+        self.shape = (position, channels)
+
+    @classmethod
+    def from_buffer(cls, samples, frame_rate, sample_width, path=None, peaks=None):
+        """A timeline whose only clip is an already decoded source buffer."""
+        clip = Clip(
+            path,
+            frame_rate,
+            samples.shape[1],
+            sample_width,
+            len(samples),
+            samples=samples,
+        )
+        clip.peaks = peaks
+        return cls([clip], frame_rate, sample_width, samples.shape[1])
+
+    def with_clip(self, clip):
+        """A new timeline with ``clip`` appended; this one is left unchanged."""
+        return Timeline(
+            self.clips + [clip],
+            self.frame_rate,
+            self.sample_width,
+            max(self.channels, clip.channels),
+        )
+
+    def with_samples(self, samples):
+        """The same clips and spans, read from a processed copy of this timeline.
+
+        The clips are no longer backed by their files, so their paths are dropped.
+        """
+        clips = [
+            Clip(
+                None,
+                self.frame_rate,
+                self.channels,
+                self.sample_width,
+                end - start,
+                samples=samples[start:end],
+                name=clip.name,
+            )
+            for clip, (start, end) in zip(self.clips, self.spans())
+        ]
+        return Timeline(clips, self.frame_rate, self.sample_width, self.channels)
+
+    @property
+    def channels(self):
+        return self.shape[1]
+
+    @property
+    def nbytes(self):
+        return sum(clip.resident_bytes() for clip in self.clips)
+
+    def spans(self):
+        """(start, end) source frames of every clip."""
+        return list(zip(self.starts, self.ends))
+
+    def clip_at(self, frame):
+        """Index of the clip whose span holds source ``frame``, or None."""
+        index = bisect.bisect_right(self.starts, frame) - 1
+        if index >= 0 and frame < self.ends[index]:
+            return index
+        return None
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("Timeline only supports slicing frame ranges")
+        start, end, _ = key.indices(len(self))
+        out = np.zeros((max(0, end - start), self.channels), dtype=self.dtype)
+        for clip, clip_start, clip_end in zip(self.clips, self.starts, self.ends):
+            lo = max(start, clip_start)
+            hi = min(end, clip_end)
+            if lo < hi:
+                out[lo - start : hi - start] = self._read(
+                    clip, lo - clip_start, hi - clip_start
+                )
+        return out
+
+    def __array__(self, dtype=None, copy=None):
+        samples = self[:]
+        return samples if dtype is None else samples.astype(dtype)
+
+    def _read(self, clip, start, end):
+        """Session frames [start, end) of ``clip`` in the session format."""
+        samples = clip.samples()
+        if clip.frame_rate == self.frame_rate:
+            block = samples[start:end]
+        else:
+            positions = np.arange(start, end) * (clip.frame_rate / self.frame_rate)
+            first = min(int(positions[0]), len(samples))
+            last = min(int(positions[-1]) + 2, len(samples))
+            block = interpolate(samples[first:last], positions - first)
+        block = convert_width(remix(np.asarray(block), self.channels), self.dtype)
+        if len(block) < end - start:
+            # the decoded file came out shorter than its probed length
+            padded = np.zeros((end - start, self.channels), dtype=self.dtype)
+            padded[: len(block)] = block
+            block = padded
+        return block
+
+    def peak_base(self):
+        """Finest peak level of the whole timeline, computed once per clip."""
+        block_count = -(-len(self) // BASE_BLOCK)
+        mins = np.zeros(block_count, dtype=np.float32)
+        maxs = np.zeros(block_count, dtype=np.float32)
+        for clip, start, end in zip(self.clips, self.starts, self.ends):
+            if clip.peaks is None:
+                clip.peaks = block_peaks(self, self.sample_width, start, end)
+            first = start // BASE_BLOCK
+            clip_mins, clip_maxs = clip.peaks
+            mins[first : first + len(clip_mins)] = clip_mins
+            maxs[first : first + len(clip_maxs)] = clip_maxs
+        return mins, maxs
@@ -0,0 +1,220 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+
+from .logger import print_info
+
+TRACE_ENV = "CUTTED_TRACE"
+DEFAULT_TRACE_PATH = "cutted_trace.json"
+
+_tracer = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.tracer._local.depth = getattr(self.tracer._local, "depth", 0) + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.tracer._local.depth -= 1
+        self.tracer._record(self.name, self.start, end, self.args)
+        return False
+
+
+class Tracer:
+    """Collects spans as Chrome trace events and per-prompt totals.
+
+    Spans nest per thread. While a prompt is active, the time of every
+    outermost span (on any thread) is added to the prompt's summary.
+    """
+
+    def __init__(self, path: str = DEFAULT_TRACE_PATH):
+        self.path = path
+        self.origin = time.perf_counter()
+        self.events = []
+        self.prompt = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._threads = {}
+
+    def _us(self, seconds):
+        return round((seconds - self.origin) * 1e6, 1)
+
+    def _record(self, name, start, end, args):
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": self._us(start),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        with self._lock:
+            self.events.append(event)
+            self._threads[thread.ident] = thread.name
+            if self.prompt is not None and self._local.depth == 0:
+                totals = self.prompt["totals"]
+                totals[name] = totals.get(name, 0.0) + end - start
+
+    def start_prompt(self, text):
+        with self._lock:
+            self.prompt = {"text": text, "start": time.perf_counter(), "totals": {}}
+
+    def end_prompt(self, status="done"):
+        end = time.perf_counter()
+        with self._lock:
+            prompt, self.prompt = self.prompt, None
+            if prompt is None:
+                return
+            self.events.append(
+                {
+                    "name": "prompt",
+                    "ph": "X",
+                    "ts": self._us(prompt["start"]),
+                    "dur": round((end - prompt["start"]) * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": 0,
+                    "args": {"text": prompt["text"], "status": status},
+                }
+            )
+        ranked = sorted(prompt["totals"].items(), key=lambda item: -item[1])
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in ranked)
+        print_info(
+            f"Prompt {status} in {end - prompt['start']:.2f}s"
+            + (f": {parts}" if parts else "")
+        )
+
+    def add_events(self, events):
+        """Merge events recorded by another process."""
+        with self._lock:
+            self.events.extend(events)
+
+    def take_events(self):
+        """Return all events recorded so far, including thread names, and forget them."""
+        with self._lock:
+            events, self.events = self.events, []
+            threads = dict(self._threads)
+        return self._thread_names(threads) + events
+
+    def write(self, path=None):
+        path = path or self.path
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "traceEvents": self._thread_names(threads) + events,
+                    "displayTimeUnit": "ms",
+                },
+                f,
+            )
+        return path
+
+    @staticmethod
+    def _thread_names(threads):
+        return [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": ident,
+                "args": {"name": name},
+            }
+            for ident, name in threads.items()
+        ]
+
+
+def enable(path: str = DEFAULT_TRACE_PATH):
+    """Start tracing; the trace is written to ``path`` when the program exits.
+
+    With ``path=None`` nothing is written and events have to be collected
+    with ``Tracer.take_events``.
+    """
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path)
+        if path:
+            atexit.register(_write_at_exit)
+            print_info(f"Tracing enabled, writing {path} on exit")
+    return _tracer
+
+
+def disable():
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def _write_at_exit():
+    if _tracer is not None and _tracer.path and _tracer.events:
+        _tracer.write()
+
+
+def tracer():
+    return _tracer
+
+
+def span(name, **args):
+    """Context manager timing a block; a shared no-op when tracing is off."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, args)
+
+
+def traced(name=None):
+    """Decorator form of ``span``, named after the function by default."""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _Span(_tracer, span_name, None):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def start_prompt(text):
+    if _tracer is not None:
+        _tracer.start_prompt(text)
+
+
+def end_prompt(status="done"):
+    if _tracer is not None:
+        _tracer.end_prompt(status)
+
+
+if os.getenv(TRACE_ENV):
+    enable(DEFAULT_TRACE_PATH if os.getenv(TRACE_ENV) == "1" else os.getenv(TRACE_ENV))
@@ -1,38 +1,139 @@
 import json
-import tkinter.messagebox as messagebox
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import whisper_timestamped as whisper
+from pydub import AudioSegment
 
-from .logger import print_warn
+from .dsp import resample_mono, split_quiet
+from .edit_list import EditList
+from .logger import print_info, print_warn
+from .tracing import traced
+from .transcript_cache import format_transcript, stitch_results
 
+DEFAULT_MODEL_SIZE = "small"
+WHISPER_SAMPLE_RATE = 16000
+MAX_WINDOW_SECONDS = 300
+SILENCE_SEARCH_SECONDS = 30
+SILENCE_FRAME_SECONDS = 0.02
+WORKERS_ENV = "CUTTED_WHISPER_WORKERS"
 
-class Whisper:
-    def __init__(self, model_size: str = "small", device=None):
-        self.model = whisper.load_model(model_size, device=device)
+_worker_model = None
 
-    def transcribe(self, file_path: str):
+
+def default_workers():
+    """Number of transcription processes.
+
+    ``CUTTED_WHISPER_WORKERS`` overrides the default of one on a GPU and up
+    to four on the CPU.
+    """
+    if os.getenv(WORKERS_ENV):
         try:
-            audio = whisper.load_audio(file_path)
+            return max(1, int(os.getenv(WORKERS_ENV)))
+        except ValueError:
+            print_warn(f"Ignoring {WORKERS_ENV}={os.getenv(WORKERS_ENV)!r}")
+    try:
+        import torch
+
+        if torch.cuda.is_available():
+            return 1
+    except ImportError:
+        pass
+    return max(1, min(4, (os.cpu_count() or 1) // 2))
+
+
+def clean_result(result):
+    result = json.loads(json.dumps(result))
+    for segment in result["segments"]:
+        segment.pop("seek", None)
+        segment.pop("tokens", None)
+        segment.pop("temperature", None)
+        segment.pop("avg_logprob", None)
+        segment.pop("compression_ratio", None)
+    return result
 
-            result = whisper.transcribe_timestamped(self.model, audio)
 
-            result = json.loads(json.dumps(result))
+def _init_worker(model_size, device):
+    global _worker_model
+    _worker_model = whisper.load_model(model_size, device=device)
 
-            segments_new = []
-            for segment in result["segments"]:
-                segment.pop("seek", None)
-                segment.pop("tokens", None)
-                segment.pop("temperature", None)
-                segment.pop("avg_logprob", None)
-                segment.pop("compression_ratio", None)
 
-                segments_new.append(segment)
+def _transcribe_window(index, audio):
+    return index, clean_result(whisper.transcribe_timestamped(_worker_model, audio))
+
+
+class Whisper:
+    def __init__(self, model_size: str = DEFAULT_MODEL_SIZE, device=None):
+        self.model_size = model_size
+        self.device = device
+        self._model = None
+
+    @property
+    def model(self):
+        # loaded on first use; with a worker pool only the workers need one
+        if self._model is None:
+            self._model = whisper.load_model(self.model_size, device=self.device)
+        return self._model
+
+    def transcribe(self, file_path: str):
+        return self.transcribe_audio(whisper.load_audio(file_path))
+
+    @traced("transcribe")
+    def transcribe_audio(
+        self,
+        audio,
+        frame_rate: int = WHISPER_SAMPLE_RATE,
+        workers: int = 1,
+        progress=None,
+    ):
+        # accepts an AudioSegment, integer (frames, channels) samples at
+        # frame_rate, or float32 mono samples already at 16 kHz; errors are
+        # raised to the caller, which may not be on the Tk thread
+        if isinstance(audio, AudioSegment):
+            frame_rate = audio.frame_rate
+            audio = EditList.from_segment(audio).source
+        if audio.dtype.kind == "i":
+            audio = resample_mono(
+                audio, audio.dtype.itemsize, frame_rate, WHISPER_SAMPLE_RATE
+            )
 
-            readable = ""
-            readable += f'Text: {result["text"].strip()} \n\n'
-            readable += f'Segments: {result["segments"]}'
-        except Exception as e:
-            print_warn(f"An error occured while transcribing: {e}")
-            messagebox.showwarning(f"An error occured while transcribing: {e}")
+        windows = split_quiet(
+            audio,
+            WHISPER_SAMPLE_RATE,
+            MAX_WINDOW_SECONDS,
+            SILENCE_SEARCH_SECONDS,
+            SILENCE_FRAME_SECONDS,
+        )
+        print_info(f"Transcribing {len(windows)} chunk(s)")
+        parts = []
+        if workers <= 1 or len(windows) == 1:
+            for index, (start, end) in enumerate(windows):
+                window_result = whisper.transcribe_timestamped(
+                    self.model, audio[start:end]
+                )
+                parts.append((start / WHISPER_SAMPLE_RATE, clean_result(window_result)))
+                if progress:
+                    progress(index + 1, len(windows))
+        else:
+            # forking a process with Tk, pygame and torch threads can hang
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(windows)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_size, self.device),
+            ) as pool:
+                futures = [
+                    pool.submit(_transcribe_window, index, audio[start:end])
+                    for index, (start, end) in enumerate(windows)
+                ]
+                for done, future in enumerate(as_completed(futures), 1):
+                    index, window_result = future.result()
+                    parts.append(
+                        (windows[index][0] / WHISPER_SAMPLE_RATE, window_result)
+                    )
+                    if progress:
+                        progress(done, len(windows))
 
-        return result, readable
+        result = stitch_results(parts)
+        return result, format_transcript(result)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from .logger import print_info, print_warn
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cutted", "transcripts")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+HASH_CHUNK_FRAMES = 1 << 20
+
+
+def audio_hash(samples: np.ndarray, frame_rate: int):
+    """Content hash of a decoded sample buffer."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{frame_rate}:{samples.shape}:{samples.dtype}".encode())
+    for start in range(0, len(samples), HASH_CHUNK_FRAMES):
+        digest.update(np.ascontiguousarray(samples[start : start + HASH_CHUNK_FRAMES]))
+    return digest.hexdigest()
+
+
+def format_transcript(result):
+    readable = ""
+    readable += f'Text: {result["text"].strip()} \n\n'
+    readable += f'Segments: {result["segments"]}'
+    return readable
+
+
+def stitch_results(parts):
+    """Join (offset_seconds, result) window transcripts into one result."""
+    segments = []
+    texts = []
+    language = None
+    for offset, result in sorted(parts, key=lambda part: part[0]):
+        language = language or result.get("language")
+        texts.append(result["text"].strip())
+        for segment in result["segments"]:
+            segment = dict(segment)
+            segment["id"] = len(segments)
+            segment["start"] = round(segment["start"] + offset, 2)
+            segment["end"] = round(segment["end"] + offset, 2)
+            segment["words"] = [
+                {
+                    **word,
+                    "start": round(word["start"] + offset, 2),
+                    "end": round(word["end"] + offset, 2),
+                }
+                for word in segment.get("words", [])
+            ]
+            segments.append(segment)
+    return {
+        "text": " ".join(text for text in texts if text),
+        "segments": segments,
+        "language": language,
+    }
+
+
+def remap_transcript(result, edits):
+    """Map a transcript of the source buffer onto the current edit state.
+
+    Words whose start falls inside removed audio are dropped, the rest are
+    shifted to output time. Segments without words left are dropped.
+    """
+    rate = edits.frame_rate
+    mapping = []
+    offset = 0
+    for seg_start, seg_end in edits.segments:
+        mapping.append((seg_start / rate, seg_end / rate, offset / rate))
+        offset += seg_end - seg_start
+
+    def to_output(seconds):
+        for seg_start, seg_end, out_start in mapping:
+            if seg_start <= seconds < seg_end:
+                return out_start + seconds - seg_start
+        return None
+
+    segments = []
+    for segment in result["segments"]:
+        words = []
+        for word in segment.get("words", []):
+            start = to_output(word["start"])
+            if start is None:
+                continue
+            end = start + word["end"] - word["start"]
+            words.append({**word, "start": round(start, 2), "end": round(end, 2)})
+        if not words:
+            continue
+        segments.append(
+            {
+                **segment,
+                "start": words[0]["start"],
+                "end": words[-1]["end"],
+                "text": " ".join(word["text"] for word in words),
+                "words": words,
+            }
+        )
+    for index, segment in enumerate(segments):
+        segment["id"] = index
+
+    return {
+        **result,
+        "text": " ".join(segment["text"] for segment in segments),
+        "segments": segments,
+    }
+
+
+class TranscriptCache:
+    """On-disk transcript store, evicted least-recently-used by total size."""
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, content_hash: str, model_size: str, options=None):
+        payload = json.dumps(
+            [content_hash, model_size, options or {}], sort_keys=True
+        ).encode()
+        return hashlib.sha256(payload).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)
+            print_info("Using cached transcript")
+            return result
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print_warn(f"Could not read cached transcript: {e}")
+            return None
+
+    def put(self, key, result):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError as e:
+            print_warn(f"Could not write transcript cache: {e}")
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
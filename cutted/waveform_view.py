@@ -0,0 +1,102 @@
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+
+class WaveformView:
+    """Waveform canvas that blits a cursor over a cached background bitmap.
+
+    The figure and canvas live for the whole session. Moving the cursor only
+    restores the cached background and redraws the cursor line; edits
+    replace the waveform artist and refresh the background once.
+    """
+
+    def __init__(self, master, processor):
+        self.master = master
+        self.processor = processor
+        self.width = self._pixel_width()
+
+        fig, _ = processor.plot_audio(width=self.width)
+        self.fig = fig
+        self.ax = fig.axes[0]
+        self.waveform = self.ax.collections[0]
+        self.duration = processor.edits.duration_seconds
+        self.mins, self.maxs = processor.get_peaks(self.width)
+
+        self.canvas = FigureCanvasTkAgg(fig, master=master)
+        self.background = None
+        self.cursor_line = self.ax.axvline(x=0, color="red", linewidth=2, animated=True)
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.get_tk_widget().pack(
+            fill="both",
+            expand=True,
+            padx=10,
+            pady=10,
+        )
+        self.canvas.draw_idle()
+
+    def _pixel_width(self):
+        return max(self.master.winfo_width(), 100)
+
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.ax.draw_artist(self.cursor_line)
+
+    def move_cursor(self, seconds):
+        self.cursor_line.set_xdata([seconds, seconds])
+        if self.background is None:
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.cursor_line)
+        self.canvas.blit(self.fig.bbox)
+
+    def refresh(self, start=None, end=None):
+        """Redraw the waveform after an edit.
+
+        When the length is unchanged and the edited range (in seconds) is
+        known, only the pixel columns covering it are recomputed.
+        """
+        edits = self.processor.edits
+        duration = edits.duration_seconds
+        width = self._pixel_width()
+        if (
+            start is not None
+            and end is not None
+            and width == self.width
+            and duration == self.duration
+            and duration > 0
+        ):
+            first = max(0, int(start / duration * width))
+            last = min(width, int(np.ceil(end / duration * width)))
+            frames_per_column = edits.frame_count / width
+            if last > first:
+                mins, maxs = self.processor.get_peaks(
+                    last - first,
+                    round(first * frames_per_column),
+                    round(last * frames_per_column),
+                )
+                self.mins[first : first + len(mins)] = mins
+                self.maxs[first : first + len(maxs)] = maxs
+        else:
+            self.width = width
+            self.duration = duration
+            self.mins, self.maxs = self.processor.get_peaks(width)
+
+        self.waveform.remove()
+        if len(self.mins):
+            scale = max(np.max(np.abs(self.mins)), np.max(np.abs(self.maxs)), 1e-9)
+            times = np.linspace(0, duration, num=len(self.mins))
+            self.waveform = self.ax.fill_between(
+                times, self.mins / scale, self.maxs / scale, color="cyan", linewidth=1.5
+            )
+            self.ax.set_ylim(np.min(self.mins) / scale, np.max(self.maxs) / scale)
+        else:
+            # everything was cut, draw a flat line
+            times = np.array([0.0, duration or 1.0])
+            self.waveform = self.ax.fill_between(
+                times, 0, 0, color="cyan", linewidth=1.5
+            )
+        self.ax.set_xlim(times[0], times[-1])
+        self.canvas.draw_idle()
+
+    def destroy(self):
+        self.canvas.get_tk_widget().destroy()
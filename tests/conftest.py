@@ -0,0 +1,9 @@
+import pytest
+
+from cutted.core.decode_cache import CACHE_ENV
+
+
+@pytest.fixture(autouse=True)
+def decode_cache_dir(tmp_path, monkeypatch):
+    # keep decoded test audio out of the user's cache, also in subprocesses
+    monkeypatch.setenv(CACHE_ENV, str(tmp_path / "decoded"))
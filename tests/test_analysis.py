@@ -0,0 +1,135 @@
+import numpy as np
+
+from cutted.core.analysis import (
+    detect_loud,
+    detect_silence,
+    find_regions,
+    waveform_digest,
+)
+from cutted.core.edit_list import EditList
+
+
+def make_edits(seconds_loud, seconds_quiet, rate=8000):
+    rng = np.random.default_rng(0)
+    loud = rng.normal(0, 8000, rate * seconds_loud)
+    quiet = rng.normal(0, 30, rate * seconds_quiet)
+    samples = np.concatenate([loud, quiet, loud]).astype(np.int16)
+    return EditList(samples, rate, 2)
+
+
+def test_find_regions_with_minimum_length():
+    mask = np.array([0, 1, 1, 0, 1, 1, 1, 1], dtype=bool)
+    assert find_regions(mask, 0.5) == [(0.5, 1.5), (2.0, 4.0)]
+    assert find_regions(mask, 0.5, min_seconds=1.5) == [(2.0, 4.0)]
+
+
+def test_digest_size_is_bounded():
+    short = waveform_digest(make_edits(5, 2), max_points=50)
+    long = waveform_digest(make_edits(200, 2), max_points=50)
+    assert len(long.split("RMS dB: ")[1].split("\n")[0].split()) <= 50
+    assert len(long) < len(short) * 1.5
+
+
+def test_digest_reports_silence():
+    digest = waveform_digest(make_edits(5, 3))
+    silent = digest.split("Silent regions")[1]
+    assert "5.00-8.00" in silent
+
+
+def test_detect_silence_uses_hysteresis_and_padding():
+    frame_db = np.full(100, -20.0)
+    frame_db[30:60] = -70.0
+    frame_db[45] = -58.0  # brief bump stays inside the hysteresis band
+    frame_db[:5] = -80.0
+    regions = detect_silence(frame_db, 0.1, threshold_db=10, min_len=1.0, padding=0.1)
+    assert len(regions) == 1
+    assert np.allclose(regions[0], (3.1, 5.9))
+
+
+def test_detect_silence_in_mostly_silent_audio():
+    frame_db = np.full(100, -70.0)
+    frame_db[20:30] = -20.0
+    frame_db[50:70] = -20.0
+    regions = detect_silence(frame_db, 0.1, threshold_db=10, min_len=0.5, padding=0.0)
+    assert np.allclose(regions, [(0.0, 2.0), (3.0, 5.0), (7.0, 10.0)])
+
+
+def test_detect_silence_finds_more_with_higher_threshold():
+    rng = np.random.default_rng(0)
+    frame_db = np.concatenate(
+        [
+            rng.uniform(-75, -65, 40),
+            rng.uniform(-50, -40, 20),
+            rng.uniform(-25, -15, 40),
+        ]
+    )
+    frame_db = np.roll(frame_db, 17)
+    silent = []
+    for threshold_db in (5, 10, 20, 30, 40):
+        regions = detect_silence(
+            frame_db, 0.1, threshold_db=threshold_db, min_len=0.5, padding=0.0
+        )
+        silent.append(sum(end - start for start, end in regions))
+    assert silent == sorted(silent)
+    assert silent[-1] > silent[0]
+
+
+def test_dense_audio_has_no_silence():
+    frame_db = np.random.default_rng(0).uniform(-25, -15, 100)
+    assert detect_silence(frame_db, 0.1, threshold_db=30, min_len=0.2) == []
+
+
+def test_detect_loud():
+    frame_db = np.full(100, -30.0)
+    frame_db[10:30] = -10.0
+    assert np.allclose(detect_loud(frame_db, 0.1, min_len=0.5), [(1.0, 3.0)])
+
+
+def test_remove_silence_cuts_quiet_part():
+    from cutted.core.audio_processor import AudioProcessor
+
+    processor = AudioProcessor()
+    processor.edits = make_edits(5, 3)
+    assert processor.remove_silence(min_len=1.0, padding=0.1)
+    assert 10.1 < processor.get_length() < 10.4
+
+
+def test_remove_silence_reports_progress_and_cancels():
+    import threading
+
+    from cutted.core.audio_processor import AudioProcessor
+
+    processor = AudioProcessor()
+    processor.edits = make_edits(5, 3)
+    cancel = threading.Event()
+    cancel.set()
+    reports = []
+    assert not processor.remove_silence(
+        progress=lambda done, total: reports.append((done, total)), cancel=cancel
+    )
+    assert reports[-1] == (13 * 8000, 13 * 8000)
+    assert processor.get_length() == 13.0
+
+
+def test_prompt_digest_is_cached_per_edit(monkeypatch):
+    from cutted.core import audio_processor
+    from cutted.core.edit_list import EditList
+    from cutted.core.prompt import build_prompt
+
+    processor = audio_processor.AudioProcessor()
+    processor.edits = make_edits(5, 3)
+    digests = []
+    monkeypatch.setattr(
+        audio_processor,
+        "waveform_digest",
+        lambda edits, max_points: digests.append(edits) or "digest",
+    )
+    snapshot = EditList.from_state(processor.edits.snapshot())
+    version = processor.edit_version
+    processor.cut([0.0], [1.0])
+    prompt = build_prompt(processor, "hi", edits=snapshot, version=version)
+    assert "13.0s long" in prompt
+    build_prompt(processor, "again", edits=snapshot, version=version)
+    assert digests == [snapshot]
+    build_prompt(processor, "after the cut")
+    assert len(digests) == 2
@@ -1,4 +1,8 @@
+import io
+
+import numpy as np
 import pytest
+from pydub import AudioSegment
 
 from cutted.core.audio_processor import AudioProcessor
 
@@ -28,3 +32,45 @@ def test_change_volume(audio_processor):
     original_audio = audio_processor.audio
     audio_processor.change_volume([0], [5], [2.0])
     assert audio_processor.audio != original_audio
+
+
+def test_cut_multiple_unsorted_ranges(audio_processor):
+    original_length = audio_processor.get_length()
+    assert audio_processor.cut([20, 5, 8], [25, 10, 12])
+    assert audio_processor.get_length() == pytest.approx(original_length - 12, abs=0.01)
+
+
+def test_audio_upload_is_compact_and_cached(audio_processor):
+    processor = audio_processor
+    data, mime_type = processor.get_audio_upload()
+    assert mime_type == "audio/mpeg"
+    segment = AudioSegment.from_file(io.BytesIO(data), format="mp3")
+    assert (segment.channels, segment.frame_rate) == (1, 16000)
+    assert processor.get_audio_upload()[0] is data
+
+    processor.cut([0.0], [0.5])
+    assert processor.get_audio_upload()[0] is not data
+
+
+def test_fade_in_starts_silent(audio_processor):
+    assert audio_processor.fade(0, 1, fade_in=True)
+    edits = audio_processor.edits
+    assert not edits.render(0, 1).any()
+    rate = edits.frame_rate
+    quiet = np.abs(edits.render(0, rate // 100).astype(np.int64)).max()
+    assert quiet < np.abs(edits.render(rate, 2 * rate).astype(np.int64)).max() / 10
+    assert audio_processor.undo() == "fade"
+
+
+def test_normalize_scales_to_peak(audio_processor, monkeypatch):
+    monkeypatch.setattr("cutted.core.analysis.ANALYSIS_CHUNK_FRAMES", 4096)
+    assert audio_processor.normalize(-6.0)
+    edits = audio_processor.edits
+    peak = np.abs(edits.render().astype(np.int64)).max()
+    assert peak / 2**15 == pytest.approx(10 ** (-6 / 20), abs=1e-3)
+
+
+def test_plot_audio_after_cutting_everything(audio_processor):
+    assert audio_processor.cut([0], [40])
+    fig, image = audio_processor.plot_audio(width=200)
+    assert image
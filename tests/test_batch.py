@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from cutted.batch import collect_inputs, output_names, process_file
+
+TEST_AUDIO = os.path.join(os.path.dirname(__file__), "test_audio.mp3")
+
+
+def _options(tmp_path, **overrides):
+    options = {
+        "prompt": None,
+        "calls": None,
+        "fake_calls": None,
+        "model": "gemini-2.0-flash",
+        "output_dir": str(tmp_path),
+        "formats": ["wav"],
+        "bitrate": None,
+        "trace": False,
+        "cache_dir": str(tmp_path / "cache"),
+    }
+    options.update(overrides)
+    return options
+
+
+def _calls_file(tmp_path):
+    calls_path = tmp_path / "calls.json"
+    calls_path.write_text(json.dumps([{"name": "remove_silence", "args": {}}]))
+    return calls_path
+
+
+def test_collect_inputs_expands_directories(tmp_path):
+    for name in ("b.mp3", "a.wav", "notes.txt"):
+        (tmp_path / name).write_bytes(b"")
+    paths = collect_inputs([str(tmp_path), str(tmp_path / "a.wav")])
+    assert [os.path.basename(path) for path in paths] == ["a.wav", "b.mp3"]
+
+
+def test_output_names_do_not_collide(tmp_path):
+    paths = [
+        str(tmp_path / "a" / "x.mp3"),
+        str(tmp_path / "b" / "x.mp3"),
+        str(tmp_path / "a" / "y.wav"),
+        str(tmp_path / "a" / "y.mp3"),
+    ]
+    names = output_names(paths)
+    assert [names[path] for path in paths] == [
+        os.path.join("a", "x"),
+        os.path.join("b", "x"),
+        os.path.join("a", "y_wav"),
+        os.path.join("a", "y_mp3"),
+    ]
+    assert output_names([paths[0]]) == {paths[0]: "x"}
+
+
+def test_process_file_applies_saved_calls(tmp_path):
+    calls = [{"name": "cut_audio", "args": {"start": [0.0], "end": [1.0]}}]
+    record = process_file(TEST_AUDIO, _options(tmp_path, calls=calls))
+    assert record["status"] == "ok"
+    assert all(os.path.exists(output) for output in record["outputs"])
+    assert record["calls"] == calls
+
+
+def test_process_file_uses_scripted_llm(tmp_path):
+    calls = [
+        {"name": "change_volume", "args": {"start": [0], "end": [1], "volume": [0.5]}}
+    ]
+    record = process_file(
+        TEST_AUDIO, _options(tmp_path, prompt="quieter start", fake_calls=calls)
+    )
+    assert record["status"] == "ok"
+    assert record["calls"][0]["name"] == "change_volume"
+
+
+def test_process_file_reports_errors(tmp_path):
+    record = process_file(str(tmp_path / "missing.mp3"), _options(tmp_path, calls=[]))
+    assert record["status"] == "error"
+    assert record["error"]
+
+
+def test_batch_cli_writes_one_output_per_input(tmp_path):
+    for folder in ("a", "b"):
+        (tmp_path / folder).mkdir()
+        shutil.copy(TEST_AUDIO, tmp_path / folder / "x.mp3")
+    result = subprocess.run(
+        [sys.executable, "-m", "cutted", "batch", str(tmp_path / "*" / "x.mp3")]
+        + ["--calls", str(_calls_file(tmp_path))]
+        + ["-o", str(tmp_path / "out"), "-f", "wav", "-j", "2"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    outputs = sorted(
+        json.loads(line)["outputs"][0] for line in result.stdout.splitlines()
+    )
+    assert outputs == [
+        str(tmp_path / "out" / "a" / "x.wav"),
+        str(tmp_path / "out" / "b" / "x.wav"),
+    ]
+
+
+def test_parsing_arguments_does_not_import_audio_modules():
+    code = (
+        "import sys; from cutted.__main__ import main\n"
+        "try:\n    main(['batch', '--help'])\n"
+        "except SystemExit:\n    pass\n"
+        "print('numpy' in sys.modules, 'cutted.batch' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert result.stdout.splitlines()[-1] == "False False"
+
+
+def test_batch_cli_writes_json_lines_without_gui(tmp_path):
+    calls_path = _calls_file(tmp_path)
+    code = (
+        "import sys; from cutted.__main__ import main\n"
+        "try:\n    main(sys.argv[1:])\n"
+        "finally:\n    print('tk' if 'tkinter' in sys.modules else '', file=sys.stderr)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, "batch", TEST_AUDIO, "--calls", str(calls_path)]
+        + ["-o", str(tmp_path / "out"), "-f", "wav", "-j", "1"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [record["status"] for record in records] == ["ok"]
+    assert not result.stderr.strip().endswith("tk")
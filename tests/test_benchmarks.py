@@ -0,0 +1,29 @@
+import json
+
+from benchmarks.audio_processor import compare, main, ranges
+
+
+def test_ranges_are_evenly_spaced():
+    starts, ends = ranges(100, 4)
+    assert starts == [0, 25, 50, 75]
+    assert ends == [2.5, 27.5, 52.5, 77.5]
+
+
+def test_quick_run_and_compare(tmp_path):
+    output = tmp_path / "results.json"
+    args = ["--durations", "3", "--frame-rates", "8000", "--channels", "2"]
+    args += ["--only", "load_audio", "cut", "history_record", "-o", str(output)]
+    assert main(args) == 0
+    report = json.loads(output.read_text())
+    names = {result["name"] for result in report["results"]}
+    assert names == {"load_audio", "cut", "history_record"}
+    assert all(result["peak_bytes"] > 0 for result in report["results"])
+
+    results = report["results"]
+    assert compare(results, results) == []
+    smaller = [
+        {**result, "peak_bytes": result["peak_bytes"] // 10} for result in results
+    ]
+    regressions = compare(results, smaller)
+    assert len(regressions) == len(results)
+    assert all(metric == "peak_bytes" for _, metric, _, _ in regressions)
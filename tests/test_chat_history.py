@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from cutted.core.chat_history import ChatHistory
+
+
+def _call(name, **args):
+    return SimpleNamespace(name=name, args=args)
+
+
+def test_records_keep_request_and_tool_call():
+    history = ChatHistory()
+    history.add("cut the intro", _call("cut_audio", start=[0], end=[5]))
+    history.add("what is this?", text="A podcast. ")
+    assert history.records() == [
+        ("user", "Earlier request: cut the intro"),
+        ("model", 'Called cut_audio({"start": [0], "end": [5]})'),
+        ("user", "Earlier request: what is this?"),
+        ("model", "A podcast."),
+    ]
+
+
+def test_budget_folds_old_turns_into_summary():
+    history = ChatHistory(max_tokens=60)
+    for index in range(20):
+        history.add(
+            f"request {index}", _call("cut_audio", start=[index], end=[index + 1])
+        )
+    assert history.tokens() <= 60
+    assert history.earlier_turns + len(history.turns) == 20
+    first = history.records()[0][1]
+    assert first.startswith(f"Summary of {history.earlier_turns} earlier request(s): ")
+    assert f"{history.earlier_turns}x cut_audio" in first
+    assert history.turns[-1].request == "request 19"
+
+
+def test_size_stays_flat_over_long_session():
+    history = ChatHistory(max_tokens=500)
+    sizes = []
+    for index in range(200):
+        history.add(
+            "x" * 2000, _call("change_volume", start=[1], end=[2], volume=[0.5])
+        )
+        sizes.append(history.tokens())
+    assert max(sizes) <= 500
+    assert max(sizes[50:]) == max(sizes[100:])
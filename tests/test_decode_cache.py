@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+from pydub import AudioSegment
+
+from cutted.core.decode_cache import DecodeCache
+
+TEST_AUDIO = os.path.join(os.path.dirname(__file__), "test_audio.mp3")
+
+
+def test_decode_matches_pydub_and_is_memory_mapped(tmp_path):
+    cache = DecodeCache(str(tmp_path))
+    samples, frame_rate, sample_width = cache.load(TEST_AUDIO)
+    segment = AudioSegment.from_file(TEST_AUDIO)
+    assert (frame_rate, sample_width) == (segment.frame_rate, segment.sample_width)
+    assert samples.shape[1] == segment.channels
+    assert isinstance(samples, np.memmap)
+    # decoders may pad differently at the end, compare the common part
+    expected = np.frombuffer(segment.raw_data, dtype=np.int16).reshape(
+        (-1, segment.channels)
+    )
+    common = min(len(expected), len(samples))
+    assert abs(len(expected) - len(samples)) < frame_rate // 10
+    assert np.array_equal(samples[:common], expected[:common])
+
+
+def test_second_load_reuses_cache_file(tmp_path):
+    cache = DecodeCache(str(tmp_path))
+    first, _, _ = cache.load(TEST_AUDIO)
+    files = os.listdir(tmp_path)
+    second, _, _ = cache.load(TEST_AUDIO)
+    assert os.listdir(tmp_path) == files
+    assert np.array_equal(first, second)
+
+
+def test_modified_source_is_decoded_again(tmp_path):
+    audio_path = tmp_path / "copy.mp3"
+    audio_path.write_bytes(open(TEST_AUDIO, "rb").read())
+    cache = DecodeCache(str(tmp_path / "cache"))
+    key = cache.key(str(audio_path))
+    os.utime(audio_path, ns=(0, 10**9))
+    assert cache.key(str(audio_path)) != key
+
+
+def test_eviction_keeps_newest_entry(tmp_path):
+    cache = DecodeCache(str(tmp_path), max_bytes=1)
+    (tmp_path / "old.pcm").write_bytes(b"x" * 100)
+    os.utime(tmp_path / "old.pcm", (0, 0))
+    cache.load(TEST_AUDIO)
+    assert os.listdir(tmp_path) == [f"{cache.key(TEST_AUDIO)}.pcm"]
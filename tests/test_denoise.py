@@ -0,0 +1,84 @@
+import threading
+
+import numpy as np
+from pydub import AudioSegment
+
+from cutted.core.audio_processor import AudioProcessor
+from cutted.core.denoise import denoise, noise_profile
+
+RATE = 16000
+
+
+def _noisy(seconds=6.0, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(round(seconds * RATE)) / RATE
+    # a tone that is on for one second and off for the next
+    clean = 0.3 * np.sin(2 * np.pi * 440 * t) * (np.floor(t) % 2 == 0)
+    noise = 0.02 * rng.standard_normal(len(t))
+    samples = np.round((clean + noise) * 32767).astype(np.int16).reshape((-1, 1))
+    return samples, clean, noise
+
+
+def _segment(samples):
+    return AudioSegment(
+        data=samples.tobytes(), sample_width=2, frame_rate=RATE, channels=1
+    )
+
+
+def test_gating_removes_noise_and_keeps_signal():
+    samples, clean, noise = _noisy()
+    ranges = [(0, len(samples))]
+    threshold = noise_profile(samples, 2, RATE, ranges)
+    out = denoise(samples, 2, RATE, ranges, threshold, strength=1.0)
+    result = out[:, 0] / 32767
+    quiet = clean == 0
+    assert np.sqrt(np.mean(result[quiet] ** 2)) < 0.2 * np.std(noise)
+    error = np.sqrt(np.mean((result[~quiet] - clean[~quiet]) ** 2))
+    assert error < 0.8 * np.std(noise)
+
+
+def test_chunking_and_workers_do_not_change_the_result():
+    samples, _, _ = _noisy()
+    ranges = [(100, len(samples) - 300)]
+    threshold = noise_profile(samples, 2, RATE, ranges)
+    whole = denoise(samples, 2, RATE, ranges, threshold)
+    chunked = denoise(samples, 2, RATE, ranges, threshold, workers=2, chunk_seconds=1)
+    assert np.abs(whole.astype(np.int32) - chunked).max() <= 1
+    assert not whole[:100].any()
+
+    unchanged = denoise(samples, 2, RATE, ranges, threshold, strength=0.0)
+    assert np.array_equal(unchanged[100:-300], samples[100:-300])
+
+
+def test_cancel_returns_none():
+    samples, _, _ = _noisy()
+    threshold = noise_profile(samples, 2, RATE, [(0, len(samples))])
+    cancel = threading.Event()
+    cancel.set()
+    assert (
+        denoise(samples, 2, RATE, [(0, len(samples))], threshold, cancel=cancel) is None
+    )
+
+
+def test_reduce_noise_is_an_undoable_edit():
+    samples, _, _ = _noisy()
+    processor = AudioProcessor()
+    processor.denoise_workers = 1
+    processor.audio = _segment(samples)
+    processor.cut([2.0], [3.0])
+    original = processor.edits.source
+    before = processor.edits.render()
+
+    assert processor.apply_function_call(
+        "reduce_noise", {"noise_start": 1.0, "noise_end": 1.9, "strength": 1.0}
+    )
+    assert processor.edits.source is not original
+    assert processor.edits.segments == [(0, 2 * RATE), (3 * RATE, len(samples))]
+    after = processor.edits.render()
+    assert (
+        np.abs(after[RATE + 100 : 2 * RATE - 100]).max()
+        < np.abs(before[RATE + 100 : 2 * RATE - 100]).max()
+    )
+
+    assert processor.undo() == "noise reduction"
+    assert processor.edits.source is original
@@ -0,0 +1,29 @@
+import numpy as np
+
+from cutted.core.dsp import resample_mono, split_quiet, to_mono_float
+
+
+def test_to_mono_float_scales_and_downmixes():
+    samples = np.array([[16384, 0], [-32768, -32768]], dtype=np.int16)
+    assert np.allclose(to_mono_float(samples, 2), [0.25, -1.0])
+
+
+def test_resample_mono_keeps_duration_and_tone():
+    rate = 44100
+    t = np.arange(rate * 3) / rate
+    tone = (np.sin(2 * np.pi * 440 * t) * 16000).astype(np.int16)
+    samples = np.stack([tone, tone], axis=1)
+    out = resample_mono(samples, 2, rate, 16000)
+    assert len(out) == 48000
+    expected = np.sin(2 * np.pi * 440 * np.arange(48000) / 16000) * 16000 / 32768
+    assert np.abs(out[100:-100] - expected[100:-100]).max() < 0.05
+
+
+def test_split_quiet_prefers_quiet_points():
+    rate = 16000
+    audio = np.full(rate * 25, 0.5, dtype=np.float32)
+    audio[rate * 8 : rate * 8 + rate // 10] = 0.0
+    windows = split_quiet(audio, rate, max_window=10, search=4, frame_seconds=0.02)
+    assert windows[0] == (0, rate * 8)
+    assert windows[-1][1] == len(audio)
+    assert all(end - start <= rate * 10 for start, end in windows)
@@ -0,0 +1,56 @@
+import numpy as np
+
+from cutted.core.edit_list import EditList, normalize_ranges
+
+
+def make_edits(frames=100, channels=1):
+    samples = np.arange(frames * channels, dtype=np.int16).reshape((-1, channels))
+    return EditList(samples, frame_rate=10, sample_width=2)
+
+
+def test_cut_does_not_touch_source():
+    edits = make_edits()
+    edits.cut(10, 20)
+    assert edits.frame_count == 90
+    assert edits.segments == [(0, 10), (20, 100)]
+    assert len(edits.source) == 100
+
+
+def test_render_after_cuts():
+    edits = make_edits()
+    edits.cut(10, 20)
+    edits.cut(0, 5)
+    rendered = edits.render()[:, 0]
+    expected = np.concatenate([np.arange(5, 10), np.arange(20, 100)])
+    assert np.array_equal(rendered, expected)
+
+
+def test_gain_follows_source_through_cuts():
+    edits = make_edits()
+    edits.apply_gain(50, 60, 2.0)
+    edits.cut(0, 50)
+    rendered = edits.render()[:, 0]
+    assert np.array_equal(rendered[:10], np.arange(50, 60) * 2)
+    assert np.array_equal(rendered[10:], np.arange(60, 100))
+
+
+def test_render_range_and_segment_export():
+    edits = make_edits(channels=2)
+    edits.cut(0, 10)
+    assert np.array_equal(edits.render(0, 1), [[20, 21]])
+    segment = edits.to_segment()
+    assert segment.channels == 2
+    assert segment.frame_count() == 90
+
+
+def test_normalize_ranges_sorts_clamps_and_merges():
+    ranges = normalize_ranges([50, -5, 8, 90, 30], [60, 10, 20, 120, 30], 100)
+    assert ranges == [(0, 20), (50, 60), (90, 100)]
+
+
+def test_cut_ranges_across_segments():
+    edits = make_edits()
+    edits.cut(40, 50)
+    edits.cut_ranges([(5, 10), (35, 45), (80, 90)])
+    expected = np.concatenate([np.arange(0, 5), np.arange(10, 35), np.arange(55, 90)])
+    assert np.array_equal(edits.render()[:, 0], expected)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from cutted.core.edit_list import EditList
+from cutted.core.envelope import Gain, apply_curve, gain_curve, gain_profile
+
+
+def test_gain_profile_ramps_from_unity():
+    profile = gain_profile(np.arange(10), 0.0, 10, ramp_in=5, ramp_out=5)
+    assert profile[0] == np.float32(0.8)
+    assert profile[4] == 0.0
+    assert profile[-1] == np.float32(0.8)
+
+
+def test_gain_curve_multiplies_overlapping_gains():
+    gains = [Gain(0, 10, 2.0), Gain(5, 20, 0.5)]
+    curve = gain_curve(0, 20, gains)
+    assert np.allclose(curve, [2.0] * 5 + [1.0] * 5 + [0.5] * 10)
+    assert gain_curve(20, 30, gains) is None
+
+
+def test_apply_curve_clips():
+    samples = np.array([[20000], [-20000]], dtype=np.int16)
+    out = apply_curve(samples, np.array([2.0, 2.0], dtype=np.float32))
+    assert out.tolist() == [[32767], [-32768]]
+
+
+def test_fade_is_continuous_across_cut():
+    edits = EditList(np.full((100, 1), 1000, dtype=np.int16), 10, 2)
+    edits.cut(40, 60)
+    edits.fade(0, 80, fade_in=True)
+    rendered = edits.render()[:, 0]
+    assert rendered[0] == 0
+    assert rendered[-1] > 980
+    assert np.all(np.diff(rendered.astype(int)) >= 0)
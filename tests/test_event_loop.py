@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+import pytest
+
+from cutted.core.event_loop import EventLoopThread
+from cutted.core.gemini import ScriptedClient
+
+
+@pytest.fixture
+def event_loop_thread():
+    runner = EventLoopThread()
+    yield runner
+    runner.stop()
+
+
+def test_submit_runs_on_loop_thread(event_loop_thread):
+    client = ScriptedClient([{"name": "cut_audio", "args": {"start": [1], "end": [2]}}])
+    done = threading.Event()
+    future = event_loop_thread.submit(
+        client.generate_async("cut"), timeout=5, callback=lambda f: done.set()
+    )
+    function_call, text = future.result(timeout=5)
+    assert done.wait(1)
+    assert function_call.name == "cut_audio"
+    assert text is None
+
+
+def test_timeout(event_loop_thread):
+    future = event_loop_thread.submit(asyncio.sleep(10), timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        future.result(timeout=5)
+
+
+def test_cancel_stops_task(event_loop_thread):
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    async def slow():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    future = event_loop_thread.submit(slow())
+    assert started.wait(5)
+    future.cancel()
+    assert cancelled.wait(5)
@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+from cutted.core.edit_list import EditList
+from cutted.core.export import ExportTarget, export_edits
+
+
+def _edits(seconds=2.0, frame_rate=8000):
+    t = np.arange(int(seconds * frame_rate)) / frame_rate
+    tone = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+    return EditList(np.stack([tone, -tone], axis=1), frame_rate, 2)
+
+
+def test_export_wav_matches_render(tmp_path):
+    edits = _edits()
+    edits.cut(4000, 8000)
+    path = str(tmp_path / "out.wav")
+    calls = []
+    assert export_edits(
+        edits,
+        [ExportTarget(path, "wav")],
+        progress=lambda *a: calls.append(a),
+        chunk_seconds=0.5,
+    )
+    exported = AudioSegment.from_file(path)
+    assert exported.raw_data == edits.render().tobytes()
+    assert calls[-1] == (edits.frame_count, edits.frame_count)
+
+
+def test_export_several_formats_at_once(tmp_path):
+    targets = [
+        ExportTarget(str(tmp_path / "a.mp3"), "mp3", "64k"),
+        ExportTarget(str(tmp_path / "b.flac"), "flac"),
+    ]
+    assert export_edits(_edits(), targets)
+    for target in targets:
+        assert AudioSegment.from_file(target.path).duration_seconds == pytest.approx(
+            2.0, abs=0.1
+        )
+
+
+def test_cancel_removes_partial_file(tmp_path):
+    cancel = threading.Event()
+    path = tmp_path / "out.wav"
+
+    def progress(done, total):
+        cancel.set()
+
+    assert not export_edits(
+        _edits(),
+        [(str(path), "wav")],
+        progress=progress,
+        cancel=cancel,
+        chunk_seconds=0.1,
+    )
+    assert not path.exists()
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        export_edits(_edits(), [ExportTarget(str(tmp_path / "x.xyz"), "xyz")])
+
+
+def test_processor_export_does_not_render_a_full_copy(tmp_path):
+    from cutted.core.audio_processor import AudioProcessor
+
+    processor = AudioProcessor()
+    processor.edits = _edits()
+    assert processor.get_audio_info()["channels"] == 2
+    assert processor.export_audio(str(tmp_path / "out.wav"), "wav")
+    assert processor._rendered is None
+
+
+def test_8_bit_wav_round_trip(tmp_path):
+    import wave
+
+    samples = np.arange(-128, 128, dtype=np.int8).repeat(10).reshape((-1, 1))
+    path = str(tmp_path / "out.wav")
+    assert export_edits(EditList(samples, 8000, 1), [ExportTarget(path, "wav")])
+    with wave.open(path) as f:
+        assert f.getsampwidth() == 1
+        data = np.frombuffer(f.readframes(f.getnframes()), dtype=np.uint8)
+    assert np.array_equal(data.astype(np.int16) - 128, samples[:, 0])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from cutted.core.audio_processor import AudioProcessor
+from cutted.core.edit_list import EditList
+from cutted.core.history import History
+
+
+@pytest.fixture
+def processor():
+    processor = AudioProcessor()
+    processor.edits = EditList(np.arange(1000, dtype=np.int16), 100, 2)
+    return processor
+
+
+def test_undo_redo_restores_edit_lists(processor):
+    processor.cut([1], [2])
+    processor.change_volume([0], [1], [0.5])
+    assert processor.get_length() == 9.0
+    assert processor.undo() == "volume change"
+    assert processor.edits.gains == []
+    assert processor.undo() == "cut"
+    assert processor.get_length() == 10.0
+    assert processor.undo() is None
+    assert processor.redo() == "cut"
+    assert processor.get_length() == 9.0
+
+
+def test_unchanged_volume_is_not_recorded(processor):
+    processor.cut([1], [2])
+    assert processor.change_volume([0, 3], [1, 2], [1.0, 0.5])
+    assert processor.undo() == "cut"
+
+
+def test_undo_does_not_copy_source(processor):
+    source = processor.edits.source
+    processor.cut([1], [2])
+    processor.undo()
+    assert processor.edits.source is source
+
+
+def test_new_edit_clears_redo(processor):
+    processor.cut([1], [2])
+    processor.undo()
+    processor.cut([3], [4])
+    assert processor.redo() is None
+
+
+def test_compressed_history_roundtrip(processor):
+    processor.history = History(compress=True)
+    processor.cut([1], [2])
+    processor.cut([5], [6])
+    processor.undo()
+    assert processor.edits.segments == [(0, 100), (200, 1000)]
+
+
+def test_budget_drops_replaced_sources():
+    history = History(max_bytes=3000)
+    edits = EditList(np.zeros(1000, dtype=np.int16), 100, 2)
+    for _ in range(3):
+        history.record("replace audio", edits.snapshot())
+        edits = EditList(np.zeros(1000, dtype=np.int16), 100, 2)
+    assert len(history.undo_stack) == 1
+    assert history.size(edits.source) <= 3000
@@ -0,0 +1,38 @@
+import numpy as np
+
+from cutted.core.edit_list import EditList
+from cutted.core.peaks import BASE_BLOCK, PeakPyramid
+
+
+def make_edits(frames):
+    samples = np.zeros((frames, 1), dtype=np.int16)
+    samples[::2, 0] = 16384
+    samples[1::2, 0] = -16384
+    return EditList(samples, frame_rate=8000, sample_width=2)
+
+
+def test_pyramid_levels_halve():
+    edits = make_edits(BASE_BLOCK * 64)
+    pyramid = PeakPyramid(edits.source, edits.sample_width)
+    assert [len(mins) for mins, _ in pyramid.levels] == [64, 32, 16, 8, 4, 2, 1]
+    assert pyramid.levels[-1][0][0] == -0.5
+    assert pyramid.levels[-1][1][0] == 0.5
+
+
+def test_view_width_is_bounded_and_follows_edits():
+    edits = make_edits(BASE_BLOCK * 1000)
+    pyramid = PeakPyramid(edits.source, edits.sample_width)
+    edits.apply_gain(0, edits.frame_count // 2, 0.5)
+    edits.cut(0, BASE_BLOCK * 100)
+    mins, maxs = pyramid.view(edits, 300)
+    assert len(mins) == len(maxs) == 300
+    assert np.isclose(maxs[0], 0.25)
+    assert np.isclose(maxs[-1], 0.5)
+
+
+def test_view_renders_short_ranges():
+    edits = make_edits(BASE_BLOCK * 10)
+    pyramid = PeakPyramid(edits.source, edits.sample_width)
+    mins, maxs = pyramid.view(edits, 100, 0, 200)
+    assert len(mins) == 100
+    assert np.allclose(maxs, 0.5)
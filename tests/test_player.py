@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+import pytest
+
+from cutted.core.dsp import to_int16
+from cutted.core.edit_list import EditList
+from cutted.core.player import StreamPlayer
+
+
+def test_to_int16_scales_widths():
+    assert to_int16(np.array([[1 << 24]], dtype=np.int32)).tolist() == [[256]]
+    assert to_int16(np.array([[-2]], dtype=np.int8)).tolist() == [[-512]]
+
+
+def test_stream_player_plays_to_end(monkeypatch):
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    pygame = pytest.importorskip("pygame")
+    edits = EditList(np.zeros((8000, 2), dtype=np.int16), 16000, 2)
+    player = StreamPlayer()
+    try:
+        player.play(edits, 4000)
+    except pygame.error as e:
+        pytest.skip(f"No audio device: {e}")
+    assert player.is_playing()
+    deadline = time.time() + 3
+    while player.is_playing() and time.time() < deadline:
+        time.sleep(0.05)
+    assert not player.is_playing()
+    player.stop()
+    pygame.mixer.quit()
+
+
+def test_stream_player_pause_keeps_position(monkeypatch):
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    pygame = pytest.importorskip("pygame")
+    edits = EditList(np.zeros((48000, 1), dtype=np.int16), 16000, 2)
+    player = StreamPlayer()
+    try:
+        player.play(edits, 16000)
+    except pygame.error as e:
+        pytest.skip(f"No audio device: {e}")
+    time.sleep(0.5)
+    player.pause()
+    paused_at = player.position_frames()
+    time.sleep(0.3)
+    assert player.position_frames() == paused_at
+    assert 16000 + 4000 < paused_at < 16000 + 12000
+    player.resume()
+    time.sleep(0.2)
+    assert player.position_frames() > paused_at
+    assert player.stop() * 16000 >= paused_at
+    pygame.mixer.quit()
+
+
+def test_seeking_keeps_a_mixer_with_another_rate(monkeypatch):
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    pygame = pytest.importorskip("pygame")
+    edits = EditList(np.zeros((16000, 1), dtype=np.int16), 16000, 2)
+    player = StreamPlayer()
+    try:
+        player.play(edits)
+    except pygame.error as e:
+        pytest.skip(f"No audio device: {e}")
+    # the device refused 16 kHz and opened at 44.1 kHz
+    get_init = pygame.mixer.get_init
+    monkeypatch.setattr(
+        pygame.mixer, "get_init", lambda: (44100,) + tuple(get_init()[1:])
+    )
+    inits = []
+    init = pygame.mixer.init
+    monkeypatch.setattr(
+        pygame.mixer, "init", lambda **kwargs: inits.append(kwargs) or init(**kwargs)
+    )
+    player.play(edits, 4000)
+    player.play(edits, 8000)
+    assert inits == []
+    player.stop()
+    pygame.mixer.quit()
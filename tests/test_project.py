@@ -0,0 +1,113 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from cutted.core.audio_processor import AudioProcessor
+from cutted.core.decode_cache import DecodeCache
+
+TEST_AUDIO = os.path.join(os.path.dirname(__file__), "test_audio.mp3")
+
+
+def _processor(cache_dir):
+    processor = AudioProcessor()
+    processor.decode_cache = DecodeCache(str(cache_dir))
+    return processor
+
+
+@pytest.fixture
+def saved(tmp_path):
+    audio_path = tmp_path / "audio.mp3"
+    shutil.copy(TEST_AUDIO, audio_path)
+    processor = _processor(tmp_path / "cache")
+    processor.load_audio(str(audio_path))
+    processor.cut([1.0, 5.0], [2.0, 6.0])
+    processor.change_volume([10.0], [12.0], [0.5])
+    processor.get_peaks(500)
+    project_path = str(tmp_path / "edit.cutted")
+    processor.save_project(project_path, {"chat": {"turns": [["hi", None, "hello"]]}})
+    return processor, project_path
+
+
+def test_open_restores_edits_without_decoding(saved, tmp_path):
+    original, project_path = saved
+    processor = _processor(tmp_path / "empty_cache")
+    extra = processor.open_project(project_path)
+    assert extra == {"chat": {"turns": [["hi", None, "hello"]]}}
+    source = processor.edits.source
+    assert processor.get_length() == original.get_length()
+    mins, maxs = processor.get_peaks(500)
+    assert np.allclose(mins, original.get_peaks(500)[0])
+    assert not source.loaded
+    assert not os.path.exists(tmp_path / "empty_cache")
+
+    assert np.array_equal(processor.edits.render(), original.edits.render())
+    assert source.loaded
+
+
+def test_history_survives_reopen(saved, tmp_path):
+    original, project_path = saved
+    processor = _processor(tmp_path / "cache")
+    processor.open_project(project_path)
+    assert processor.undo() == "volume change"
+    assert processor.undo() == "cut"
+    assert processor.get_length() == pytest.approx(30.0, abs=0.1)
+    assert processor.redo() == "cut"
+
+
+def test_saving_again_reuses_source_hash(saved, tmp_path, monkeypatch):
+    processor, project_path = saved
+    hashed = []
+    monkeypatch.setattr(
+        "cutted.core.project.file_hash", lambda path: hashed.append(path) or "x"
+    )
+    assert processor.save_project(project_path)
+    assert hashed == []
+
+    os.utime(tmp_path / "audio.mp3", ns=(0, 0))
+    processor.save_project(project_path)
+    assert len(hashed) == 1
+
+
+def test_changed_source_is_rejected(saved, tmp_path):
+    _, project_path = saved
+    with open(tmp_path / "audio.mp3", "ab") as f:
+        f.write(b"\0" * 100)
+    with pytest.raises(ValueError):
+        _processor(tmp_path / "cache").open_project(project_path)
+
+
+def test_replaced_audio_cannot_be_saved(saved, tmp_path):
+    processor, _ = saved
+    processor.audio = processor.audio[:1000]
+    with pytest.raises(ValueError):
+        processor.save_project(str(tmp_path / "other.cutted"))
+
+
+def test_denoised_audio_saves_its_edits(saved, tmp_path):
+    processor, _ = saved
+    processor.denoise_workers = 1
+    assert processor.reduce_noise(strength=0.5)
+    project_path = str(tmp_path / "denoised.cutted")
+    assert processor.save_project(project_path) is False
+
+    reopened = _processor(tmp_path / "cache")
+    reopened.open_project(project_path)
+    assert reopened.edits.segments == processor.edits.segments
+    assert reopened.undo() == "noise reduction"
+    assert reopened.undo() == "volume change"
+
+
+def test_denoising_a_reopened_project_keeps_history(saved, tmp_path):
+    _, project_path = saved
+    processor = _processor(tmp_path / "cache")
+    processor.denoise_workers = 1
+    processor.open_project(project_path)
+    processor.history.max_bytes = processor.edits.source.nbytes // 2
+    assert processor.reduce_noise(strength=0.5)
+    assert [operation for operation, _ in processor.history.states("undo")] == [
+        "cut",
+        "volume change",
+        "noise reduction",
+    ]
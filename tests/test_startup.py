@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+import pytest
+
+from cutted.core.gemini import GeminiClient
+
+
+def test_core_import_does_not_load_heavy_modules():
+    code = (
+        "import sys, cutted.core.audio_processor, cutted.core.gemini;"
+        "print([m for m in ('pygame', 'matplotlib', 'google.genai') if m in sys.modules])"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_gemini_client_requires_api_key(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    with pytest.raises(RuntimeError):
+        GeminiClient()
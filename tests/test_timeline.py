@@ -0,0 +1,139 @@
+import os
+import wave
+
+import numpy as np
+import pytest
+
+from cutted.core.audio_processor import AudioProcessor
+from cutted.core.decode_cache import DecodeCache
+from cutted.core.peaks import BASE_BLOCK
+from cutted.core.timeline import Clip, Timeline
+
+TEST_AUDIO = os.path.join(os.path.dirname(__file__), "test_audio.mp3")
+
+
+def _write_wav(path, samples, frame_rate):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(samples.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(frame_rate)
+        f.writeframes(samples.astype(np.int16).tobytes())
+
+
+def _tone(seconds, frame_rate, channels):
+    t = np.arange(round(seconds * frame_rate)) / frame_rate
+    tone = (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+    return np.repeat(tone[:, None], channels, axis=1)
+
+
+def test_slices_convert_clips_to_session_format():
+    mono = np.arange(1000, dtype=np.int16).reshape((-1, 1))
+    stereo = np.full((500, 2), 7, dtype=np.int16)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return stereo
+
+    timeline = Timeline.from_buffer(mono, 1000, 2).with_clip(
+        Clip("b.wav", 500, 2, 2, 500, loader=load)
+    )
+    assert timeline.channels == 2
+    assert timeline.spans() == [(0, 1000), (1024, 2024)]
+
+    head = timeline[990:1000]
+    assert np.array_equal(head[:, 0], head[:, 1])
+    assert head[-1, 0] == 999
+    assert not loads
+
+    # 500 Hz frames are interpolated up to the 1000 Hz session rate
+    tail = timeline[1024:2024]
+    assert loads == [1]
+    assert tail.shape == (1000, 2)
+    assert np.all(tail[:-2] == 7)
+    assert np.all(timeline[1000:1024] == 0)
+
+
+def test_peak_base_reuses_clip_peaks():
+    samples = (np.random.default_rng(0).integers(-1000, 1000, (3000, 1))).astype(
+        np.int16
+    )
+    timeline = Timeline.from_buffer(samples, 1000, 2).with_clip(
+        Clip(None, 1000, 1, 2, 3000, samples=samples)
+    )
+    mins, maxs = timeline.peak_base()
+    first, second = timeline.clips
+    assert len(mins) == -(-len(timeline) // BASE_BLOCK)
+    offset = timeline.starts[1] // BASE_BLOCK
+    assert np.array_equal(maxs[offset : offset + len(second.peaks[1])], first.peaks[1])
+
+    third = timeline.with_clip(Clip(None, 1000, 1, 2, 100, samples=samples[:100]))
+    assert third.clips[0].peaks is first.peaks
+
+
+@pytest.fixture
+def processor(tmp_path):
+    processor = AudioProcessor()
+    processor.decode_cache = DecodeCache(str(tmp_path / "cache"))
+    processor.load_audio(TEST_AUDIO)
+    wav_path = tmp_path / "second.wav"
+    _write_wav(wav_path, _tone(3.0, 22050, 2), 22050)
+    processor.add_clip(str(wav_path))
+    return processor
+
+
+def test_add_clip_is_lazy_and_appends(processor):
+    timeline = processor.edits.source
+    assert isinstance(timeline, Timeline)
+    assert not timeline.clips[1].loaded
+    assert processor.get_length() == pytest.approx(33.0, abs=0.01)
+    assert processor.edits.channels == 2
+
+    processor.edits.render(0, 1000)
+    assert not timeline.clips[1].loaded
+    end = processor.edits.render(processor.edits.frame_count - 1000)
+    assert timeline.clips[1].loaded
+    assert np.abs(end).max() > 5000
+
+    clips = processor.get_clips()
+    assert [clip["name"] for clip in clips] == ["test_audio.mp3", "second.wav"]
+    assert clips[1]["ranges"][0][0] == pytest.approx(30.0, abs=0.01)
+
+
+def test_clip_tools_use_clip_time(processor):
+    assert processor.apply_function_call(
+        "cut_audio", {"start": [0.5], "end": [1.0], "clip": 2}
+    )
+    assert processor.get_length() == pytest.approx(32.5, abs=0.01)
+    assert processor.get_clips()[0]["ranges"] == [(0.0, 30.0)]
+
+    assert processor.apply_function_call("move_clip", {"clip": 2, "before": 1})
+    first, second = processor.get_clips()
+    assert second["ranges"][0][0] == pytest.approx(0.0)
+    assert first["ranges"][0][0] == pytest.approx(2.5, abs=0.01)
+
+    assert processor.apply_function_call("remove_clip", {"clip": 1})
+    assert [clip["clip"] for clip in processor.get_clips()] == [2]
+    assert not processor.apply_function_call("remove_clip", {"clip": 3})
+
+    processor.undo()
+    processor.undo()
+    processor.undo()
+    processor.undo()
+    assert processor.get_length() == pytest.approx(30.0, abs=0.01)
+    assert not isinstance(processor.edits.source, Timeline)
+
+
+def test_project_keeps_timeline(processor, tmp_path):
+    processor.cut([10.0], [11.0])
+    project_path = str(tmp_path / "timeline.cutted")
+    processor.save_project(project_path)
+
+    reopened = AudioProcessor()
+    reopened.decode_cache = DecodeCache(str(tmp_path / "cache"))
+    reopened.open_project(project_path)
+    assert not any(clip.loaded for clip in reopened.edits.source.clips)
+    assert reopened.get_clips() == processor.get_clips()
+    assert np.array_equal(reopened.edits.render(), processor.edits.render())
+    assert reopened.undo() == "cut"
+    assert reopened.undo() == "add clip"
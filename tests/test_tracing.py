@@ -0,0 +1,64 @@
+import json
+import threading
+
+import pytest
+
+from cutted.core import tracing
+
+
+@pytest.fixture
+def tracer():
+    previous = tracing.disable()
+    yield tracing.enable(None)
+    tracing.disable()
+    if previous is not None:
+        tracing.enable(previous.path)
+
+
+def test_disabled_spans_record_nothing():
+    previous = tracing.disable()
+    try:
+        assert tracing.span("x") is tracing.span("y")
+
+        @tracing.traced()
+        def work():
+            return 42
+
+        assert work() == 42
+    finally:
+        if previous is not None:
+            tracing.enable(previous.path)
+
+
+def test_nested_spans_and_prompt_summary(tracer, capsys):
+    @tracing.traced("apply")
+    def apply():
+        with tracing.span("cut", ranges=2):
+            pass
+
+    tracing.start_prompt("cut the intro")
+    with tracing.span("gemini"):
+        pass
+    worker = threading.Thread(target=apply)
+    worker.start()
+    worker.join()
+    tracing.end_prompt()
+
+    events = [event for event in tracer.events if event["ph"] == "X"]
+    assert [event["name"] for event in events] == ["gemini", "cut", "apply", "prompt"]
+    cut, apply_event = events[1], events[2]
+    assert apply_event["ts"] <= cut["ts"]
+    assert cut["args"] == {"ranges": "2"}
+    summary = capsys.readouterr().out
+    assert "Prompt done in" in summary
+    # only outermost spans count towards the summary
+    assert "apply" in summary and "gemini" in summary and "cut" not in summary
+
+
+def test_write_chrome_trace(tracer, tmp_path):
+    with tracing.span("export"):
+        pass
+    path = tracer.write(str(tmp_path / "trace.json"))
+    trace = json.loads(open(path).read())
+    phases = {event["ph"] for event in trace["traceEvents"]}
+    assert phases == {"M", "X"}
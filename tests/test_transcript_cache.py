@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+
+from cutted.core.edit_list import EditList
+from cutted.core.transcript_cache import (
+    TranscriptCache,
+    audio_hash,
+    remap_transcript,
+    stitch_results,
+)
+
+
+def make_result():
+    words = [
+        {"text": "hello", "start": 1.0, "end": 1.5},
+        {"text": "there", "start": 3.0, "end": 3.5},
+        {"text": "world", "start": 6.0, "end": 6.5},
+    ]
+    return {
+        "text": "hello there world",
+        "segments": [{"id": 0, "start": 1.0, "end": 6.5, "words": words}],
+    }
+
+
+def test_audio_hash_depends_on_content():
+    samples = np.zeros((100, 2), dtype=np.int16)
+    changed = samples.copy()
+    changed[50, 1] = 1
+    assert audio_hash(samples, 44100) == audio_hash(samples.copy(), 44100)
+    assert audio_hash(samples, 44100) != audio_hash(changed, 44100)
+    assert audio_hash(samples, 44100) != audio_hash(samples, 48000)
+
+
+def test_remap_transcript_through_cut():
+    edits = EditList(np.zeros((100, 1), dtype=np.int16), 10, 2)
+    edits.cut(20, 40)
+    result = remap_transcript(make_result(), edits)
+    words = result["segments"][0]["words"]
+    assert [word["text"] for word in words] == ["hello", "world"]
+    assert words[1]["start"] == 4.0
+    assert result["text"] == "hello world"
+
+
+def test_cache_roundtrip_and_eviction(tmp_path):
+    cache = TranscriptCache(str(tmp_path), max_bytes=300)
+    first = cache.key("a", "small")
+    second = cache.key("b", "small")
+    assert first != second != cache.key("a", "base")
+    cache.put(first, make_result())
+    assert cache.get(first) == make_result()
+    os.utime(tmp_path / f"{first}.json", (0, 0))
+    cache.put(second, make_result())
+    assert cache.get(first) is None
+    assert cache.get(second) == make_result()
+
+
+def test_stitch_results_offsets_words():
+    part = {
+        "text": "hi",
+        "segments": [
+            {"id": 0, "start": 1.0, "end": 2.0, "words": [{"start": 1.0, "end": 2.0}]}
+        ],
+    }
+    result = stitch_results([(300.0, part), (0.0, part)])
+    assert result["text"] == "hi hi"
+    assert [segment["start"] for segment in result["segments"]] == [1.0, 301.0]
+    assert result["segments"][1]["words"][0]["end"] == 302.0
+    assert [segment["id"] for segment in result["segments"]] == [0, 1]